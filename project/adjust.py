@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+from nse_calendar import session_days
+
+# Corporate-action adjustment applied on read.
+#
+# Prices are fetched and stored raw (auto_adjust=False) together with a small
+# factor table per ticker: ex-date -> multiplier for every bar before that
+# date, the back-adjustment yfinance applies with auto_adjust=True. Adjusted
+# Open/High/Low/Close are the raw prices times the product of all later
+# factors; Volume is left as is.
+#
+# Providers report adjustments the way yfinance does, as an "Adj Close" column
+# next to the raw prices, and factor tables are read off the Adj Close / Close
+# ratio. Yahoo's unadjusted prices already have splits and bonuses applied, so
+# for Yahoo the tables mostly hold dividends.
+
+ADJ_CLOSE = "Adj Close"
+PRICE_FIELDS = ["Open", "High", "Low", "Close"]
+
+# Ratio steps smaller than this are rounding in the provider's Adj Close
+MIN_STEP = 1e-4
+
+
+def factor_events(df):
+    # One ticker's raw frame -> Series of multipliers indexed by ex-date
+    if ADJ_CLOSE not in df.columns:
+        return pd.Series(dtype=float)
+    ratio = (df[ADJ_CLOSE] / df["Close"]).dropna()
+    ratio = ratio[ratio > 0]
+    step = ratio.shift(1) / ratio
+    events = step[(step - 1).abs() > MIN_STEP]
+    events.index = session_days(events.index)
+    return events
+
+
+def cumulative(index, events):
+    # Per-bar multiplier: product of every factor with an ex-date after the bar
+    if events is None or not len(events):
+        return np.ones(len(index))
+    events = events.sort_index()
+    tail = np.append(np.cumprod(events.to_numpy()[::-1])[::-1], 1.0)
+    return tail[events.index.searchsorted(session_days(index), side="right")]
+
+
+def scale_prices(df, factor):
+    # Open/High/Low/Close of one ticker's frame times a per-bar factor
+    out = df.drop(columns=ADJ_CLOSE, errors="ignore")
+    cols = [c for c in PRICE_FIELDS if c in out.columns]
+    out[cols] = out[cols].to_numpy() * np.asarray(factor, dtype=float)[:, None]
+    return out
+
+
+def adjust_frame(df, events):
+    # One ticker's raw OHLCV -> adjusted OHLCV
+    return scale_prices(df, cumulative(df.index, events))
+
+
+def with_adj_close(df, events):
+    # Raw OHLCV plus the Adj Close column a raw yfinance download carries
+    out = df.drop(columns=ADJ_CLOSE, errors="ignore")
+    out[ADJ_CLOSE] = out["Close"].to_numpy() * cumulative(df.index, events)
+    return out
+
+
+def factor_matrix(panel):
+    # dates x tickers multipliers of a raw panel (1 where nothing is known)
+    fields = panel.columns.get_level_values("Field")
+    close = panel.xs("Close", axis=1, level="Field")
+    if ADJ_CLOSE not in fields:
+        return pd.DataFrame(1.0, index=close.index, columns=close.columns)
+    adj = panel.xs(ADJ_CLOSE, axis=1, level="Field").reindex(columns=close.columns)
+    return (adj / close).fillna(1.0)
+
+
+def raw_prices(panel):
+    if panel.empty or ADJ_CLOSE not in panel.columns.get_level_values("Field"):
+        return panel
+    return panel.drop(columns=ADJ_CLOSE, level="Field")
+
+
+def adjust_panel(panel, factors):
+    # Raw panel -> adjusted panel, one vectorized multiply over every price column
+    if panel.empty:
+        return panel
+    panel = raw_prices(panel)
+    fields = panel.columns.get_level_values("Field")
+    price = np.flatnonzero(fields.isin(PRICE_FIELDS))
+    cols = factors.columns.get_indexer(panel.columns.get_level_values("Ticker")[price])
+    block = factors.reindex(index=panel.index).fillna(1.0).to_numpy()
+    multiplier = np.where(cols >= 0, block[:, np.maximum(cols, 0)], 1.0)
+
+    values = panel.to_numpy(dtype=float, copy=True)
+    values[:, price] *= multiplier
+    return pd.DataFrame(values, index=panel.index, columns=panel.columns)
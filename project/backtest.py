@@ -0,0 +1,139 @@
+import numpy as np
+import pandas as pd
+from data import field_matrix
+from snapshot import UniverseSnapshot
+import indicators as ind
+from instrument import instrumented, stage
+
+# Historical performance of the screens.
+#
+# Each screen's rule is evaluated on every session of the loaded history for
+# every ticker at once, giving a dates x tickers boolean signal matrix. Forward
+# returns over each holding period come from the adjusted close, entering at
+# the close of the signal day, and are summarised as count / mean / median /
+# hit rate next to the same numbers for every ticker-day in the universe.
+#
+# Signals use the same rules and defaults as the screens in main.py; gaps are
+# measured on unadjusted prices like screen_gap_up_down.
+
+SESSIONS_PER_YEAR = 252
+HOLDS = (5, 20, 60)
+
+
+def _rsi(adjusted, raw, mode="low", period=14, low=30.0, high=70.0):
+    rsi = ind.rsi(field_matrix(adjusted, "Close"), period)
+    return rsi < low if mode == "low" else rsi > high
+
+
+def _macd(adjusted, raw, kind="bullish", fast=12, slow=26, signal=9):
+    close = field_matrix(adjusted, "Close")
+    line, signal_line = ind.macd(close, fast, slow, signal)
+    # Warm-up rows of the EMAs are not crossovers (the screen wants 35 bars too)
+    diff = (line - signal_line).where(close.notna().cumsum() >= slow + signal)
+    before = diff.shift(1)
+    return (before < 0) & (diff > 0) if kind == "bullish" else (before > 0) & (diff < 0)
+
+
+def _gap(adjusted, raw, direction="up", threshold=2.0):
+    close = field_matrix(raw, "Close")
+    gap = ind.pct_change(close.shift(1), field_matrix(raw, "Open"))
+    return gap > threshold if direction == "up" else gap < -threshold
+
+
+def _extreme(adjusted, raw, kind="high", window=SESSIONS_PER_YEAR):
+    close = field_matrix(adjusted, "Close")
+    rolling = close.rolling(window, min_periods=window)
+    extreme = rolling.max() if kind == "high" else rolling.min()
+    return pd.DataFrame(np.isclose(close, extreme, atol=0.01), index=close.index, columns=close.columns)
+
+
+def _strong(adjusted, raw, min_5y=50.0, max_1y=-5.0):
+    close = field_matrix(adjusted, "Close")
+    ret_5y = ind.pct_change(close.shift(5 * SESSIONS_PER_YEAR), close)
+    ret_1y = ind.pct_change(close.shift(SESSIONS_PER_YEAR), close)
+    return (ret_5y >= min_5y) & (ret_1y >= max_1y)
+
+
+# Screen label (as in result files) -> (signal function, fixed parameters)
+SIGNALS = {
+    "rsi_low": (_rsi, {"mode": "low"}),
+    "rsi_high": (_rsi, {"mode": "high"}),
+    "macd_bullish": (_macd, {"kind": "bullish"}),
+    "macd_bearish": (_macd, {"kind": "bearish"}),
+    "gap_up": (_gap, {"direction": "up"}),
+    "gap_down": (_gap, {"direction": "down"}),
+    "high52": (_extreme, {"kind": "high"}),
+    "low52": (_extreme, {"kind": "low"}),
+    "strong": (_strong, {}),
+}
+
+
+def signal_matrix(screen, adjusted, raw, **params):
+    function, fixed = SIGNALS[screen]
+    return function(adjusted, raw, **{**fixed, **params}).fillna(False).astype(bool)
+
+
+def forward_returns(close, hold):
+    # % return from each session's close to the close `hold` sessions later
+    return ind.pct_change(close, close.shift(-hold))
+
+
+def first_days(signal):
+    # Only the first day of each run of consecutive signals
+    return signal & ~signal.shift(1, fill_value=False)
+
+
+def evaluate(signal, close, holds=HOLDS):
+    # One row of statistics per holding period
+    mask = signal.reindex(index=close.index, columns=close.columns, fill_value=False).to_numpy()
+
+    rows = []
+    for hold in holds:
+        forward = forward_returns(close, hold).to_numpy(dtype=float)
+        known = ~np.isnan(forward)
+        picked = forward[mask & known]
+        universe = forward[known]
+        mean = picked.mean() if len(picked) else np.nan
+        baseline = universe.mean() if len(universe) else np.nan
+        rows.append({
+            "Hold": hold,
+            "Signals": len(picked),
+            "Tickers": int((mask & known).any(axis=0).sum()),
+            "Mean %": mean,
+            "Median %": np.median(picked) if len(picked) else np.nan,
+            "Hit Rate %": (picked > 0).mean() * 100 if len(picked) else np.nan,
+            "Universe Mean %": baseline,
+            "Edge %": mean - baseline,
+        })
+    return pd.DataFrame(rows)
+
+
+def _select(panel, tickers):
+    if panel.empty:
+        return panel
+    return panel.loc[:, panel.columns.get_level_values("Ticker").isin(tickers)]
+
+
+@instrumented
+def run_backtest(tickers, screen, years=10, holds=HOLDS, fresh=False, snapshot=None, **params):
+    snapshot = snapshot or UniverseSnapshot(tickers)
+    snapshot.ensure_lookback(years)
+    print(f"\n🧪 Backtesting {screen} over {years}y, holding {', '.join(map(str, holds))} sessions...")
+
+    with stage("compute"):
+        adjusted = _select(snapshot.window(f"{years}y"), tickers)
+        if adjusted.empty:
+            print("❌ No price history to backtest.")
+            return None
+        raw = _select(snapshot.window(f"{years}y", adjusted=False), tickers) if screen.startswith("gap") else adjusted
+        signal = signal_matrix(screen, adjusted, raw, **params)
+    with stage("filter"):
+        if fresh:
+            signal = first_days(signal)
+        result = evaluate(signal, field_matrix(adjusted, "Close"), holds)
+
+    print(f"📅 {adjusted.index[0]:%Y-%m-%d} → {adjusted.index[-1]:%Y-%m-%d}, "
+          f"{signal.shape[1]} tickers, {int(signal.to_numpy().sum())} signal days")
+    print(result.round(2).to_string(index=False))
+    result.insert(0, "Screen", screen)
+    return result
@@ -0,0 +1,368 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+import data
+from data import FIELDS, SyntheticProvider, synthetic_ohlcv
+from compact import CompactPanel, to_day_numbers
+import indicators as ind
+
+# Benchmarks that run offline against synthetic prices.
+#
+#   python bench.py screens                              # every screener, Nifty 500
+#   python bench.py screens --universe nifty500 2000 --isolate
+#   python bench.py memory --tickers 5000 --years 10
+#   python bench.py shards --tickers 5000 --workers 1 2 4 8
+#   python bench.py startup --screen rsi
+#
+# Measurements run in child processes so peak RSS is not skewed by earlier runs.
+# Peak RSS covers the screening process only, not chart-rendering workers.
+
+BACKENDS = ["pandas", "compact", "mmap"]
+SESSIONS_PER_YEAR = 252
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# cli arguments for each screener, in menu order
+SCREENS = {
+    "strong": ["strong"],
+    "movers": ["movers", "--top", "10"],
+    "heatmap": ["heatmap"],
+    "high52": ["high52"],
+    "low52": ["low52"],
+    "rsi": ["rsi", "--mode", "low"],
+    "gap": ["gap", "--direction", "up"],
+    "macd": ["macd", "--type", "bullish"],
+    "returns": ["returns", "--years", "3"],
+}
+
+
+def synthetic_calendar(years):
+    return pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=SESSIONS_PER_YEAR * years)
+
+
+def fill(values, n_tickers, days, chunk=250):
+    # Synthetic OHLCV written into a (field, ticker, day) array a block at a time
+    for lo in range(0, n_tickers, chunk):
+        count = min(chunk, n_tickers - lo)
+        values[:, lo:lo + count] = synthetic_ohlcv(np.random.default_rng(lo), count, days)
+
+
+def synthetic_factors(n_tickers, days):
+    # (ticker, day) multipliers with one 2% dividend a year, like a loaded store
+    factors = np.ones((n_tickers, days), dtype=np.float32)
+    for ex in range(SESSIONS_PER_YEAR // 2, days, SESSIONS_PER_YEAR):
+        factors[:, :ex] *= 0.98
+    return factors
+
+
+def peak_rss_mb():
+    # ru_maxrss is in KB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 ** 2 if sys.platform == "darwin" else peak / 1024
+
+
+def run_pandas(tickers, dates):
+    # Same layout as fetch_panel: float64 with (Ticker, Field) columns
+    columns = pd.MultiIndex.from_product([tickers, FIELDS], names=["Ticker", "Field"])
+    block = np.empty((len(dates), len(tickers) * len(FIELDS)))
+    view = block.reshape(len(dates), len(tickers), len(FIELDS)).transpose(2, 1, 0)
+    fill(view, len(tickers), len(dates))
+    panel = pd.DataFrame(block, index=dates, columns=columns, copy=False)
+    load_done = time.perf_counter()
+
+    factors = synthetic_factors(len(tickers), len(dates)).T.astype(float)
+    close = panel.xs("Close", axis=1, level="Field") * factors
+    ind.period_return(close)
+    ind.period_return(close[close.index >= close.index[-1] - pd.DateOffset(years=1)])
+    ind.last_valid(ind.rsi(close.iloc[-60:]))
+    return panel.memory_usage().sum(), load_done
+
+
+def run_compact(tickers, dates, folder=None):
+    if folder:
+        store = CompactPanel.open(folder, mmap=True)
+    else:
+        values = np.empty((len(FIELDS), len(tickers), len(dates)), dtype=np.float32)
+        fill(values, len(tickers), len(dates))
+        store = CompactPanel(tickers, to_day_numbers(dates), values, synthetic_factors(len(tickers), len(dates)))
+    load_done = time.perf_counter()
+
+    store.adjusted().period_return()
+    store.trim("1y").adjusted().period_return()
+    store.trim("3mo").adjusted().rsi()
+    return store.nbytes(), load_done
+
+
+def measure(backend, n_tickers, years):
+    tickers = [f"SYN{i:05d}.NS" for i in range(n_tickers)]
+    dates = synthetic_calendar(years)
+    folder = None
+    if backend == "mmap":
+        # Written by a separate process so its pages don't count here
+        folder = os.path.join(tempfile.gettempdir(), f"compact_{n_tickers}x{years}y")
+        if not os.path.exists(os.path.join(folder, "factors.npy")):
+            subprocess.run([sys.executable, os.path.abspath(__file__), "write-store", folder,
+                            "--tickers", str(n_tickers), "--years", str(years)], check=True)
+
+    start = time.perf_counter()
+    if backend == "pandas":
+        nbytes, load_done = run_pandas(tickers, dates)
+    else:
+        nbytes, load_done = run_compact(tickers, dates, folder)
+    end = time.perf_counter()
+    return {
+        "backend": backend,
+        "data_mb": nbytes / 1024 ** 2,
+        "load_s": load_done - start,
+        "compute_s": end - load_done,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def write_store(folder, n_tickers, years):
+    dates = synthetic_calendar(years)
+    tickers = [f"SYN{i:05d}.NS" for i in range(n_tickers)]
+    store = CompactPanel.allocate(folder, tickers, to_day_numbers(dates))
+    fill(store.values, n_tickers, len(dates))
+    store.values.flush()
+    np.save(os.path.join(folder, "factors.npy"), synthetic_factors(n_tickers, len(dates)))
+
+
+def memory_report(n_tickers, years, backends):
+    print(f"\n🧪 {n_tickers} tickers x {years}y ({SESSIONS_PER_YEAR * years} sessions), "
+          f"returns + RSI over the whole universe\n")
+    rows = []
+    for backend in backends:
+        out = subprocess.run([sys.executable, os.path.abspath(__file__), "measure", backend,
+                              "--tickers", str(n_tickers), "--years", str(years)],
+                             capture_output=True, text=True, check=True)
+        rows.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    df = pd.DataFrame(rows).set_index("backend")
+    print(df.round(2).to_string())
+    return df
+
+
+def shards_report(n_tickers, years, workers, expression):
+    from query import MetricTable, evaluate, parse
+    from shard import ShardedScan
+    from snapshot import UniverseSnapshot
+
+    folder = os.path.join(tempfile.gettempdir(), f"compact_{n_tickers}x{years}y")
+    if not os.path.exists(os.path.join(folder, "values.npy")):
+        write_store(folder, n_tickers, years)
+    snapshot = UniverseSnapshot.from_store(CompactPanel.open(folder, mmap=True))
+    tickers = snapshot.tickers
+    print(f"\n🧪 {n_tickers} tickers x {years}y, query: {expression}\n")
+
+    start = time.perf_counter()
+    baseline = evaluate(parse(expression), MetricTable(snapshot), tickers)
+    single = time.perf_counter() - start
+    rows = [{"workers": "unsharded", "hits": len(baseline), "wall_s": single, "speedup": 1.0}]
+    for n in workers:
+        scan = ShardedScan(snapshot, n)
+        with contextlib.redirect_stdout(io.StringIO()):
+            scan.query(expression, tickers[:n])  # write the store and start the pool outside the timing
+            start = time.perf_counter()
+            df = scan.query(expression, tickers)
+            wall = time.perf_counter() - start
+        scan.close()
+        rows.append({"workers": n, "hits": len(df), "wall_s": wall, "speedup": single / wall})
+    df = pd.DataFrame(rows)
+    print(df.round(2).to_string(index=False))
+    return df
+
+
+# Cold-process probe for "startup": times the imports, then optionally runs cli
+# with the given arguments and lists which heavy modules ended up loaded
+STARTUP_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {here!r})
+{imports}
+imported = time.perf_counter() - start
+argv = {argv!r}
+if argv:
+    import contextlib, io, cli, data
+    if {synthetic!r}:
+        data.YahooProvider = data.SyntheticProvider
+    with contextlib.redirect_stdout(io.StringIO()):
+        cli.main(argv)
+heavy = [m for m in ("matplotlib", "seaborn", "mplfinance", "yfinance") if m in sys.modules]
+print(json.dumps({{"import_s": imported, "total_s": time.perf_counter() - start, "loaded": heavy}}))
+"""
+
+
+def probe(workdir, imports, argv=(), synthetic=False):
+    code = STARTUP_PROBE.format(here=HERE, imports=imports, argv=list(argv), synthetic=synthetic)
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=workdir)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def startup_report(screen, runs=3):
+    argv = ["--tickers", os.path.join(HERE, "nifty_500_list.csv"), "--no-charts", *SCREENS[screen]]
+    cases = {
+        "import, plotting + yfinance eager": ("import cli, draw, yfinance", []),
+        "import cli": ("import cli", []),
+        f"{screen}, warm cache, no charts": ("import cli", argv),
+    }
+    print(f"\n🧪 Cold-process startup, best of {runs}\n")
+    rows = []
+    with tempfile.TemporaryDirectory() as workdir:
+        # Fill the price cache from synthetic prices so the timed run never downloads
+        probe(workdir, "import cli", argv, synthetic=True)
+        for name, (imports, args) in cases.items():
+            samples = [probe(workdir, imports, args) for _ in range(runs)]
+            best = min(samples, key=lambda r: r["total_s"])
+            rows.append({"case": name, "import_s": best["import_s"], "total_s": best["total_s"],
+                         "heavy modules": ", ".join(best["loaded"]) or "-"})
+    df = pd.DataFrame(rows)
+    print(df.round(3).to_string(index=False))
+    return df
+
+
+def universe(size):
+    if size == "nifty500":
+        return pd.read_csv(os.path.join(HERE, "nifty_500_list.csv"))["Symbol"].tolist()
+    return [f"SYN{i:05d}.NS" for i in range(int(size))]
+
+
+def run_screens(names, size, charts="top", workers=None, compact=False):
+    import cli
+    import render
+    from instrument import recorder
+    from snapshot import UniverseSnapshot
+
+    data.set_provider(SyntheticProvider())
+    render.chart_settings.update(mode=charts, workers=workers)
+
+    tickers = universe(size)
+    snapshot = UniverseSnapshot(tickers, compact=compact)
+    parser = cli.build_parser()
+    rows = []
+    for name in names:
+        recorder.reset()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            df = cli.run_screen(parser.parse_args(SCREENS[name]), tickers, snapshot)
+        wall = time.perf_counter() - start
+        stages = pd.DataFrame(recorder.breakdown()).T
+        fetch = stages["fetch"].sum() if len(stages) else 0.0
+        rendered = stages["render"].sum() if len(stages) else 0.0
+        rows.append({
+            "universe": size,
+            "screen": name,
+            "hits": 0 if df is None else len(df),
+            "wall_s": wall,
+            "fetch_s": fetch,
+            "compute_s": wall - fetch - rendered,
+            "render_s": rendered,
+            "peak_rss_mb": peak_rss_mb(),
+        })
+    return rows
+
+
+def screens_report(names, sizes, charts, workers, compact, isolate):
+    mode = "one process per screen" if isolate else "one shared snapshot"
+    print(f"\n🧪 {len(names)} screens, charts={charts}, {mode}\n")
+    rows = []
+    for size in sizes:
+        groups = [[name] for name in names] if isolate else [names]
+        for group in groups:
+            cmd = [sys.executable, os.path.abspath(__file__), "run-screens", "--universe", str(size),
+                   "--charts", charts, "--screens", *group]
+            if workers is not None:
+                cmd += ["--workers", str(workers)]
+            if compact:
+                cmd.append("--compact")
+            with tempfile.TemporaryDirectory() as workdir:
+                # Charts and result files land in a scratch folder
+                out = subprocess.run(cmd, capture_output=True, text=True, check=True, cwd=workdir)
+            rows.extend(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    df = pd.DataFrame(rows)
+    for size, part in df.groupby("universe", sort=False):
+        total = part[["wall_s", "fetch_s", "compute_s", "render_s"]].sum()
+        print(f"📊 Universe: {size}")
+        print(part.drop(columns="universe").round(3).to_string(index=False))
+        print(f"   Total {total['wall_s']:.2f}s (fetch {total['fetch_s']:.2f}s, compute {total['compute_s']:.2f}s, "
+              f"render {total['render_s']:.2f}s), peak RSS {part['peak_rss_mb'].max():.0f} MB\n")
+    return df
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="bench", description="Offline screener benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("screens", help="time every screener against synthetic prices")
+    p.add_argument("--universe", nargs="+", default=["nifty500"], help="'nifty500' or a number of synthetic tickers")
+    p.add_argument("--screens", nargs="+", choices=list(SCREENS), default=list(SCREENS))
+    p.add_argument("--charts", choices=["all", "top", "none"], default="top")
+    p.add_argument("--workers", type=int, default=None, help="chart rendering processes (0 = inline)")
+    p.add_argument("--compact", action="store_true")
+    p.add_argument("--isolate", action="store_true", help="cold start every screen in its own process")
+    p.add_argument("--json", metavar="PATH", help="also write the rows to a JSON file")
+
+    p = sub.add_parser("memory", help="peak RSS of the price store backends")
+    p.add_argument("--tickers", type=int, default=5000)
+    p.add_argument("--years", type=int, default=10)
+    p.add_argument("--backends", nargs="+", choices=BACKENDS, default=BACKENDS)
+
+    p = sub.add_parser("shards", help="sharded query scan time by number of worker processes")
+    p.add_argument("--tickers", type=int, default=5000)
+    p.add_argument("--years", type=int, default=5)
+    p.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    p.add_argument("--query", default="rsi < 40 and ret_1y > 0 and not macd_bearish")
+
+    p = sub.add_parser("startup", help="import time and a warm-cache, no-chart screen in a fresh process")
+    p.add_argument("--screen", choices=list(SCREENS), default="rsi")
+    p.add_argument("--runs", type=int, default=3)
+
+    # Internal: the child processes behind "screens" and "memory"
+    p = sub.add_parser("run-screens")
+    p.add_argument("--universe", default="nifty500")
+    p.add_argument("--screens", nargs="+", choices=list(SCREENS), default=list(SCREENS))
+    p.add_argument("--charts", choices=["all", "top", "none"], default="top")
+    p.add_argument("--workers", type=int, default=None)
+    p.add_argument("--compact", action="store_true")
+
+    p = sub.add_parser("measure")
+    p.add_argument("backend", choices=BACKENDS)
+    p.add_argument("--tickers", type=int, default=5000)
+    p.add_argument("--years", type=int, default=10)
+
+    p = sub.add_parser("write-store")
+    p.add_argument("folder")
+    p.add_argument("--tickers", type=int, default=5000)
+    p.add_argument("--years", type=int, default=10)
+
+    args = parser.parse_args(argv)
+    if args.command == "screens":
+        df = screens_report(args.screens, args.universe, args.charts, args.workers, args.compact, args.isolate)
+        if args.json:
+            df.to_json(args.json, orient="records", indent=2)
+    elif args.command == "run-screens":
+        rows = run_screens(args.screens, args.universe, args.charts, args.workers, args.compact)
+        print(json.dumps(rows))
+    elif args.command == "shards":
+        shards_report(args.tickers, args.years, args.workers, args.query)
+    elif args.command == "startup":
+        startup_report(args.screen, args.runs)
+    elif args.command == "memory":
+        memory_report(args.tickers, args.years, args.backends)
+    elif args.command == "measure":
+        print(json.dumps(measure(args.backend, args.tickers, args.years)))
+    else:
+        write_store(args.folder, args.tickers, args.years)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
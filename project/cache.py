@@ -0,0 +1,260 @@
+import importlib.util
+import os
+import json
+import time
+import pandas as pd
+from data import trim_period, normalize_panel, get_ticker_df, panel_tickers
+from adjust import ADJ_CLOSE, adjust_frame, factor_events, with_adj_close
+from instrument import recorder
+from nse_calendar import nse, session_days
+
+# On-disk OHLCV store: one file of raw (unadjusted) bars per ticker under
+# <root>/<interval>/, plus an index.json per folder recording the cached range,
+# the earliest start the network has been asked for (covered_from; a ticker
+# listed later has no bars before its listing, so the first bar can't tell),
+# when the ticker was last checked against the network and its corporate-action
+# factor table. Adjusted and unadjusted reads come from the same raw file.
+#
+# A top-up re-fetches the last cached bars too. If they come back at another
+# price, a split or bonus has rescaled the provider's history since they were
+# cached; the step goes into the factor table as of the first fetched bar, so
+# the older cached bars are adjusted onto the new scale.
+
+# Parquet when pyarrow is installed; it is only imported once a file is read or written
+FILE_EXT = "parquet" if importlib.util.find_spec("pyarrow") is not None else "pkl"
+
+# How long a cached series is trusted before a top-up fetch, in seconds
+STALE_AFTER = {
+    "1d": 6 * 60 * 60,
+    "1wk": 24 * 60 * 60,
+    "1mo": 24 * 60 * 60,
+    "5m": 5 * 60,
+    "15m": 15 * 60,
+    "1h": 60 * 60,
+}
+
+# Entries without covered_from: cached history may start a few days after the
+# requested start session
+START_TOLERANCE = pd.Timedelta(days=7)
+
+# Price moves between the cached and re-fetched bars smaller than this are
+# provider revisions, not a rescale
+RESCALE_STEP = 0.01
+
+
+def wanted_start(period, start=None):
+    # First session a request needs (None for "max")
+    if start is not None:
+        return pd.Timestamp(start).normalize()
+    return nse.window_start(period)
+
+
+def rescale_step(old, new):
+    # Multiplier that puts the cached bars on the scale of a fresh download of
+    # the same days, or None when they agree. The last cached bar is left out:
+    # it may have been stored mid-session
+    days = old.index[:-1].intersection(new.index)
+    ratio = (new.loc[days, "Close"] / old.loc[days, "Close"]).dropna()
+    ratio = ratio[ratio > 0]
+    if not len(ratio):
+        return None
+    step = float(ratio.median())
+    return step if abs(step - 1) > RESCALE_STEP else None
+
+
+class PriceCache:
+    def __init__(self, root="price_cache"):
+        self.root = root
+        self.indexes = {}
+        self.stats = {"hits": 0, "misses": 0, "topups": 0, "network_calls": 0}
+
+    def _folder(self, interval):
+        folder = os.path.join(self.root, interval)
+        os.makedirs(folder, exist_ok=True)
+        return folder
+
+    def index(self, interval):
+        folder = self._folder(interval)
+        if folder not in self.indexes:
+            path = os.path.join(folder, "index.json")
+            if os.path.exists(path):
+                with open(path) as f:
+                    self.indexes[folder] = json.load(f)
+            else:
+                self.indexes[folder] = {}
+        return self.indexes[folder]
+
+    def save_index(self, interval):
+        folder = self._folder(interval)
+        with open(os.path.join(folder, "index.json"), "w") as f:
+            json.dump(self.indexes.get(folder, {}), f)
+
+    def load(self, ticker, interval):
+        path = os.path.join(self._folder(interval), f"{ticker}.{FILE_EXT}")
+        if not os.path.exists(path):
+            return None
+        if FILE_EXT == "parquet":
+            return pd.read_parquet(path)
+        return pd.read_pickle(path)
+
+    def store(self, ticker, df, interval, full=False):
+        if df is None or df.empty:
+            return
+        path = os.path.join(self._folder(interval), f"{ticker}.{FILE_EXT}")
+        if FILE_EXT == "parquet":
+            df.to_parquet(path)
+        else:
+            df.to_pickle(path)
+
+        entry = self.index(interval).setdefault(ticker, {})
+        entry["first"] = str(df.index[0])
+        entry["last"] = str(df.index[-1])
+        entry["rows"] = len(df)
+        entry["checked"] = time.time()
+        entry["full"] = entry.get("full", False) or full
+
+    def merge(self, ticker, new, interval):
+        # Raw bars go to the ticker file, corporate actions to its factor table
+        events = factor_events(new)
+        if len(events):
+            self._add_factors(ticker, interval, {str(day.date()): float(m) for day, m in events.items()})
+        new = new.drop(columns=ADJ_CLOSE, errors="ignore")
+
+        old = self.load(ticker, interval)
+        if old is not None and not old.empty:
+            step = rescale_step(old, new)
+            if step is not None:
+                day = str(session_days(new.index[:1])[0].date())
+                table = self.index(interval)[ticker].get("factors", {})
+                self._add_factors(ticker, interval, {day: table.get(day, 1.0) * step})
+            new = pd.concat([old, new])
+            new = new[~new.index.duplicated(keep="last")].sort_index()
+        self.store(ticker, new, interval)
+        return new
+
+    def _add_factors(self, ticker, interval, events):
+        self.index(interval).setdefault(ticker, {}).setdefault("factors", {}).update(events)
+
+    def factors(self, ticker, interval):
+        # ex-date -> multiplier for the bars before it
+        table = self.index(interval).get(ticker, {}).get("factors", {})
+        return pd.Series(list(table.values()), index=pd.DatetimeIndex(list(table)), dtype=float)
+
+    def read(self, ticker, interval, auto_adjust):
+        # Raw bars with the factor table applied, or reported as Adj Close like a raw download
+        df = self.load(ticker, interval)
+        if df is None or df.empty:
+            return df
+        events = self.factors(ticker, interval)
+        return adjust_frame(df, events) if auto_adjust else with_adj_close(df, events)
+
+    def covered(self, ticker, interval, wanted):
+        # Record that the network was asked for bars from `wanted` on
+        entry = self.index(interval).get(ticker)
+        if entry is None or wanted is None:
+            return
+        if "covered_from" not in entry or wanted < pd.Timestamp(entry["covered_from"]):
+            entry["covered_from"] = str(wanted.date())
+
+    def status(self, ticker, period, interval, start=None):
+        # Returns "hit", "stale" or "miss" for a requested range
+        entry = self.index(interval).get(ticker)
+        if not entry:
+            return "miss"
+
+        wanted = wanted_start(period, start)
+        if wanted is None:
+            if not entry.get("full"):
+                return "miss"
+        elif "covered_from" in entry:
+            if pd.Timestamp(entry["covered_from"]) > wanted:
+                return "miss"
+        else:
+            first = pd.Timestamp(entry["first"])
+            if first.tz is not None:
+                first = first.tz_localize(None)
+            if first > wanted + START_TOLERANCE:
+                return "miss"
+
+        max_age = STALE_AFTER.get(interval, 60 * 60)
+        if time.time() - entry.get("checked", 0) > max_age:
+            return "stale"
+        return "hit"
+
+    def summary(self):
+        total = self.stats["hits"] + self.stats["misses"] + self.stats["topups"]
+        rate = (self.stats["hits"] / total * 100) if total else 0
+        return (f"💾 Cache: {self.stats['hits']} hits, {self.stats['topups']} top-ups, "
+                f"{self.stats['misses']} misses ({rate:.1f}% hit rate), "
+                f"{self.stats['network_calls']} network calls")
+
+
+class CachedProvider:
+    # Wraps another provider; only bars missing from the cache go to the network.
+    # The network is always asked for raw prices, whatever auto_adjust says.
+    def __init__(self, provider, cache=None):
+        self.provider = provider
+        self.cache = cache or PriceCache()
+
+    def errors(self, tickers):
+        errors = getattr(self.provider, "errors", None)
+        return errors(tickers) if errors else []
+
+    def _fetch(self, tickers, **kwargs):
+        self.cache.stats["network_calls"] += 1
+        return normalize_panel(self.provider.download(tickers, auto_adjust=False, **kwargs), tickers)
+
+    def download(self, tickers, period=None, interval="1d", start=None, end=None, auto_adjust=True):
+        cache = self.cache
+        misses, stale = [], {}
+
+        for ticker in tickers:
+            state = cache.status(ticker, period, interval, start)
+            if state == "miss":
+                misses.append(ticker)
+            elif state == "stale":
+                last = cache.index(interval)[ticker]["last"]
+                stale.setdefault(last, []).append(ticker)
+            else:
+                cache.stats["hits"] += 1
+
+        # Full download for tickers we have never seen (or not far enough back)
+        if misses:
+            cache.stats["misses"] += len(misses)
+            fetched = self._fetch(misses, period=period, interval=interval,
+                                  start=start, end=None)
+            wanted = wanted_start(period, start)
+            for ticker in panel_tickers(fetched):
+                df = get_ticker_df(fetched, ticker).dropna(how="all")
+                cache.merge(ticker, df, interval)
+                cache.covered(ticker, interval, wanted)
+                if period == "max":
+                    cache.index(interval)[ticker]["full"] = True
+
+        # Top-up: only bars from the session before the last cached date onwards,
+        # so at least one complete cached bar is compared with the fresh one
+        for last, group in stale.items():
+            cache.stats["topups"] += len(group)
+            since = nse.previous_session(session_days(pd.DatetimeIndex([last]))[0] - pd.Timedelta(days=1))
+            fetched = self._fetch(group, period=None, interval=interval,
+                                  start=since.date(), end=None)
+            for ticker in group:
+                df = get_ticker_df(fetched, ticker).dropna(how="all")
+                if df.empty:
+                    cache.index(interval)[ticker]["checked"] = time.time()
+                    continue
+                cache.merge(ticker, df, interval)
+
+        cache.save_index(interval)
+
+        frames = {}
+        for ticker in tickers:
+            start_read = time.perf_counter()
+            df = cache.read(ticker, interval, auto_adjust)
+            recorder.observe("cache_read", [ticker], time.perf_counter() - start_read)
+            if df is None or df.empty:
+                continue
+            frames[ticker] = trim_period(df, period, start, end)
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, axis=1)
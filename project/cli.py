@@ -0,0 +1,315 @@
+import argparse
+import os
+import sys
+from datetime import datetime
+import main as screener
+import render
+from snapshot import UniverseSnapshot
+from shard import ShardedScan
+from query import run_query
+import history
+import validate
+import backtest
+import sweep
+import live
+from instrument import recorder
+from resample import TIMEFRAMES
+
+# Non-interactive entry point for scheduled runs.
+#
+#   python cli.py --no-charts --format parquet rsi --mode low
+#   python cli.py --top-charts 5 rsi --mode low + gap --direction up --threshold 3 + macd
+#
+# Screens separated by '+' run in one process over a single data load.
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="screener", description="Nifty 500 stock screener")
+    parser.add_argument("--tickers", default="nifty_500_list.csv", help="CSV file with a Symbol column")
+    parser.add_argument("--cache-dir", default="price_cache", help="local price cache folder")
+    parser.add_argument("--output", default="results", help="folder for result files")
+    parser.add_argument("--format", choices=["csv", "json", "parquet"], default="csv")
+    charts = parser.add_mutually_exclusive_group()
+    charts.add_argument("--no-charts", action="store_true", help="skip chart rendering")
+    charts.add_argument("--top-charts", type=int, metavar="N", help="only render charts for the top N hits")
+    parser.add_argument("--workers", type=int, default=None, help="chart rendering processes (0 = inline)")
+    parser.add_argument("--redraw", action="store_true", help="redraw charts even if their data is unchanged")
+    parser.add_argument("--chart-cache-mb", type=float, default=256, help="disk budget for chart files")
+    parser.add_argument("--compact", action="store_true", help="keep price history as float32 arrays (large universes)")
+    parser.add_argument("--shards", type=int, metavar="N",
+                        help="run query screens in N processes over a memory-mapped price store")
+    parser.add_argument("--metrics", metavar="PATH", help="export timings as JSON (.json) or Prometheus text (.prom)")
+    parser.add_argument("--history-db", default=history.DB_FILE, help="SQLite file every screen run is appended to")
+
+    sub = parser.add_subparsers(dest="screen", required=True)
+
+    p = sub.add_parser("strong", help="strong 5Y return + weak 1Y filter")
+    p.add_argument("--min-5y", type=float, default=50.0)
+    p.add_argument("--max-1y", type=float, default=-5.0)
+
+    p = sub.add_parser("movers", help="top daily gainers/losers")
+    p.add_argument("--top", type=int, default=10)
+    p.add_argument("--direction", choices=["gainers", "losers"], default="gainers")
+
+    p = sub.add_parser("heatmap", help="weekly %% change heatmap")
+    p.add_argument("--group", choices=["sector", "alpha"], help="treemap grouped by sector or first letter")
+    p.add_argument("--sectors", default="sectors.csv", help="CSV with Symbol and Sector columns")
+    sub.add_parser("high52", help="stocks at their 52-week high")
+    sub.add_parser("low52", help="stocks at their 52-week low")
+
+    p = sub.add_parser("rsi", help="RSI oversold/overbought")
+    p.add_argument("--mode", choices=["low", "high"], default="low")
+    p.add_argument("--timeframe", choices=TIMEFRAMES, default="1d", help="daily, weekly or monthly bars")
+
+    p = sub.add_parser("gap", help="gap up/down at the open")
+    p.add_argument("--direction", choices=["up", "down"], default="up")
+    p.add_argument("--threshold", type=float, default=2.0)
+
+    p = sub.add_parser("macd", help="MACD signal-line crossover")
+    p.add_argument("--type", choices=["bullish", "bearish"], default="bullish")
+    p.add_argument("--timeframe", choices=TIMEFRAMES, default="1d", help="daily, weekly or monthly bars")
+
+    p = sub.add_parser("returns", help="return over N years")
+    p.add_argument("--years", type=int, default=3)
+
+    p = sub.add_parser("query", help='composite screen, e.g. "rsi < 30 and near_52w_low and ret_5y > 50"')
+    p.add_argument("expression")
+    p.add_argument("--name", default="query", help="label used for the result file")
+
+    p = sub.add_parser("live", help="intraday gainers/losers, gaps and RSI as 5m bars arrive")
+    source = p.add_mutually_exclusive_group()
+    source.add_argument("--replay", metavar="PATH", help="replay recorded bars (.csv/.parquet) instead of polling")
+    source.add_argument("--record", metavar="PATH", help="save today's 5m bars for later replay and exit")
+    p.add_argument("--top", type=int, default=10)
+    p.add_argument("--gap", type=float, default=2.0, help="gap threshold %%")
+    p.add_argument("--poll", type=float, default=60, help="seconds between polls")
+    p.add_argument("--delay", type=float, default=0.0, help="seconds between replayed bars")
+
+    p = sub.add_parser("indicators", help="latest RSI, MACD and 52-week range from the saved incremental state")
+    p.add_argument("--state", default="indicator_state.pkl", help="file the per-ticker state is kept in")
+
+    p = sub.add_parser("backtest", help="how a screen's signal performed over the loaded history")
+    p.add_argument("--signal", choices=list(backtest.SIGNALS), default="rsi_low")
+    p.add_argument("--years", type=int, default=10)
+    p.add_argument("--hold", type=int, nargs="+", default=list(backtest.HOLDS), help="holding periods in sessions")
+    p.add_argument("--fresh", action="store_true", help="only the first day of consecutive signals")
+
+    p = sub.add_parser("sweep", help="hit counts for every combination of screen parameters")
+    p.add_argument("--screens", nargs="+", choices=list(sweep.SWEEPS), default=list(sweep.SWEEPS))
+    grids = sweep.GRIDS
+    p.add_argument("--rsi-periods", type=int, nargs="+", default=grids["rsi"]["periods"])
+    p.add_argument("--rsi-low", type=float, nargs="+", default=grids["rsi"]["lows"])
+    p.add_argument("--rsi-high", type=float, nargs="+", default=grids["rsi"]["highs"])
+    p.add_argument("--gap-thresholds", type=float, nargs="+", default=grids["gap"]["thresholds"])
+    p.add_argument("--macd-fast", type=int, nargs="+", default=grids["macd"]["fasts"])
+    p.add_argument("--macd-slow", type=int, nargs="+", default=grids["macd"]["slows"])
+    p.add_argument("--macd-signal", type=int, nargs="+", default=grids["macd"]["signals"])
+    p.add_argument("--min-5y", type=float, nargs="+", default=grids["strong"]["min_5y"])
+    p.add_argument("--max-1y", type=float, nargs="+", default=grids["strong"]["max_1y"])
+    p.add_argument("--years", type=int, nargs="+", default=grids["returns"]["years"])
+    p.add_argument("--min-return", type=float, nargs="+", default=grids["returns"]["min_returns"])
+
+    p = sub.add_parser("history", help="past screen hits, e.g. rsi_low three sessions in a row")
+    p.add_argument("--screen", dest="label", help="screen label as in result file names (rsi_low, high52, gap_up, ...)")
+    p.add_argument("--ticker")
+    p.add_argument("--days", type=int, help="only the last N trading sessions")
+    p.add_argument("--streak", type=int, metavar="N", help="tickers that hit --screen N sessions in a row")
+    p.add_argument("--current", action="store_true", help="with --streak, only streaks still running")
+    p.add_argument("--sql", help="run a SQL query against the runs / hits / hit_values tables")
+
+    p = sub.add_parser("quarantine", help="tickers kept out of scans by the data checks, with reasons")
+    p.add_argument("--warnings", action="store_true", help="also list tickers with non-blocking warnings")
+    p.add_argument("--release", nargs="+", metavar="TICKER", help="take tickers out of quarantine")
+
+    return parser
+
+
+def split_screens(argv):
+    groups = [[]]
+    for arg in argv:
+        if arg == "+":
+            groups.append([])
+        else:
+            groups[-1].append(arg)
+    return [g for g in groups if g]
+
+
+def run_screen(args, tickers, snapshot, scan=None):
+    # Quarantined tickers (see validate.py) are left out up front
+    tickers = snapshot.usable(tickers)
+    if args.screen == "strong":
+        return screener.strong_5y_weak_1y(tickers, args.min_5y, args.max_1y, snapshot=snapshot)
+    if args.screen == "movers":
+        direction = "1" if args.direction == "gainers" else "2"
+        return screener.top_daily_movers(tickers, args.top, direction, snapshot=snapshot)
+    if args.screen == "heatmap":
+        return screener.generate_nifty500_weekly_heatmap(tickers, snapshot, args.group, args.sectors)
+    if args.screen == "high52":
+        return screener.screen_52_week_high(tickers, snapshot)
+    if args.screen == "low52":
+        return screener.screen_52_week_low(tickers, snapshot)
+    if args.screen == "rsi":
+        return screener.screen_rsi_stocks(tickers, args.mode, snapshot=snapshot, timeframe=args.timeframe)
+    if args.screen == "gap":
+        choice = "1" if args.direction == "up" else "2"
+        return screener.screen_gap_up_down(tickers, args.threshold, choice, snapshot=snapshot)
+    if args.screen == "macd":
+        return screener.screen_macd_crossover(tickers, args.type, snapshot=snapshot, timeframe=args.timeframe)
+    if args.screen == "returns":
+        return screener.plot_return_over_n_years(tickers, args.years, snapshot=snapshot)
+    if args.screen == "query":
+        return run_query(tickers, args.expression, snapshot, args.name, scan)
+    if args.screen == "live":
+        if args.record:
+            print(f"💾 {live.record_session(tickers, args.record)} bars recorded to {args.record}")
+            return None
+        if args.replay:
+            source = live.ReplaySource.from_file(args.replay, delay=args.delay)
+        else:
+            source = live.PollingSource(tickers, poll_every=args.poll)
+        return live.run_live(tickers, source, snapshot, args.top, args.gap)
+    if args.screen == "indicators":
+        return indicator_table(tickers, snapshot, args.state)
+    if args.screen == "backtest":
+        return backtest.run_backtest(tickers, args.signal, args.years, args.hold, args.fresh, snapshot)
+    if args.screen == "history":
+        return query_history(args)
+    if args.screen == "quarantine":
+        return show_quarantine(args)
+    if args.screen == "sweep":
+        return sweep.run_sweep(tickers, sweep_grids(args), snapshot)
+
+
+def sweep_grids(args):
+    grids = {
+        "rsi": {"periods": args.rsi_periods, "lows": args.rsi_low, "highs": args.rsi_high},
+        "gap": {"thresholds": args.gap_thresholds},
+        "macd": {"fasts": args.macd_fast, "slows": args.macd_slow, "signals": args.macd_signal},
+        "strong": {"min_5y": args.min_5y, "max_1y": args.max_1y},
+        "returns": {"years": args.years, "min_returns": args.min_return},
+    }
+    return {screen: grids[screen] for screen in args.screens}
+
+
+def indicator_table(tickers, snapshot, path):
+    # Only bars newer than the saved state are fed, so daily reruns stay cheap
+    df = snapshot.indicator_state(path).metrics().reindex(tickers).dropna(subset=["Close"])
+    df = df.rename_axis("Ticker").reset_index()
+    shown = df.drop(columns="Date").round(2)
+    shown = shown.astype(object).where(shown.notna(), "")
+    print(shown.to_string(index=False) if not df.empty else "❌ No indicator state.")
+    return df
+
+
+def show_quarantine(args):
+    store = validate.quarantine
+    if args.release:
+        store.release(args.release)
+        store.save()
+        print(f"🔓 Released {', '.join(args.release)}")
+    df = store.frame(warnings=args.warnings)
+    print(df.to_string(index=False) if not df.empty else "✅ No tickers in quarantine.")
+    return df
+
+
+def query_history(args):
+    store = history.store
+    if args.sql:
+        df = store.sql(args.sql)
+    elif args.streak:
+        if not args.label:
+            raise ValueError("--streak needs --screen")
+        df = store.streaks(args.label, args.streak, days=args.days, current=args.current)
+    else:
+        df = store.hits(args.label, args.ticker, days=args.days)
+    print(store.summary())
+    print(df.to_string(index=False) if not df.empty else "❌ No matching hits.")
+    return df
+
+
+def timeframe_suffix(args):
+    return "" if args.timeframe == "1d" else f"_{args.timeframe}"
+
+
+def screen_label(args):
+    extra = {
+        "movers": lambda: args.direction,
+        "rsi": lambda: args.mode + timeframe_suffix(args),
+        "gap": lambda: args.direction,
+        "macd": lambda: args.type + timeframe_suffix(args),
+        "returns": lambda: f"{args.years}y",
+        "query": lambda: args.name,
+        "backtest": lambda: f"{args.signal}_{args.years}y",
+        "history": lambda: f"{args.label or 'all'}_streak{args.streak}" if args.streak else args.label or "all",
+    }.get(args.screen)
+    return f"{args.screen}_{extra()}" if extra else args.screen
+
+
+def write_results(df, name, folder, fmt):
+    os.makedirs(folder, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    path = os.path.join(folder, f"{name}_{stamp}.{fmt}")
+    if fmt == "csv":
+        df.to_csv(path, index=False)
+    elif fmt == "json":
+        df.to_json(path, orient="records", indent=2)
+    else:
+        df.to_parquet(path, index=False)
+    return path
+
+
+def main(argv=None):
+    parser = build_parser()
+    groups = split_screens(sys.argv[1:] if argv is None else argv)
+    if not groups:
+        parser.print_help()
+        return 2
+
+    # Global options come with the first screen; later screens only take their own
+    for group in groups[1:]:
+        if group[0].startswith("-"):
+            parser.error(f"global options go before the first screen, not after '+': {' '.join(group)}")
+    first = parser.parse_args(groups[0])
+    screens = [first] + [parser.parse_args(group) for group in groups[1:]]
+    if first.top_charts is not None and first.top_charts < 1:
+        parser.error("--top-charts needs N >= 1 (use --no-charts for no charts)")
+
+    if first.no_charts:
+        render.chart_settings["mode"] = "none"
+    elif first.top_charts:
+        render.chart_settings.update(mode="top", top_n=first.top_charts)
+    render.chart_settings.update(workers=first.workers, redraw=first.redraw, max_mb=first.chart_cache_mb)
+
+    screener.setup_data(first.cache_dir, first.history_db)
+    tickers = screener.load_tickers(first.tickers)
+    snapshot = UniverseSnapshot(tickers, compact=first.compact)
+    scan = ShardedScan(snapshot, first.shards) if first.shards else None
+
+    status = 0
+    try:
+        for args in screens:
+            try:
+                df = run_screen(args, tickers, snapshot, scan)
+            except Exception as e:
+                print(f"❌ {args.screen} failed: {e}")
+                status = 1
+                continue
+            if df is None:
+                continue
+            path = write_results(df, screen_label(args), first.output, first.format)
+            print(f"💾 {len(df)} rows written to {path}")
+    finally:
+        if scan is not None:
+            scan.close()
+
+    print(recorder.summary())
+    print(screener.price_cache.summary())
+    if screener.network.stats["requests"]:
+        print(screener.network.summary())
+    if first.metrics:
+        print(f"📈 Metrics written to {recorder.export(first.metrics)}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,227 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+from data import FIELDS, panel_tickers
+from adjust import ADJ_CLOSE, PRICE_FIELDS
+from nse_calendar import nse
+
+# Memory-compact price store for long lookbacks and large universes.
+#
+# Prices live in one float32 array shaped (field, ticker, day), so each
+# ticker's series is a contiguous slice, and the dates are a single shared
+# int32 calendar (days since 1970-01-01). The arrays can be saved as .npy files
+# and reopened memory-mapped, so a scan only reads the pages it touches.
+# Daily bars only: the calendar has one entry per session.
+#
+# Prices are raw; an optional float32 (ticker, day) factor array holds the
+# corporate-action multipliers and adjusted() applies them on demand.
+
+EPOCH = np.datetime64("1970-01-01", "D")
+
+
+def to_day_numbers(index):
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return (index.values.astype("datetime64[D]") - EPOCH).astype(np.int32)
+
+
+def _last_valid(values, lag=0):
+    # Last non-NaN value of every row of a tickers x days array, scanning back
+    # with boolean masks only (no int64 cumsum the size of the array)
+    out = np.full(len(values), np.nan)
+    if values.shape[1] == 0:
+        return out
+    rows = np.arange(len(values))
+    valid = ~np.isnan(values)
+    for _ in range(lag + 1):
+        found = valid.any(axis=1)
+        cols = values.shape[1] - 1 - valid[:, ::-1].argmax(axis=1)
+        valid[rows[found], cols[found]] = False
+    out[found] = values[rows, cols][found]
+    return out
+
+
+def _first_valid(values):
+    out = np.full(len(values), np.nan)
+    if values.shape[1] == 0:
+        return out
+    valid = ~np.isnan(values)
+    found = valid.any(axis=1)
+    out[found] = values[np.arange(len(values)), valid.argmax(axis=1)][found]
+    return out
+
+
+class CompactPanel:
+    def __init__(self, tickers, calendar, values, factors=None):
+        self.tickers = list(tickers)
+        self.positions = {t: i for i, t in enumerate(self.tickers)}
+        self.calendar = calendar
+        self.values = values
+        self.factors = factors
+
+    @classmethod
+    def from_panel(cls, panel):
+        if panel.empty:
+            return cls([], np.empty(0, dtype=np.int32), np.empty((len(FIELDS), 0, 0), dtype=np.float32))
+        calendar = to_day_numbers(panel.index)
+        if (np.diff(calendar) <= 0).any():
+            raise ValueError("CompactPanel needs one bar per day (daily interval)")
+        tickers = panel_tickers(panel)
+        values = np.full((len(FIELDS), len(tickers), len(calendar)), np.nan, dtype=np.float32)
+        for f, field in enumerate(FIELDS):
+            if field in panel.columns.get_level_values("Field"):
+                matrix = panel.xs(field, axis=1, level="Field").reindex(columns=tickers)
+                values[f] = matrix.to_numpy(dtype=np.float32).T
+        factors = None
+        if ADJ_CLOSE in panel.columns.get_level_values("Field"):
+            adj = panel.xs(ADJ_CLOSE, axis=1, level="Field").reindex(columns=tickers).to_numpy(dtype=np.float32).T
+            with np.errstate(invalid="ignore", divide="ignore"):
+                factors = np.nan_to_num(adj / values[FIELDS.index("Close")], nan=1.0, posinf=1.0, neginf=1.0)
+        return cls(tickers, calendar, values, factors)
+
+    @classmethod
+    def allocate(cls, folder, tickers, calendar):
+        # Disk-backed empty store that can be filled ticker by ticker
+        os.makedirs(folder, exist_ok=True)
+        shape = (len(FIELDS), len(tickers), len(calendar))
+        values = np.lib.format.open_memmap(os.path.join(folder, "values.npy"), mode="w+",
+                                           dtype=np.float32, shape=shape)
+        values[:] = np.nan
+        store = cls(tickers, np.asarray(calendar, dtype=np.int32), values)
+        store._write_meta(folder)
+        return store
+
+    def _write_meta(self, folder):
+        np.save(os.path.join(folder, "calendar.npy"), self.calendar)
+        with open(os.path.join(folder, "tickers.json"), "w") as f:
+            json.dump({"tickers": self.tickers, "fields": FIELDS}, f)
+
+    def save(self, folder):
+        os.makedirs(folder, exist_ok=True)
+        np.save(os.path.join(folder, "values.npy"), self.values)
+        factors_path = os.path.join(folder, "factors.npy")
+        if self.factors is not None:
+            np.save(factors_path, self.factors)
+        elif os.path.exists(factors_path):
+            os.remove(factors_path)
+        self._write_meta(folder)
+
+    @classmethod
+    def open(cls, folder, mmap=True):
+        with open(os.path.join(folder, "tickers.json")) as f:
+            meta = json.load(f)
+        values = np.load(os.path.join(folder, "values.npy"), mmap_mode="r" if mmap else None)
+        calendar = np.load(os.path.join(folder, "calendar.npy"))
+        factors_path = os.path.join(folder, "factors.npy")
+        factors = np.load(factors_path, mmap_mode="r" if mmap else None) if os.path.exists(factors_path) else None
+        return cls(meta["tickers"], calendar, values, factors)
+
+    @property
+    def empty(self):
+        return not self.tickers or not len(self.calendar)
+
+    @property
+    def dates(self):
+        return pd.DatetimeIndex(EPOCH + self.calendar.astype("timedelta64[D]"))
+
+    def nbytes(self):
+        return self.values.nbytes + self.calendar.nbytes + (0 if self.factors is None else self.factors.nbytes)
+
+    # -- views ------------------------------------------------------------
+
+    def view(self, ticker, field="Close"):
+        return self.values[FIELDS.index(field), self.positions[ticker]]
+
+    def matrix(self, field="Close"):
+        # tickers x days
+        return self.values[FIELDS.index(field)]
+
+    def series(self, ticker, field="Close"):
+        return pd.Series(self.view(ticker, field), index=self.dates, name=ticker, copy=False)
+
+    def trim(self, period=None, start=None, end=None):
+        # Same window rules as data.trim_period, returned as a view on the same arrays
+        if self.empty:
+            return self
+        days = slice(*nse.window_bounds(self.dates, period, start, end))
+        factors = None if self.factors is None else self.factors[:, days]
+        return CompactPanel(self.tickers, self.calendar[days], self.values[:, :, days], factors)
+
+    def select(self, tickers):
+        # A view when the tickers are one run of the store's order, else a copy
+        rows = [self.positions[t] for t in tickers if t in self.positions]
+        if rows and rows == list(range(rows[0], rows[0] + len(rows))):
+            return self.block(rows[0], rows[0] + len(rows))
+        factors = None if self.factors is None else self.factors[rows]
+        return CompactPanel([self.tickers[i] for i in rows], self.calendar, self.values[:, rows], factors)
+
+    def block(self, lo, hi):
+        # Tickers lo:hi as a view (no copy, even when memory-mapped)
+        factors = None if self.factors is None else self.factors[lo:hi]
+        return CompactPanel(self.tickers[lo:hi], self.calendar, self.values[:, lo:hi], factors)
+
+    def adjusted(self):
+        # Copy with Open/High/Low/Close multiplied by the factors; select() and
+        # trim() first so only the rows and days needed are copied
+        if self.factors is None:
+            return self
+        values = np.array(self.values)
+        prices = [FIELDS.index(f) for f in PRICE_FIELDS]
+        values[prices] *= self.factors
+        return CompactPanel(self.tickers, self.calendar, values)
+
+    # -- pandas views for existing screen code ----------------------------
+
+    def frame(self, ticker):
+        # One ticker's OHLCV, same shape as data.get_ticker_df
+        if ticker not in self.positions:
+            return pd.DataFrame()
+        block = self.values[:, self.positions[ticker]].T
+        return pd.DataFrame(block, index=self.dates, columns=list(FIELDS)).dropna(how="all")
+
+    def field_frame(self, field="Close"):
+        # dates x tickers, same shape as data.field_matrix
+        return pd.DataFrame(self.matrix(field).T, index=self.dates, columns=self.tickers)
+
+    def to_panel(self):
+        if self.empty:
+            return pd.DataFrame()
+        columns = pd.MultiIndex.from_product([self.tickers, FIELDS], names=["Ticker", "Field"])
+        block = self.values.transpose(2, 1, 0).reshape(len(self.calendar), -1).astype(np.float64)
+        return pd.DataFrame(block, index=self.dates, columns=columns)
+
+    # -- vectorized computations on the raw arrays ------------------------
+
+    def last_valid(self, field="Close", lag=0):
+        return pd.Series(_last_valid(self.matrix(field), lag), index=self.tickers)
+
+    def first_valid(self, field="Close"):
+        return pd.Series(_first_valid(self.matrix(field)), index=self.tickers)
+
+    def bar_count(self, field="Close"):
+        return pd.Series((~np.isnan(self.matrix(field))).sum(axis=1), index=self.tickers)
+
+    def period_return(self):
+        first = self.first_valid()
+        first = first.where(first != 0)
+        return (self.last_valid() - first) / first * 100
+
+    def rsi(self, period=14, chunk=500):
+        # Latest value of the simple-moving-average RSI (same as main.calculate_rsi),
+        # computed a block of tickers at a time to bound the float64 temporaries
+        close = self.matrix("Close")
+        out = np.full(len(self.tickers), np.nan)
+        for lo in range(0, len(self.tickers), chunk):
+            block = close[lo:lo + chunk].astype(np.float64)
+            delta = np.diff(block, axis=1, prepend=np.nan)
+            gain = np.where(delta > 0, delta, 0).cumsum(axis=1)
+            loss = np.where(delta < 0, -delta, 0).cumsum(axis=1)
+            gain[:, period:] -= gain[:, :-period].copy()
+            loss[:, period:] -= loss[:, :-period].copy()
+            with np.errstate(divide="ignore", invalid="ignore"):
+                rsi = 100 - 100 / (1 + gain / loss)
+            rsi[:, :period - 1] = np.nan
+            out[lo:lo + chunk] = _last_valid(rsi)
+        return pd.Series(out, index=self.tickers)
@@ -0,0 +1,225 @@
+import os
+import zlib
+import numpy as np
+import pandas as pd
+from instrument import stage
+from nse_calendar import nse
+from adjust import ADJ_CLOSE, adjust_frame, factor_events, with_adj_close
+
+# Bulk price download layer shared by every screener.
+#
+# A "panel" is one wide DataFrame indexed by date whose columns are a
+# (Ticker, Field) MultiIndex, e.g. panel["RELIANCE.NS"]["Close"].
+
+FIELDS = ["Open", "High", "Low", "Close", "Volume"]
+CHUNK_SIZE = 100
+
+
+class YahooProvider:
+    def download(self, tickers, period=None, interval="1d", start=None, end=None, auto_adjust=True):
+        # yfinance is imported on the first download, i.e. only on cache misses
+        import yfinance as yf
+        return yf.download(
+            tickers,
+            period=period,
+            interval=interval,
+            start=start,
+            end=end,
+            group_by="ticker",
+            auto_adjust=auto_adjust,
+            progress=False,
+            threads=True,
+        )
+
+
+class LocalProvider:
+    # Reads <folder>/<ticker>.csv fixture files so screens can run offline.
+    def __init__(self, folder):
+        self.folder = folder
+
+    def download(self, tickers, period=None, interval="1d", start=None, end=None, auto_adjust=True):
+        frames = {}
+        for ticker in tickers:
+            path = os.path.join(self.folder, f"{ticker}.csv")
+            if not os.path.exists(path):
+                continue
+            df = pd.read_csv(path, index_col=0, parse_dates=True)
+            if auto_adjust and ADJ_CLOSE in df.columns:
+                df = adjust_frame(df, factor_events(df))
+            frames[ticker] = trim_period(df, period, start, end)
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, axis=1)
+
+
+def synthetic_ohlcv(rng, count, bars, volatility=0.02):
+    # Random-walk OHLCV for `count` tickers as a float (field, ticker, bar) array
+    drift = rng.normal(0.0004, 0.0003, size=(count, 1))
+    steps = rng.normal(0, volatility, size=(count, bars)) + drift
+    close = rng.uniform(50, 3000, size=(count, 1)) * np.exp(np.cumsum(steps, axis=1))
+    open_ = close * (1 + rng.normal(0, volatility / 4, size=close.shape))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, volatility / 4, size=close.shape)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, volatility / 4, size=close.shape)))
+    volume = rng.integers(10_000, 5_000_000, size=close.shape).astype(float)
+    return np.stack([open_, high, low, close, volume])
+
+
+class SyntheticProvider:
+    # Deterministic prices for offline runs and benchmarks: a ticker always gets
+    # the same history (seeded from its name), whatever window it is asked for.
+    SESSIONS_PER_YEAR = 252
+    SESSION_MINUTES = 375  # 09:15 - 15:30 IST
+
+    def __init__(self, seed=0, history_years=10, end=None):
+        self.seed = seed
+        self.end = pd.Timestamp(end or pd.Timestamp.today()).normalize()
+        self.daily = nse.last_sessions(self.SESSIONS_PER_YEAR * history_years, self.end)
+
+    def _rng(self, ticker, interval):
+        return np.random.default_rng([self.seed, zlib.crc32(f"{ticker}|{interval}".encode())])
+
+    def _dividends(self, ticker, index):
+        # One ex-date a year at a ticker-seeded offset, as ex-date -> multiplier
+        rng = self._rng(ticker, "dividends")
+        ex = np.arange(int(rng.integers(0, self.SESSIONS_PER_YEAR)), len(index), self.SESSIONS_PER_YEAR)
+        return pd.Series(1 - rng.uniform(0.005, 0.03, size=len(ex)), index=index[ex])
+
+    INTRADAY_SESSIONS = 5
+
+    def _intraday_index(self, interval):
+        minutes = int(interval[:-1]) if interval.endswith("m") else 60 * int(interval[:-1])
+        sessions = self.daily[-self.INTRADAY_SESSIONS:]
+        offsets = pd.to_timedelta(np.arange(0, self.SESSION_MINUTES, minutes), unit="m")
+        times = [day + pd.Timedelta(hours=9, minutes=15) + offsets for day in sessions]
+        return times[0].append(times[1:]).tz_localize("Asia/Kolkata")
+
+    def _daily_values(self, ticker):
+        return synthetic_ohlcv(self._rng(ticker, "1d"), 1, len(self.daily))[:, 0]
+
+    def _intraday_values(self, ticker, interval, bars, volatility=0.002):
+        # Each session's bars walk from that day's open to its close (a Brownian
+        # bridge in log price) inside its high/low, so intraday and daily agree
+        open_, high, low, close, volume = self._daily_values(ticker)[:, -self.INTRADAY_SESSIONS:]
+        rng = self._rng(ticker, interval)
+        days = len(close)
+        walk = np.cumsum(rng.normal(0, volatility, size=(days, bars)), axis=1)
+        t = np.arange(1, bars + 1) / bars
+        path = np.log(open_)[:, None] + t * np.log(close / open_)[:, None] + walk - t * walk[:, -1:]
+        closes = np.clip(np.exp(path), low[:, None], high[:, None])
+        opens = np.concatenate([open_[:, None], closes[:, :-1]], axis=1)
+        noise = np.abs(rng.normal(0, volatility / 4, size=(2, days, bars)))
+        highs = np.minimum(np.maximum(opens, closes) * (1 + noise[0]), high[:, None])
+        lows = np.maximum(np.minimum(opens, closes) * (1 - noise[1]), low[:, None])
+        volumes = np.round(volume[:, None] * rng.dirichlet(np.ones(bars), size=days))
+        return np.stack([v.ravel() for v in (opens, highs, lows, closes, volumes)])
+
+    def download(self, tickers, period=None, interval="1d", start=None, end=None, auto_adjust=True):
+        index = self.daily if interval == "1d" else self._intraday_index(interval)
+        frames = {}
+        for ticker in tickers:
+            if interval == "1d":
+                values = self._daily_values(ticker)
+            else:
+                values = self._intraday_values(ticker, interval, len(index) // self.INTRADAY_SESSIONS)
+            df = pd.DataFrame(values.T, index=index, columns=FIELDS)
+            if interval == "1d":
+                events = self._dividends(ticker, index)
+                df = adjust_frame(df, events) if auto_adjust else with_adj_close(df, events)
+            frames[ticker] = trim_period(df, period, start, end)
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, axis=1)
+
+
+def trim_period(df, period=None, start=None, end=None):
+    # Lookback windows are resolved on the NSE trading calendar, see nse_calendar
+    if df.empty:
+        return df
+    if not df.index.is_monotonic_increasing:
+        df = df.sort_index()
+    lo, hi = nse.window_bounds(df.index, period, start, end)
+    return df.iloc[lo:hi]
+
+
+default_provider = YahooProvider()
+
+
+def set_provider(provider):
+    global default_provider
+    default_provider = provider
+
+
+def normalize_panel(data, tickers):
+    if data is None or data.empty:
+        return pd.DataFrame()
+
+    # A flat frame means a single ticker came back without the ticker level
+    if not isinstance(data.columns, pd.MultiIndex):
+        data = pd.concat({tickers[0]: data}, axis=1)
+
+    # Make sure the ticker is the outer level
+    if data.columns.get_level_values(0)[0] in FIELDS:
+        data = data.swaplevel(axis=1)
+
+    data.columns = data.columns.set_names(["Ticker", "Field"])
+    return data.dropna(axis=1, how="all")
+
+
+def fetch_panel(tickers, period="1y", interval="1d", start=None, end=None,
+                auto_adjust=True, chunk_size=CHUNK_SIZE, provider=None, on_chunk=None, failed=None):
+    # failed: optional set, filled with the tickers whose download errored
+    # (network, throttling) as opposed to symbols that returned no bars
+    with stage("fetch"):
+        provider = provider or default_provider
+        tickers = list(tickers)
+        chunks = []
+
+        for i in range(0, len(tickers), chunk_size):
+            chunk = tickers[i:i + chunk_size]
+            try:
+                data = provider.download(chunk, period=period, interval=interval,
+                                         start=start, end=end, auto_adjust=auto_adjust)
+            except Exception as e:
+                print(f"⚠️ Download failed for {len(chunk)} tickers ({chunk[0]}...): {e}")
+                if failed is not None:
+                    failed.update(chunk)
+                continue
+            errors = getattr(provider, "errors", None)
+            if failed is not None and errors:
+                failed.update(errors(chunk))
+            data = normalize_panel(data, chunk)
+            if not data.empty:
+                chunks.append(data)
+                if on_chunk:
+                    on_chunk(data)
+
+        if not chunks:
+            return pd.DataFrame()
+        return pd.concat(chunks, axis=1).sort_index()
+
+
+def panel_tickers(panel):
+    if panel.empty:
+        return []
+    return list(dict.fromkeys(panel.columns.get_level_values("Ticker")))
+
+
+def get_ticker_df(panel, ticker):
+    if panel.empty or ticker not in panel.columns.get_level_values("Ticker"):
+        return pd.DataFrame()
+    df = panel[ticker].dropna(how="all")
+    df.columns.name = None
+    return df
+
+
+def field_matrix(panel, field="Close"):
+    # dates x tickers matrix for a single field
+    if panel.empty:
+        return pd.DataFrame()
+    return panel.xs(field, axis=1, level="Field")
+
+
+def save_fixture(panel, folder):
+    os.makedirs(folder, exist_ok=True)
+    for ticker in panel_tickers(panel):
+        get_ticker_df(panel, ticker).to_csv(os.path.join(folder, f"{ticker}.csv"))
@@ -0,0 +1,138 @@
+import matplotlib
+matplotlib.use("Agg")
+from matplotlib.figure import Figure
+from matplotlib.cm import ScalarMappable
+from matplotlib.collections import PolyCollection
+from matplotlib.colors import Normalize
+import matplotlib.dates as mdates
+import numpy as np
+import seaborn as sns
+import mplfinance as mpf
+
+# Chart drawing with matplotlib, seaborn and mplfinance. Imported by
+# render.render_job the first time a chart is actually drawn, so screens that
+# render nothing never load the plotting stack.
+
+
+def draw_line(job):
+    opts = job.options
+    fig = Figure(figsize=opts.get("figsize", (10, 5)))
+    ax = fig.add_subplot()
+    for column, (label, color) in opts["lines"].items():
+        series = job.data[column]
+        ax.plot(series.index, series.values, label=label, color=color)
+    ax.set_title(job.title)
+    ax.set_xlabel(opts.get("xlabel", "Date"))
+    ax.set_ylabel(opts.get("ylabel", "Price"))
+    if opts.get("grid", True):
+        ax.grid(True)
+    if opts.get("legend", True):
+        ax.legend()
+    if opts.get("time_format"):
+        ax.xaxis.set_major_formatter(mdates.DateFormatter(opts["time_format"], tz=job.data.index.tz))
+        fig.autofmt_xdate()
+    fig.tight_layout()
+    return fig
+
+
+def draw_candle(job):
+    plot_df = job.data
+    fig = Figure(figsize=(10, 7))
+    ax = fig.add_axes([0.08, 0.35, 0.82, 0.55])
+    volume_ax = fig.add_axes([0.08, 0.2, 0.82, 0.15], sharex=ax)
+    mpf.plot(plot_df, type='candle', style='yahoo', ax=ax, volume=volume_ax)
+
+    ax.set_title(job.title)
+    ax.set_ylabel('Price')
+    # Custom ticks to show all dates
+    volume_ax.set_xticks(range(len(plot_df)))
+    volume_ax.set_xticklabels(
+        [d.strftime('%b-%d') for d in plot_df.index],
+        rotation=20,
+        ha='right'
+    )
+    return fig
+
+
+# Tile labels smaller than this many points are culled instead of drawn
+MIN_LABEL_POINTS = 4.5
+
+
+def _tile_labels(ax, fig, names, values, x, y, w, h):
+    # names/values/x/y/w/h are flat arrays in data units; label only tiles big enough to read
+    bbox = ax.get_window_extent().transformed(fig.dpi_scale_trans.inverted())
+    x_pts = bbox.width * 72 / abs(ax.get_xlim()[1] - ax.get_xlim()[0])
+    y_pts = bbox.height * 72 / abs(ax.get_ylim()[1] - ax.get_ylim()[0])
+    # One size per tile area (not per name) so equal tiles get equal text
+    length = max(7.0, np.percentile([len(str(n)) for n in names], 90)) if len(names) else 7.0
+    sizes = np.minimum.reduce([np.full(len(names), 9.0), w * x_pts / (0.65 * length), h * y_pts / 2.6])
+    for i in np.flatnonzero((sizes >= MIN_LABEL_POINTS) & ~np.isnan(values)):
+        ax.text(x[i], y[i], f"{names[i]}\n{values[i]:.2f}%", ha="center", va="center",
+                fontsize=sizes[i], clip_on=True)
+
+
+def _change_colors():
+    return sns.diverging_palette(20, 220, as_cmap=True)
+
+
+def _change_norm(values):
+    limit = np.nanmax(np.abs(values)) if np.isfinite(values).any() else 1.0
+    return Normalize(-limit or -1.0, limit or 1.0)
+
+
+def draw_heatmap(job):
+    # data = (values, tickers): square grids from heatmap.grid()
+    matrix, names = job.data
+    fig = Figure(figsize=(16, 10))
+    ax = fig.add_subplot()
+    cmap, norm = _change_colors(), _change_norm(matrix)
+    image = ax.imshow(np.ma.masked_invalid(matrix), cmap=cmap, norm=norm, aspect="auto", interpolation="nearest")
+    ax.set_xticks([])
+    ax.set_yticks([])
+    fig.colorbar(image, ax=ax, label="% Change")
+    ax.set_title(job.title)
+    fig.tight_layout()
+
+    rows, cols = np.indices(matrix.shape)
+    ones = np.ones(matrix.size)
+    _tile_labels(ax, fig, names.ravel(), matrix.ravel(), cols.ravel(), rows.ravel(), ones, ones)
+    return fig
+
+
+def draw_treemap(job):
+    # data = (tiles, groups) from heatmap.treemap(), coordinates in a unit square
+    tiles, groups = job.data
+    fig = Figure(figsize=(16, 10))
+    ax = fig.add_subplot()
+    cmap, norm = _change_colors(), _change_norm(tiles["% Change"].to_numpy())
+
+    x, y, w, h = (tiles[c].to_numpy() for c in ("x", "y", "w", "h"))
+    corners = np.stack([np.c_[x, y], np.c_[x + w, y], np.c_[x + w, y + h], np.c_[x, y + h]], axis=1)
+    ax.add_collection(PolyCollection(corners, facecolors=cmap(norm(tiles["% Change"].to_numpy())),
+                                     edgecolors="white", linewidths=0.3))
+    gx, gy, gw, gh = (groups[c].to_numpy() for c in ("x", "y", "w", "h"))
+    outlines = np.stack([np.c_[gx, gy], np.c_[gx + gw, gy], np.c_[gx + gw, gy + gh], np.c_[gx, gy + gh]], axis=1)
+    ax.add_collection(PolyCollection(outlines, facecolors="none", edgecolors="black", linewidths=1.2))
+
+    ax.set_xlim(0, 1)
+    ax.set_ylim(1, 0)
+    ax.set_axis_off()
+    fig.colorbar(ScalarMappable(norm=norm, cmap=cmap), ax=ax, label="% Change")
+    ax.set_title(job.title)
+    fig.tight_layout()
+
+    _tile_labels(ax, fig, tiles["Ticker"].to_numpy(), tiles["% Change"].to_numpy(), x + w / 2, y + h / 2, w, h)
+    for group, gx0, gy0, gw0 in zip(groups["Group"], gx, gy, gw):
+        if gw0 > 0.04:
+            ax.text(gx0 + 0.003, gy0 + 0.003, str(group), ha="left", va="top", fontsize=8,
+                    fontweight="bold", clip_on=True,
+                    bbox={"facecolor": "white", "alpha": 0.7, "pad": 1, "linewidth": 0})
+    return fig
+
+
+DRAWERS = {
+    "line": draw_line,
+    "candle": draw_candle,
+    "heatmap": draw_heatmap,
+    "treemap": draw_treemap,
+}
@@ -0,0 +1,162 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from data import normalize_panel, panel_tickers
+from instrument import recorder
+
+# Concurrent network layer. FetchExecutor looks like any other provider
+# (it has a download() method) but splits the request into batches that run
+# on a bounded thread pool, behind a token-bucket rate limiter, with jittered
+# exponential backoff on transient failures.
+
+
+class TokenBucket:
+    def __init__(self, rate=4.0, capacity=8):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class TransientFetchError(Exception):
+    pass
+
+
+# Errors that retrying won't fix
+PERMANENT_ERRORS = (ValueError, KeyError, TypeError)
+
+
+class FetchExecutor:
+    def __init__(self, provider, max_workers=4, rate=4.0, burst=8, batch_size=20,
+                 retries=3, backoff=0.5, max_backoff=8.0):
+        self.provider = provider
+        self.max_workers = max_workers
+        self.bucket = TokenBucket(rate, burst)
+        self.batch_size = batch_size
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.lock = threading.Lock()
+        self.failures = {}
+        self.errored = set()  # tickers whose last batch failed (not just empty)
+        self.stats = {"requests": 0, "retries": 0, "failed_batches": 0}
+
+    def _record_failure(self, tickers, error, errored=True):
+        with self.lock:
+            if errored:
+                self.errored.update(tickers)
+            for ticker in tickers:
+                entry = self.failures.setdefault(ticker, {"count": 0, "last_error": ""})
+                entry["count"] += 1
+                entry["last_error"] = str(error)
+
+    def _sleep_before_retry(self, attempt):
+        delay = min(self.max_backoff, self.backoff * (2 ** attempt))
+        time.sleep(delay * random.uniform(0.5, 1.5))
+
+    def _download_batch(self, batch, kwargs):
+        # Every ticker in the batch waits for the whole batch, retries included
+        start = time.perf_counter()
+        try:
+            return self._attempt_batch(batch, kwargs)
+        finally:
+            recorder.observe("fetch", batch, time.perf_counter() - start)
+
+    def _attempt_batch(self, batch, kwargs):
+        for attempt in range(self.retries + 1):
+            self.bucket.acquire()
+            with self.lock:
+                self.stats["requests"] += 1
+            try:
+                data = normalize_panel(self.provider.download(batch, **kwargs), batch)
+                if data.empty:
+                    # A fully empty answer is usually throttling, not a bad symbol
+                    raise TransientFetchError("empty response")
+            except PERMANENT_ERRORS as e:
+                self._record_failure(batch, e)
+                break
+            except Exception as e:
+                if attempt < self.retries:
+                    with self.lock:
+                        self.stats["retries"] += 1
+                    self._sleep_before_retry(attempt)
+                    continue
+                self._record_failure(batch, e)
+                break
+
+            returned = set(panel_tickers(data))
+            missing = [t for t in batch if t not in returned]
+            with self.lock:
+                self.errored.difference_update(batch)
+            if missing:
+                # The request worked, so these symbols really have nothing
+                self._record_failure(missing, "no data returned", errored=False)
+            return data
+
+        with self.lock:
+            self.stats["failed_batches"] += 1
+        return pd.DataFrame()
+
+    def download(self, tickers, **kwargs):
+        tickers = list(tickers)
+        batches = [tickers[i:i + self.batch_size] for i in range(0, len(tickers), self.batch_size)]
+        if len(batches) == 1:
+            results = [self._download_batch(batches[0], kwargs)]
+        else:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                results = list(pool.map(lambda batch: self._download_batch(batch, kwargs), batches))
+
+        results = [r for r in results if not r.empty]
+        if not results:
+            return pd.DataFrame()
+        return pd.concat(results, axis=1)
+
+    def errors(self, tickers):
+        # Tickers among these whose download failed, as opposed to came back empty
+        with self.lock:
+            return [t for t in tickers if t in self.errored]
+
+    def summary(self):
+        text = (f"🌐 Fetch: {self.stats['requests']} requests, {self.stats['retries']} retries, "
+                f"{self.stats['failed_batches']} failed batches, {len(self.failures)} tickers with errors")
+        worst = sorted(self.failures.items(), key=lambda kv: kv[1]["count"], reverse=True)[:5]
+        for ticker, entry in worst:
+            text += f"\n   ⚠️ {ticker}: {entry['count']}x ({entry['last_error']})"
+        return text
+
+
+class FlakyProvider:
+    # Wraps a provider (usually LocalProvider) with artificial latency and
+    # random failures so retry/backoff behaviour can be exercised offline.
+    def __init__(self, provider, latency=0.05, error_rate=0.2, seed=None):
+        self.provider = provider
+        self.latency = latency
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.calls = 0
+
+    def download(self, tickers, **kwargs):
+        with self.lock:
+            self.calls += 1
+            fail = self.random.random() < self.error_rate
+            delay = self.random.uniform(0, 2 * self.latency)
+        time.sleep(delay)
+        if fail:
+            raise ConnectionError("injected failure")
+        return self.provider.download(tickers, **kwargs)
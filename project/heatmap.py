@@ -0,0 +1,96 @@
+import math
+import os
+import numpy as np
+import pandas as pd
+
+# Tile layouts for the weekly % change heatmap. Everything here is plain
+# numpy/pandas; draw.py only draws the grids and rectangles built here.
+#
+#   grid()     sorted square grid, one cell per ticker
+#   treemap()  tickers grouped by sector (or first letter), each group a
+#              block sized by its number of tickers
+
+SECTOR_FILE = "sectors.csv"
+
+
+def load_sectors(path=SECTOR_FILE):
+    # CSV with a Symbol column and a Sector (or Industry) column
+    if not path or not os.path.exists(path):
+        return {}
+    df = pd.read_csv(path)
+    column = "Sector" if "Sector" in df.columns else "Industry"
+    return dict(zip(df["Symbol"], df[column].fillna("Other")))
+
+
+def group_keys(tickers, sectors=None):
+    if sectors:
+        return pd.Series([sectors.get(t, "Other") for t in tickers], index=tickers)
+    # No sector file: group alphabetically
+    return pd.Series([t[0].upper() if t[0].isalpha() else "#" for t in tickers], index=tickers)
+
+
+def grid(changes):
+    # Best performer top-left, row by row; returns (values, tickers) square arrays
+    changes = changes.dropna().sort_values(ascending=False)
+    size = max(1, int(math.ceil(math.sqrt(len(changes)))))
+    values = np.full(size * size, np.nan)
+    names = np.full(size * size, "", dtype=object)
+    values[:len(changes)] = changes.to_numpy()
+    names[:len(changes)] = changes.index.to_numpy()
+    return values.reshape(size, size), names.reshape(size, size)
+
+
+def _worst(row, side):
+    total = sum(row)
+    return max(max(side * side * r / (total * total), total * total / (side * side * r)) for r in row)
+
+
+def squarify(sizes, x, y, w, h):
+    # Squarified treemap (Bruls, Huizing, van Wijk): rectangles for sizes given
+    # in descending order, filling (x, y, w, h) exactly. Returns [(x, y, w, h)].
+    sizes = np.asarray(sizes, dtype=float)
+    if not len(sizes):
+        return []
+    sizes = sizes * (w * h / sizes.sum())
+    rects = []
+    i = 0
+    while i < len(sizes):
+        side = min(w, h)
+        row = [sizes[i]]
+        i += 1
+        while i < len(sizes) and _worst(row + [sizes[i]], side) <= _worst(row, side):
+            row.append(sizes[i])
+            i += 1
+        thickness = sum(row) / side
+        offset = 0.0
+        for r in row:
+            length = r / thickness
+            if w >= h:
+                rects.append((x, y + offset, thickness, length))
+            else:
+                rects.append((x + offset, y, length, thickness))
+            offset += length
+        if w >= h:
+            x, w = x + thickness, w - thickness
+        else:
+            y, h = y + thickness, h - thickness
+    return rects
+
+
+def treemap(changes, sectors=None, width=1.0, height=1.0):
+    # Returns (tiles, groups): one rectangle per ticker and one per group
+    changes = changes.dropna()
+    keys = group_keys(list(changes.index), sectors)
+    counts = keys.value_counts()
+    group_rects = squarify(counts.to_numpy(), 0, 0, width, height)
+
+    tiles, groups = [], []
+    for (group, count), (gx, gy, gw, gh) in zip(counts.items(), group_rects):
+        groups.append((group, count, gx, gy, gw, gh))
+        members = changes[keys == group].sort_values(ascending=False)
+        for (ticker, change), rect in zip(members.items(), squarify(np.ones(len(members)), gx, gy, gw, gh)):
+            tiles.append((ticker, group, change) + rect)
+
+    tiles = pd.DataFrame(tiles, columns=["Ticker", "Group", "% Change", "x", "y", "w", "h"])
+    groups = pd.DataFrame(groups, columns=["Group", "Count", "x", "y", "w", "h"])
+    return tiles, groups
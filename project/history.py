@@ -0,0 +1,174 @@
+import json
+import os
+import sqlite3
+import numpy as np
+import pandas as pd
+from nse_calendar import nse
+
+# Local database of past screen hits.
+#
+# Every screener run appends one row to `runs` and one row per hit to `hits`,
+# with the hit's numeric columns (RSI, Gap %, Return %, ...) in `hit_values`.
+# Rows carry the trading session they belong to, so questions like "which
+# tickers hit rsi_low three sessions in a row" or "52W-high hits over the last
+# month" are answered from the database instead of re-running old scans.
+#
+#   runs        id, screen, session, started, params (JSON), rows
+#   hits        id, run_id, screen, session, ticker, rank
+#   hit_values  hit_id, name, value
+
+DB_FILE = "screen_history.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    screen TEXT NOT NULL,
+    session TEXT NOT NULL,
+    started TEXT NOT NULL,
+    params TEXT,
+    rows INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS hits (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    screen TEXT NOT NULL,
+    session TEXT NOT NULL,
+    ticker TEXT NOT NULL,
+    rank INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS hit_values (
+    hit_id INTEGER NOT NULL REFERENCES hits(id),
+    name TEXT NOT NULL,
+    value REAL,
+    PRIMARY KEY (hit_id, name)
+);
+CREATE INDEX IF NOT EXISTS hits_session ON hits(session);
+CREATE INDEX IF NOT EXISTS hits_screen_session ON hits(screen, session);
+CREATE INDEX IF NOT EXISTS hits_ticker_session ON hits(ticker, session);
+CREATE INDEX IF NOT EXISTS runs_screen_session ON runs(screen, session);
+"""
+
+
+def _day(value):
+    return None if value is None else pd.Timestamp(value).strftime("%Y-%m-%d")
+
+
+class HitStore:
+    def __init__(self, path=DB_FILE):
+        self.path = path
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def record(self, screen, df, session, params=None):
+        # Append one screen run over data whose last bar is on `session`
+        session = _day(session)
+        df = df if df is not None else pd.DataFrame(columns=["Ticker"])
+        numeric = [c for c in df.columns if c != "Ticker" and pd.api.types.is_numeric_dtype(df[c])]
+
+        with self.conn:
+            run_id = self.conn.execute(
+                "INSERT INTO runs (screen, session, started, params, rows) VALUES (?, ?, ?, ?, ?)",
+                (screen, session, pd.Timestamp.now().isoformat(timespec="seconds"),
+                 json.dumps(params or {}, default=str), len(df)),
+            ).lastrowid
+            if df.empty:
+                return run_id
+            first = self.conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM hits").fetchone()[0]
+            ids = range(first, first + len(df))
+            self.conn.executemany(
+                "INSERT INTO hits (id, run_id, screen, session, ticker, rank) VALUES (?, ?, ?, ?, ?, ?)",
+                [(i, run_id, screen, session, str(t), rank)
+                 for rank, (i, t) in enumerate(zip(ids, df["Ticker"]), start=1)],
+            )
+            values = df[numeric].to_numpy(dtype=float)
+            self.conn.executemany(
+                "INSERT INTO hit_values (hit_id, name, value) VALUES (?, ?, ?)",
+                [(i, name, None if np.isnan(v) else float(v))
+                 for i, row in zip(ids, values) for name, v in zip(numeric, row)],
+            )
+        return run_id
+
+    def sql(self, query, params=()):
+        return pd.read_sql_query(query, self.conn, params=params)
+
+    def hits(self, screen=None, ticker=None, since=None, until=None, days=None):
+        # One row per hit with its metric values as columns; days = last N sessions
+        if days is not None:
+            since = nse.last_sessions(days)[0]
+        where, args = [], []
+        for clause, value in (("h.screen = ?", screen), ("h.ticker = ?", ticker),
+                              ("h.session >= ?", _day(since)), ("h.session <= ?", _day(until))):
+            if value is not None:
+                where.append(clause)
+                args.append(value)
+        query = ("SELECT h.id, h.session, h.screen, h.ticker, h.rank, v.name, v.value "
+                 "FROM hits h LEFT JOIN hit_values v ON v.hit_id = h.id")
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        long = self.sql(query + " ORDER BY h.session, h.screen, h.rank", args)
+        if long.empty:
+            return pd.DataFrame(columns=["Session", "Screen", "Ticker", "Rank"])
+
+        keys = ["id", "session", "screen", "ticker", "rank"]
+        wide = long.drop_duplicates("id")[keys]
+        named = long.dropna(subset=["name"])
+        if not named.empty:
+            values = named.pivot(index="id", columns="name", values="value")
+            wide = wide.join(values, on="id")
+        wide = wide.drop(columns="id").rename(columns={k: k.title() for k in keys})
+        return wide.reset_index(drop=True)
+
+    def streaks(self, screen, length=3, since=None, days=None, current=False):
+        # Tickers that hit `screen` on at least `length` consecutive trading sessions.
+        # current=True keeps only streaks still running on the latest recorded session.
+        if days is not None:
+            since = nse.last_sessions(days)[0]
+        query = "SELECT DISTINCT ticker, session FROM hits WHERE screen = ?"
+        args = [screen]
+        if since is not None:
+            query += " AND session >= ?"
+            args.append(_day(since))
+        seen = self.sql(query, args)
+        columns = ["Ticker", "Start", "End", "Sessions"]
+        if seen.empty:
+            return pd.DataFrame(columns=columns)
+
+        days = pd.DatetimeIndex(pd.to_datetime(seen["session"]))
+        sessions = nse.sessions(days.min(), days.max()).union(days.unique())
+        seen["n"] = sessions.searchsorted(days)
+        seen = seen.sort_values(["ticker", "n"])
+        # A new run starts wherever the ticker or the session sequence breaks
+        breaks = (seen["ticker"] != seen["ticker"].shift()) | (seen["n"].diff() != 1)
+        runs = seen.groupby(breaks.cumsum()).agg(Ticker=("ticker", "first"), Start=("session", "first"),
+                                                 End=("session", "last"), Sessions=("n", "size"))
+        runs = runs[runs["Sessions"] >= length]
+        if current:
+            runs = runs[runs["End"] == seen["session"].max()]
+        return runs.sort_values(["Sessions", "End"], ascending=False)[columns].reset_index(drop=True)
+
+    def summary(self):
+        runs, hits = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(rows), 0) FROM runs").fetchone()
+        return f"🗄️ History: {runs} runs, {hits} hits in {self.path}"
+
+
+# Store every screener writes to; installed by main.setup_data()
+store = None
+
+
+def set_store(hit_store):
+    global store
+    store = hit_store
+
+
+def record_hits(screen, df, session, **params):
+    # No-op until a store is installed (benchmarks, library use) or without
+    # data; session is the screened data's last bar (UniverseSnapshot.session),
+    # so reruns over the same bars stay on the same session
+    if store is not None and df is not None and session is not None:
+        store.record(screen, df, session, params)
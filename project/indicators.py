@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+
+# Cross-sectional indicators. Every function takes a dates x tickers matrix
+# (see data.field_matrix) and works on all columns at once.
+
+
+def last_valid(frame, lag=0):
+    # Last non-NaN value of every column (lag=1 gives the one before it)
+    values = frame.to_numpy(dtype=float)
+    if not len(values):
+        return pd.Series(np.nan, index=frame.columns)
+    valid = ~np.isnan(values)
+    from_bottom = valid[::-1].cumsum(axis=0)[::-1]
+    target = valid & (from_bottom == lag + 1)
+    rows = target.argmax(axis=0)
+    out = values[rows, np.arange(values.shape[1])]
+    out = np.where(target.any(axis=0), out, np.nan)
+    return pd.Series(out, index=frame.columns)
+
+
+def first_valid(frame):
+    values = frame.to_numpy(dtype=float)
+    if not len(values):
+        return pd.Series(np.nan, index=frame.columns)
+    valid = ~np.isnan(values)
+    rows = valid.argmax(axis=0)
+    out = values[rows, np.arange(values.shape[1])]
+    out = np.where(valid.any(axis=0), out, np.nan)
+    return pd.Series(out, index=frame.columns)
+
+
+def pct_change(start, end):
+    start = start.where(start != 0)
+    return (end - start) / start * 100
+
+
+def period_return(close):
+    return pct_change(first_valid(close), last_valid(close))
+
+
+def daily_change(close):
+    return pct_change(last_valid(close, lag=1), last_valid(close))
+
+
+def gap_pct(open_, close):
+    # Today's open against the previous session's close
+    return pct_change(last_valid(close, lag=1), last_valid(open_))
+
+
+def price_moves(close):
+    # (gains, losses) per bar; RSIs of different periods can share them
+    delta = close.diff()
+    return delta.where(delta > 0, 0), -delta.where(delta < 0, 0)
+
+
+def rsi(close, period=14, moves=None):
+    # Same simple-moving-average RSI as main.calculate_rsi, for every column
+    gain, loss = moves if moves is not None else price_moves(close)
+    rs = gain.rolling(window=period).mean() / loss.rolling(window=period).mean()
+    return 100 - (100 / (1 + rs))
+
+
+def ema(close, span, cache=None):
+    # cache: dict of span -> EMA of this same close matrix, filled as needed
+    if cache is None:
+        return close.ewm(span=span, adjust=False).mean()
+    if span not in cache:
+        cache[span] = close.ewm(span=span, adjust=False).mean()
+    return cache[span]
+
+
+# Bars a MACD(12, 26, 9) crossover needs before it is trusted
+MACD_MIN_BARS = 35
+
+
+def macd(close, fast=12, slow=26, signal=9):
+    line = ema(close, fast) - ema(close, slow)
+    return line, ema(line, signal)
+
+
+def crossover(line, signal):
+    # Bullish/bearish cross between the last two rows of each column
+    diff_today = last_valid(line) - last_valid(signal)
+    diff_yesterday = last_valid(line, lag=1) - last_valid(signal, lag=1)
+    bullish = (diff_yesterday < 0) & (diff_today > 0)
+    bearish = (diff_yesterday > 0) & (diff_today < 0)
+    return bullish, bearish
+
+
+def rolling_high(close, window=252):
+    return close.rolling(window=window, min_periods=1).max()
+
+
+def rolling_low(close, window=252):
+    return close.rolling(window=window, min_periods=1).min()
+
+
+def bar_count(frame):
+    return frame.notna().sum()
+
+
+def top_movers(change, n):
+    # n largest and n smallest values in one argpartition, without sorting the rest
+    values = change.to_numpy(dtype=float)
+    valid = np.flatnonzero(~np.isnan(values))
+    values = values[valid]
+    k = min(n, len(values))
+    if k == 0:
+        return change.iloc[:0], change.iloc[:0]
+    if 2 * k >= len(values):
+        order = np.argsort(values, kind="stable")
+        low, high = order[:k], order[::-1][:k]
+    else:
+        part = np.argpartition(values, [k - 1, len(values) - k])
+        low, high = part[:k], part[len(values) - k:]
+        low = low[np.argsort(values[low], kind="stable")]
+        high = high[np.argsort(-values[high], kind="stable")]
+    return change.iloc[valid[high]], change.iloc[valid[low]]
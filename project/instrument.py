@@ -0,0 +1,201 @@
+import json
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import wraps
+
+# Run-time instrumentation for scans.
+#
+# Screens are split into stages (fetch, compute, filter, render). Stage time is
+# exclusive, so a fetch that happens inside a compute block counts as fetch
+# only. Per-ticker latencies (download batch, cache read, chart render) go
+# into fixed-bucket histograms. Everything can be printed as a summary or
+# exported as JSON / Prometheus text.
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"))
+STAGES = ["fetch", "compute", "filter", "render"]
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q):
+        # Upper bound of the bucket holding the q-th observation
+        if not self.count:
+            return 0.0
+        rank, seen = q * self.count, 0
+        for bound, n in zip(BUCKETS, self.counts):
+            seen += n
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+
+class Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.sources = {}
+        self.reset()
+
+    def reset(self):
+        self.current = None
+        self.screens = defaultdict(float)
+        self.stages = defaultdict(float)
+        self.histograms = defaultdict(Histogram)
+        self.latency = defaultdict(lambda: defaultdict(float))
+
+    def watch(self, name, stats):
+        # Counter dicts (cache / fetch stats) included in exports
+        self.sources[name] = stats
+
+    def _stack(self):
+        if not hasattr(self.local, "stack"):
+            self.local.stack = []
+        return self.local.stack
+
+    @contextmanager
+    def stage(self, name):
+        stack = self._stack()
+        stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            nested = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            with self.lock:
+                self.stages[(self.current, name)] += elapsed - nested
+
+    @contextmanager
+    def screen(self, name):
+        outer, self.current = self.current, name
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.screens[name] += time.perf_counter() - start
+            self.current = outer
+
+    def observe(self, stage, tickers, seconds):
+        with self.lock:
+            for ticker in tickers:
+                self.histograms[stage].observe(seconds)
+                self.latency[ticker][stage] += seconds
+
+    def slowest(self, n=10):
+        totals = sorted(self.latency.items(), key=lambda kv: sum(kv[1].values()), reverse=True)
+        return [(ticker, sum(parts.values()), dict(parts)) for ticker, parts in totals[:n]]
+
+    def breakdown(self):
+        rows = {}
+        for screen, total in self.screens.items():
+            row = {stage: self.stages.get((screen, stage), 0.0) for stage in STAGES}
+            row["other"] = max(0.0, total - sum(row.values()))
+            row["total"] = total
+            rows[screen] = row
+        return rows
+
+    def summary(self, top=5):
+        lines = []
+        rows = self.breakdown()
+        if rows:
+            lines.append("⏱️ Time by stage (s):")
+            lines.append(f"   {'screen':<34}" + "".join(f"{c:>9}" for c in STAGES + ["other", "total"]))
+            for screen, row in rows.items():
+                lines.append(f"   {screen:<34}" + "".join(f"{row[c]:>9.2f}" for c in STAGES + ["other", "total"]))
+        for stage, hist in self.histograms.items():
+            lines.append(f"📶 {stage}: {hist.count} tickers, p50 ≤{hist.quantile(0.5):.3f}s, "
+                         f"p95 ≤{hist.quantile(0.95):.3f}s, max {hist.max:.3f}s")
+        slow = self.slowest(top)
+        if slow:
+            parts = [f"{ticker} {total:.2f}s ({', '.join(f'{k} {v:.2f}' for k, v in stages.items())})"
+                     for ticker, total, stages in slow]
+            lines.append("🐢 Slowest: " + "; ".join(parts))
+        return "\n".join(lines)
+
+    def as_dict(self, top=20):
+        return {
+            "screens": self.breakdown(),
+            "latency": {
+                stage: {
+                    "count": h.count, "sum": h.total, "max": h.max,
+                    "p50": h.quantile(0.5), "p95": h.quantile(0.95),
+                    "buckets": {str(b): n for b, n in zip(BUCKETS, h.counts)},
+                }
+                for stage, h in self.histograms.items()
+            },
+            "slowest": [{"ticker": t, "seconds": s, "stages": parts} for t, s, parts in self.slowest(top)],
+            "counters": {name: dict(stats) for name, stats in self.sources.items()},
+        }
+
+    def to_prometheus(self, top=20):
+        out = [
+            "# HELP screener_stage_seconds Wall time per screen and stage",
+            "# TYPE screener_stage_seconds gauge",
+        ]
+        for screen, row in self.breakdown().items():
+            for stage, seconds in row.items():
+                out.append(f'screener_stage_seconds{{screen="{screen}",stage="{stage}"}} {seconds:.6f}')
+
+        out += ["# HELP screener_ticker_latency_seconds Per-ticker latency",
+                "# TYPE screener_ticker_latency_seconds histogram"]
+        for stage, h in self.histograms.items():
+            cumulative = 0
+            for bound, n in zip(BUCKETS, h.counts):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                out.append(f'screener_ticker_latency_seconds_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+            out.append(f'screener_ticker_latency_seconds_sum{{stage="{stage}"}} {h.total:.6f}')
+            out.append(f'screener_ticker_latency_seconds_count{{stage="{stage}"}} {h.count}')
+
+        out += ["# HELP screener_slowest_ticker_seconds Total latency of the slowest tickers",
+                "# TYPE screener_slowest_ticker_seconds gauge"]
+        for ticker, seconds, _ in self.slowest(top):
+            out.append(f'screener_slowest_ticker_seconds{{ticker="{ticker}"}} {seconds:.6f}')
+
+        for name, stats in self.sources.items():
+            for key, value in stats.items():
+                out.append(f"# TYPE screener_{name}_{key}_total counter")
+                out.append(f"screener_{name}_{key}_total {value}")
+        return "\n".join(out) + "\n"
+
+    def export(self, path):
+        # .json for JSON, anything else gets Prometheus text format
+        with open(path, "w") as f:
+            if path.endswith(".json"):
+                json.dump(self.as_dict(), f, indent=2)
+            else:
+                f.write(self.to_prometheus())
+        return path
+
+
+recorder = Recorder()
+
+
+def stage(name):
+    return recorder.stage(name)
+
+
+def instrumented(fn):
+    # Records the wrapped screener's wall time under its own name
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        with recorder.screen(fn.__name__):
+            return fn(*args, **kwargs)
+    return wrapper
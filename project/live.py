@@ -0,0 +1,249 @@
+import time
+import numpy as np
+import pandas as pd
+from data import FIELDS, fetch_panel, field_matrix
+from streaming import RSIState
+import indicators as ind
+from instrument import instrumented
+
+# Live intraday scanning. Each new 5-minute bar is appended to a per-ticker
+# ring buffer and the day's change, gap and intraday RSI are updated in place;
+# only what changed since the previous bar (ranking moves, gap flags, RSI zone
+# crossings) is pushed to the caller.
+#
+# Bars come from a source that yields (timestamp, bars) pairs, where bars is a
+# DataFrame indexed by ticker with OHLCV columns: PollingSource during market
+# hours, ReplaySource for recorded sessions (works offline).
+
+OVERSOLD, OVERBOUGHT = 30, 70
+
+
+def bars_by_time(panel):
+    # Intraday panel -> [(timestamp, ticker x field frame)]
+    if panel.empty:
+        return []
+    long = panel.stack(level="Ticker", future_stack=True).dropna(subset=["Close"])
+    return [(ts, bars.droplevel(0)[FIELDS]) for ts, bars in long.groupby(level=0)]
+
+
+class ReplaySource:
+    # Replays recorded bars in time order; delay > 0 sleeps between bars
+    def __init__(self, panel, delay=0.0):
+        self.steps = bars_by_time(panel)
+        self.delay = delay
+
+    @classmethod
+    def from_file(cls, path, delay=0.0):
+        bars = pd.read_parquet(path) if path.endswith(".parquet") else pd.read_csv(path, parse_dates=["Datetime"])
+        panel = bars.set_index(["Datetime", "Ticker"])[FIELDS].unstack("Ticker").swaplevel(axis=1).sort_index(axis=1)
+        panel.columns = panel.columns.set_names(["Ticker", "Field"])
+        return cls(panel, delay)
+
+    def __iter__(self):
+        for step in self.steps:
+            yield step
+            if self.delay:
+                time.sleep(self.delay)
+
+
+def record_session(tickers, path, period="1d", interval="5m"):
+    # Save an intraday download as long-format bars for ReplaySource.from_file
+    panel = fetch_panel(tickers, period=period, interval=interval, auto_adjust=False)
+    bars = panel.stack(level="Ticker", future_stack=True).dropna(subset=["Close"])
+    bars.index = bars.index.set_names(["Datetime", "Ticker"])
+    bars = bars[FIELDS].reset_index()
+    if path.endswith(".parquet"):
+        bars.to_parquet(path, index=False)
+    else:
+        bars.to_csv(path, index=False)
+    return len(bars)
+
+
+class PollingSource:
+    # Polls the provider for the current session and yields only unseen bars
+    def __init__(self, tickers, interval="5m", poll_every=60, max_polls=None):
+        self.tickers = list(tickers)
+        self.interval = interval
+        self.poll_every = poll_every
+        self.max_polls = max_polls
+        self.last_seen = None
+
+    def __iter__(self):
+        polls = 0
+        while self.max_polls is None or polls < self.max_polls:
+            panel = fetch_panel(self.tickers, period="1d", interval=self.interval, auto_adjust=False)
+            # The newest bar is still forming; hold it back until the next poll
+            for ts, bars in bars_by_time(panel)[:-1]:
+                if self.last_seen is None or ts > self.last_seen:
+                    self.last_seen = ts
+                    yield ts, bars
+            polls += 1
+            time.sleep(self.poll_every)
+
+
+class BarRing:
+    # Last `capacity` bars of every ticker, one row per ticker
+    def __init__(self, tickers, capacity=150):
+        self.capacity = capacity
+        self.values = np.full((len(FIELDS), len(tickers), capacity), np.nan)
+        self.times = np.zeros((len(tickers), capacity), dtype="datetime64[ns]")
+        self.count = np.zeros(len(tickers), dtype=np.int64)
+
+    def push(self, rows, timestamp, values):
+        slots = self.count[rows] % self.capacity
+        self.values[:, rows, slots] = values
+        self.times[rows, slots] = np.datetime64(pd.Timestamp(timestamp).tz_localize(None), "ns")
+        self.count[rows] += 1
+
+    def frame(self, row):
+        # Buffered bars of one ticker, oldest first
+        n = min(self.count[row], self.capacity)
+        order = (np.arange(n) + self.count[row] - n) % self.capacity
+        return pd.DataFrame(self.values[:, row, order].T, index=pd.DatetimeIndex(self.times[row, order]),
+                            columns=FIELDS)
+
+
+class LiveScanner:
+    def __init__(self, tickers, daily_close, top_n=10, gap_threshold=2.0, rsi_period=14, capacity=150):
+        self.tickers = list(tickers)
+        self.rows = {t: i for i, t in enumerate(self.tickers)}
+        self.daily_close = daily_close.reindex(columns=self.tickers)
+        self.top_n = top_n
+        self.gap_threshold = gap_threshold
+        self.ring = BarRing(self.tickers, capacity)
+        self.rsi = [RSIState(rsi_period) for _ in self.tickers]
+
+        n = len(self.tickers)
+        self.session = None
+        self.prev_close = np.full(n, np.nan)
+        self.day_open = np.full(n, np.nan)
+        self.last = np.full(n, np.nan)
+        self.rsi_values = np.full(n, np.nan)
+        self.gap_flags = np.zeros(n, dtype=np.int8)
+        self.rsi_zones = np.zeros(n, dtype=np.int8)
+        self.gainers = []
+        self.losers = []
+
+    def _start_session(self, day):
+        # Previous close: the last live close if we saw the prior session, else daily history
+        before = self.daily_close[self.daily_close.index.normalize() < day]
+        history = ind.last_valid(before).to_numpy() if not before.empty else np.full(len(self.tickers), np.nan)
+        self.prev_close = np.where(np.isnan(self.last), history, self.last)
+        self.day_open[:] = np.nan
+        self.gap_flags[:] = 0
+        self.session = day
+
+    @property
+    def change(self):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return (self.last - self.prev_close) / self.prev_close * 100
+
+    @property
+    def gap(self):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return (self.day_open - self.prev_close) / self.prev_close * 100
+
+    def rankings(self):
+        gainers, losers = ind.top_movers(pd.Series(self.change, index=self.tickers), self.top_n)
+        return list(gainers.index), list(losers.index)
+
+    def ingest(self, timestamp, bars):
+        # Apply one bar per ticker and return the list of changes it caused
+        day = pd.Timestamp(timestamp).tz_localize(None).normalize()
+        if day != self.session:
+            self._start_session(day)
+
+        bars = bars[bars.index.isin(self.rows)]
+        rows = np.fromiter((self.rows[t] for t in bars.index), dtype=np.int64, count=len(bars))
+        values = bars[FIELDS].to_numpy(dtype=float).T
+        self.ring.push(rows, timestamp, values)
+
+        close = values[FIELDS.index("Close")]
+        first_bar = np.isnan(self.day_open[rows])
+        self.day_open[rows[first_bar]] = values[FIELDS.index("Open")][first_bar]
+        self.last[rows] = close
+        for row, value in zip(rows, close):
+            self.rsi_values[row] = self.rsi[row].update(value)
+
+        return self._diff(rows)
+
+    def _diff(self, rows):
+        events = []
+
+        gap = self.gap[rows]
+        flags = np.where(gap > self.gap_threshold, 1, np.where(gap < -self.gap_threshold, -1, 0)).astype(np.int8)
+        for row in rows[flags != self.gap_flags[rows]]:
+            events.append(("gap", self.tickers[row], float(self.gap[row])))
+        self.gap_flags[rows] = flags
+
+        rsi = self.rsi_values[rows]
+        zones = np.where(rsi < OVERSOLD, -1, np.where(rsi > OVERBOUGHT, 1, 0)).astype(np.int8)
+        for row in rows[zones != self.rsi_zones[rows]]:
+            events.append(("rsi", self.tickers[row], float(self.rsi_values[row])))
+        self.rsi_zones[rows] = zones
+
+        gainers, losers = self.rankings()
+        change = self.change
+        for name, old, new in (("gainers", self.gainers, gainers), ("losers", self.losers, losers)):
+            if new != old:
+                events.append((name, [(t, float(change[self.rows[t]])) for t in new],
+                               [t for t in new if t not in old], [t for t in old if t not in new]))
+        self.gainers, self.losers = gainers, losers
+        return events
+
+    def frame(self):
+        return pd.DataFrame({
+            "Ticker": self.tickers,
+            "Prev Close": self.prev_close,
+            "Last": self.last,
+            "Change %": self.change,
+            "Gap %": self.gap,
+            "RSI": self.rsi_values,
+        })
+
+    def history(self, ticker):
+        return self.ring.frame(self.rows[ticker])
+
+
+def print_events(timestamp, events):
+    stamp = pd.Timestamp(timestamp).strftime("%H:%M")
+    for event in events:
+        kind = event[0]
+        if kind in ("gainers", "losers"):
+            _, top, entered, left = event
+            head = ", ".join(f"{t} {c:+.2f}%" for t, c in top[:5])
+            moves = "".join([f" ⬆️ {', '.join(entered)}" if entered else "",
+                             f" ⬇️ {', '.join(left)}" if left else ""])
+            print(f"[{stamp}] {'📈' if kind == 'gainers' else '📉'} {kind.title()}: {head}{moves}")
+        elif kind == "gap":
+            _, ticker, gap = event
+            print(f"[{stamp}] 🕳️ {ticker} gap {gap:+.2f}%")
+        else:
+            _, ticker, rsi = event
+            zone = "oversold" if rsi < OVERSOLD else "overbought" if rsi > OVERBOUGHT else "neutral"
+            print(f"[{stamp}] 📊 {ticker} RSI {rsi:.1f} ({zone})")
+
+
+@instrumented
+def run_live(tickers, source, snapshot=None, top_n=10, gap_threshold=2.0, on_events=print_events):
+    if snapshot is not None:
+        daily = snapshot.window("10d", adjusted=False)
+    else:
+        daily = fetch_panel(tickers, period="10d", auto_adjust=False)
+    scanner = LiveScanner(tickers, field_matrix(daily, "Close"), top_n, gap_threshold)
+
+    print(f"\n📡 Live scan of {len(scanner.tickers)} tickers (Ctrl+C to stop)...")
+    bars_seen, slowest = 0, 0.0
+    try:
+        for timestamp, bars in source:
+            start = time.perf_counter()
+            events = scanner.ingest(timestamp, bars)
+            slowest = max(slowest, time.perf_counter() - start)
+            bars_seen += 1
+            if events and on_events:
+                on_events(timestamp, events)
+    except KeyboardInterrupt:
+        print("\n❗ Live scan stopped.")
+
+    print(f"⏱️ {bars_seen} bars ingested, slowest update {slowest * 1000:.1f} ms")
+    return scanner.frame().dropna(subset=["Last"]).sort_values("Change %", ascending=False)
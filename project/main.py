@@ -1,89 +1,116 @@
-import yfinance as yf
 import pandas as pd
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
 import os
-import seaborn as sns
 import numpy as np
-import math
-import time
-import mplfinance as mpf
-from datetime import datetime, timedelta
-
-# Setup output folder
+import data
+from data import fetch_panel, get_ticker_df, field_matrix, trim_period
+from cache import CachedProvider, PriceCache
+from fetcher import FetchExecutor
+from snapshot import UniverseSnapshot
+from streaming import MoversHeap
+import indicators as ind
+import heatmap
+from render import ChartJob, charts_enabled, render_jobs
+from instrument import instrumented, recorder, stage
+from history import DB_FILE, HitStore, record_hits, set_store
+from validate import QUARANTINE_FILE, Quarantine, set_quarantine
+
+# Output folder for charts
 output_dir = "stock_graphs"
-os.makedirs(output_dir, exist_ok=True)
 
-# Load ticker list
-tickers_df = pd.read_csv("nifty_500_list.csv")
-tickers = tickers_df["Symbol"].tolist()
+# Serve repeat downloads from the local price cache; misses go out through
+# a rate-limited, retrying thread pool. Installed by setup_data().
+price_cache = None
+network = None
+
+
+def setup_data(cache_dir="price_cache", history_db=DB_FILE):
+    global price_cache, network
+    price_cache = PriceCache(cache_dir)
+    set_store(HitStore(history_db))
+    set_quarantine(Quarantine(os.path.join(cache_dir, QUARANTINE_FILE)))
+    network = FetchExecutor(data.YahooProvider(), max_workers=4, rate=4.0, batch_size=20)
+    data.set_provider(CachedProvider(network, price_cache))
+    recorder.watch("cache", price_cache.stats)
+    recorder.watch("fetch", network.stats)
+
+
+def load_tickers(path="nifty_500_list.csv"):
+    tickers_df = pd.read_csv(path)
+    return tickers_df["Symbol"].tolist()
+
 
 def fetch_data(ticker, period="1y", interval="1d"):
-    try:
-        data = yf.download(ticker, period=period, interval=interval, progress=False, auto_adjust=True)
-        return data
-    except:
-        return None
+    data = get_ticker_df(fetch_panel([ticker], period=period, interval=interval), ticker)
+    return data if not data.empty else None
 
 #------------------------------------------------------------------------------------------------------------------------------------------------------------
 #  1st 5 Y high 1 Y low
 
-def strong_5y_weak_1y():
+@instrumented
+def strong_5y_weak_1y(tickers, min_5y_return=None, max_1y_return=None, snapshot=None):
     try:
-        min_5y_return = float(input("Enter minimum 5-Year return % (e.g., 50): "))
-        max_1y_return = float(input("Enter maximum 1-Year return % (e.g., -5 for negative return): "))
+        if min_5y_return is None:
+            min_5y_return = float(input("Enter minimum 5-Year return % (e.g., 50): "))
+        if max_1y_return is None:
+            max_1y_return = float(input("Enter maximum 1-Year return % (e.g., -5 for negative return): "))
         results = []
+        jobs = []
 
         # Create subfolder for this module inside 'stock_graphs'
         output_dir = os.path.join("stock_graphs", "strong_5y_weak_1y")
         os.makedirs(output_dir, exist_ok=True)
 
-        for ticker in tickers:
+        snapshot = snapshot or UniverseSnapshot(tickers)
+
+        # Returns for the whole universe in one pass (over the float32 arrays in
+        # compact mode), then filter
+        with stage("compute"):
+            if snapshot.compact:
+                store = snapshot.compact_panel(tickers=tickers, period="5y")
+                returns_5y = store.period_return()
+                returns_1y = store.trim("1y").period_return()
+            else:
+                close = field_matrix(snapshot.window("5y"), "Close").reindex(columns=tickers)
+                returns_5y = ind.period_return(close)
+                returns_1y = ind.period_return(trim_period(close, "1y"))
+        with stage("filter"):
+            mask = (returns_5y >= min_5y_return) & (returns_1y >= max_1y_return)
+
+        for ticker in mask[mask].index:
             try:
-                data_5y = fetch_data(ticker, period="5y")
-                data_1y = fetch_data(ticker, period="1y")
-
-                if data_5y is None or data_1y is None or data_5y.empty or data_1y.empty:
-                    continue
-
-                start_5y = data_5y["Close"].iloc[0].item()
-                end_5y = data_5y["Close"].iloc[-1].item()
-                start_1y = data_1y["Close"].iloc[0].item()
-                end_1y = data_1y["Close"].iloc[-1].item()
-
-                if start_5y == 0 or start_1y == 0:
-                    continue
-
-                ret_5y = ((end_5y - start_5y) / start_5y) * 100
-                ret_1y = ((end_1y - start_1y) / start_1y) * 100
-
-                if ret_5y >= min_5y_return and ret_1y >= max_1y_return:
-                    results.append({
-                        "Ticker": ticker,
-                        "5Y Return": round(ret_5y, 2),
-                        "1Y Return": round(ret_1y, 2)
-                    })
-
-                    plt.figure(figsize=(10, 5))
-                    data_5y["Close"].plot(title=f"{ticker} - 5Y Close\n5Y: {round(ret_5y, 2)}%, 1Y: {round(ret_1y, 2)}%", color='blue')
-                    plt.xlabel("Date")
-                    plt.ylabel("Close Price")
-                    plt.tight_layout()
-
-                    graph_path = os.path.join(output_dir, f"{ticker}_5y_return_graph.png")
-                    plt.savefig(graph_path)
-                    plt.close()
-                    print(f"📈 Saved graph for {ticker}: {graph_path}")
+                if snapshot.compact:
+                    data_5y = store.frame(ticker).dropna(subset=["Close"])
+                else:
+                    data_5y = close[ticker].dropna().to_frame("Close")
+                ret_5y = returns_5y[ticker]
+                ret_1y = returns_1y[ticker]
+
+                results.append({
+                    "Ticker": ticker,
+                    "5Y Return": round(ret_5y, 2),
+                    "1Y Return": round(ret_1y, 2)
+                })
+
+                jobs.append(ChartJob(
+                    "line", os.path.join(output_dir, f"{ticker}_5y_return_graph.png"),
+                    f"{ticker} - 5Y Close\n5Y: {round(ret_5y, 2)}%, 1Y: {round(ret_1y, 2)}%",
+                    data_5y, priority=ret_5y, lines={"Close": (None, 'blue')},
+                    ylabel="Close Price", grid=False, legend=False))
 
             except Exception as e:
                 print(f"⚠️ Skipped {ticker} due to error: {e}")
 
+        render_jobs(jobs)
+
+        df = pd.DataFrame(results, columns=["Ticker", "5Y Return", "1Y Return"])
         if results:
-            df = pd.DataFrame(results)
             print("\n🎯 Stocks matching the criteria:\n")
             print(df)
         else:
             print("❌ No stocks matched the given return filters.")
+        record_hits("strong", df, snapshot.session(),
+                    min_5y_return=min_5y_return, max_1y_return=max_1y_return)
+        return df
 
     except KeyboardInterrupt:
         print("\n❗ Process interrupted by user (Ctrl+C). Exiting module.")
@@ -92,49 +119,64 @@ def strong_5y_weak_1y():
 #------------------------------------------------------------------------------------------------------------------------------------------------------------
 #   2nd Top movers
 
-def top_daily_movers(tickers):
-    results = []
-    
-    for ticker in tickers:
-        try:
-            data = yf.download(ticker, period="2d", interval="1d", progress=False, auto_adjust=False)
-            closes = data['Close']
-            if len(closes) < 2:
-                continue
-
-            prev_close = closes.iloc[-2].item()
-            today_close = closes.iloc[-1].item()
-            change_pct = ((today_close - prev_close) / prev_close) * 100
-            results.append((ticker, prev_close, today_close, change_pct))
-        except Exception as e:
-            print(f"⚠️ Error with {ticker}: {e}")
-            continue
-
-    if not results:
-        print("❌ No valid stock data found.")
-        return
-
+@instrumented
+def top_daily_movers(tickers, top_n=None, direction=None, snapshot=None):
+    # Ask up front so a provisional ranking can be shown while prices stream in
     try:
-        top_n = int(input("Enter number of top stocks to show (e.g., 10): "))
-        direction = input("Enter 1 for Top Gainers or 2 for Top Losers: ")
+        if top_n is None:
+            top_n = int(input("Enter number of top stocks to show (e.g., 10): "))
+        if direction is None:
+            direction = input("Enter 1 for Top Gainers or 2 for Top Losers: ")
     except ValueError:
         print("❌ Invalid input.")
         return
 
-    sorted_results = sorted(results, key=lambda x: x[3], reverse=(direction == "1"))
-    selected = sorted_results[:top_n]
+    snapshot = snapshot or UniverseSnapshot(tickers)
+    wanted = set(tickers)
+    heap = MoversHeap(top_n)
+
+    def provisional(chunk):
+        changes = ind.daily_change(field_matrix(trim_period(chunk, "2d"), "Close"))
+        heap.push_many(changes[changes.index.isin(wanted)])
+        leaders = heap.gainers() if direction == "1" else heap.losers()
+        print(f"⏳ {heap.seen} tickers in, provisional top: "
+              + ", ".join(f"{ticker} {change:+.2f}%" for ticker, change in leaders[:3]))
+
+    with stage("compute"):
+        snapshot.load(on_chunk=provisional)
+        close = field_matrix(snapshot.window("2d", adjusted=False), "Close")
+        prev_closes = ind.last_valid(close, lag=1)
+        today_closes = ind.last_valid(close)
+        changes = ind.daily_change(close)
+        changes = changes[changes.index.isin(tickers)]
+
+    if changes.dropna().empty:
+        print("❌ No valid stock data found.")
+        return
+
+    with stage("filter"):
+        # Gainers and losers from one partial selection, no full sort
+        gainers, losers = ind.top_movers(changes, top_n)
+        picked = gainers if direction == "1" else losers
+        selected = [(ticker, prev_closes[ticker], today_closes[ticker], change)
+                    for ticker, change in picked.items()]
 
     print("\n📈 Top Gainers:" if direction == "1" else "\n📉 Top Losers:")
     for ticker, prev_close, today_close, change_pct in selected:
         print(f"{ticker} | Prev Close: {prev_close} | Today Close: {today_close} | Change: {round(change_pct, 2)}%")
 
-    # Create subfolder for this module
-    output_dir = os.path.join("stock_graphs", "top_daily_movers")
-    os.makedirs(output_dir, exist_ok=True)
+    # The intraday bars are only drawn, so skip them when charts are off
+    charted = selected if charts_enabled() else []
+    if charted:
+        # Create subfolder for this module
+        output_dir = os.path.join("stock_graphs", "top_daily_movers")
+        os.makedirs(output_dir, exist_ok=True)
+        intraday_panel = fetch_panel([t[0] for t in charted], period="1d", interval="5m", auto_adjust=False)
+    jobs = []
 
-    for ticker, _, _, change_pct in selected:
+    for ticker, _, _, change_pct in charted:
         try:
-            intraday = yf.download(ticker, period="1d", interval="5m", progress=False, auto_adjust=False)
+            intraday = get_ticker_df(intraday_panel, ticker).dropna(subset=['Close'])
             if intraday.empty:
                 print(f"⚠️ No intraday data for {ticker}")
                 continue
@@ -143,68 +185,42 @@ def top_daily_movers(tickers):
                 intraday.index = intraday.index.tz_localize('UTC')
             intraday.index = intraday.index.tz_convert('Asia/Kolkata')
 
-            plt.figure(figsize=(10, 5))
-            plt.plot(intraday.index, intraday['Close'], label='Close Price', color='blue')
-            plt.gca().xaxis.set_major_formatter(mdates.DateFormatter('%H:%M', tz=intraday.index.tz))
-            plt.gcf().autofmt_xdate()
-
             date_str = intraday.index[-1].strftime("%Y-%m-%d")
-            plt.title(f"{ticker} Intraday ({date_str}) - Change: {round(change_pct, 2)}%")
-            plt.xlabel("Time (IST)")
-            plt.ylabel("Price (INR)")
-            plt.grid(True)
-            plt.tight_layout()
-
-            filename = os.path.join(output_dir, f"{ticker}_intraday.png")
-            plt.savefig(filename)
-            plt.close()
-            print(f"📊 Chart saved: {filename}")
+            jobs.append(ChartJob(
+                "line", os.path.join(output_dir, f"{ticker}_intraday.png"),
+                f"{ticker} Intraday ({date_str}) - Change: {round(change_pct, 2)}%",
+                intraday[['Close']], priority=abs(change_pct), lines={'Close': ('Close Price', 'blue')},
+                xlabel="Time (IST)", ylabel="Price (INR)", legend=False, time_format='%H:%M'))
         except Exception as e:
             print(f"⚠️ Couldn't plot {ticker}: {e}")
 
+    for filename in render_jobs(jobs):
+        print(f"📊 Chart saved: {filename}")
+
+    df = pd.DataFrame(selected, columns=["Ticker", "Prev Close", "Today Close", "Change %"])
+    record_hits(f"movers_{'gainers' if direction == '1' else 'losers'}", df, snapshot.session(), top_n=top_n)
+    return df
+
 
 
 #------------------------------------------------------------------------------------------------------------------------------------------------------------
 #   3rd Heatmap
 
 
-def generate_nifty500_weekly_heatmap(tickers):
+@instrumented
+def generate_nifty500_weekly_heatmap(tickers, snapshot=None, group_by=None, sector_file=heatmap.SECTOR_FILE):
     print("📥 Fetching weekly price change data...")
-    heatmap_data = []
-
-    for ticker in tickers:
-        try:
-            df = yf.download(ticker, period="7d", interval="1d", progress=False, auto_adjust=True)
-
-            if df is None or df.empty or not isinstance(df, pd.DataFrame):
-                print(f"⚠️ {ticker} skipped: Empty or invalid DataFrame")
-                continue
-
-            if 'Close' not in df.columns:
-                print(f"⚠️ {ticker} skipped: 'Close' column missing")
-                continue
-
-            close_prices = df['Close'].dropna()
-            if len(close_prices) < 2:
-                print(f"⚠️ {ticker} skipped: Not enough valid close data")
-                continue
-
-            prev_close = close_prices.iloc[0].item()
-            latest_close = close_prices.iloc[-1].item()
-
-
-            if prev_close == 0 or pd.isna(prev_close) or pd.isna(latest_close):
-                print(f"⚠️ {ticker} skipped: Invalid price data")
-                continue
-
-            change_pct = ((latest_close - prev_close) / prev_close) * 100
-            heatmap_data.append({'Ticker': ticker, '% Change': change_pct})
-
-        except Exception as e:
-            print(f"⚠️ {ticker} skipped due to error: {e}")
-            continue
-
-    df = pd.DataFrame(heatmap_data)
+    snapshot = snapshot or UniverseSnapshot(tickers)
+    with stage("compute"):
+        # Trailing week from resampled bars: the last 5-session bar against the one before
+        close = field_matrix(snapshot.bars("5d"), "Close")
+        changes = ind.daily_change(close).reindex(tickers)
+        counts = ind.bar_count(close.iloc[-2:]).reindex(tickers).fillna(0)
+    for ticker in changes.index[counts < 2]:
+        print(f"⚠️ {ticker} skipped: Not enough valid close data")
+    changes[counts < 2] = np.nan
+
+    df = pd.DataFrame({'Ticker': changes.index, '% Change': changes.values})
 
     if df.empty or df['% Change'].isna().all():
         print("❌ All % Change values were NaN. Heatmap aborted.")
@@ -212,127 +228,128 @@ def generate_nifty500_weekly_heatmap(tickers):
 
     df = df.dropna(subset=['% Change']).sort_values(by='% Change', ascending=False).reset_index(drop=True)
 
-    # 🧮 Create square-like matrix
-    size = int(math.ceil(math.sqrt(len(df))))
-    matrix = np.full((size, size), np.nan)
-    labels = np.full((size, size), '', dtype=object)
-
-    for i, row in df.iterrows():
-        r, c = divmod(i, size)
-        matrix[r][c] = row['% Change']
-        labels[r][c] = f"{row['Ticker']}\n{row['% Change']:.2f}%"
-
-    plt.figure(figsize=(16, 10))
-    cmap = sns.diverging_palette(20, 220, as_cmap=True)
-    sns.heatmap(matrix, annot=labels, fmt='', cmap=cmap, center=0, linewidths=0.5, cbar_kws={'label': '% Change'})
+    if group_by:
+        # Treemap with one block per sector (or per first letter)
+        sectors = heatmap.load_sectors(sector_file) if group_by == "sector" else {}
+        if group_by == "sector" and not sectors:
+            print(f"⚠️ No sector file at '{sector_file}' (Symbol,Sector columns), grouping alphabetically.")
+        filename = "stock_graphs/nifty500_weekly_treemap.png"
+        job = ChartJob("treemap", filename, "📊 Nifty 500 Weekly % Change by "
+                       f"{'Sector' if sectors else 'Letter'}", heatmap.treemap(changes, sectors))
+    else:
+        # 🧮 Square-like matrix, best performer top-left
+        filename = "stock_graphs/nifty500_weekly_heatmap.png"
+        job = ChartJob("heatmap", filename, "📊 Nifty 500 Weekly % Change Heatmap", heatmap.grid(changes))
 
-    plt.title("📊 Nifty 500 Weekly % Change Heatmap")
-    plt.tight_layout()
+    if render_jobs([job], top_n=1):
+        print(f"✅ Heatmap saved to {filename}")
 
-    os.makedirs("stock_graphs", exist_ok=True)
-    filename = "stock_graphs/nifty500_weekly_heatmap.png"
-    plt.savefig(filename)
-    plt.close()
-    print(f"✅ Heatmap saved to {filename}")
+    record_hits("heatmap", df, snapshot.session())
+    return df
 
 #------------------------------------------------------------------------------------------------------------------------------------------------------------
 # 4th 52 Week High/Low
 
-def screen_52_week_high(tickers):
+@instrumented
+def screen_52_week_high(tickers, snapshot=None):
     print("\n📊 Scanning for stocks at 52-week HIGH...")
 
     # Correct folder name
     output_dir = "stock_graphs/52_week_high"
     os.makedirs(output_dir, exist_ok=True)
     found_any = False
-
-    for ticker in tickers:
+    jobs = []
+    hits = []
+    snapshot = snapshot or UniverseSnapshot(tickers)
+    with stage("compute"):
+        close = field_matrix(snapshot.window("1y"), "Close")
+        latest = ind.last_valid(close).reindex(tickers)
+        high_52w = close.max().reindex(tickers)
+    for ticker in latest.index[latest.isna()]:
+        print(f"⚠️ {ticker} skipped: No valid 'Close' data")
+
+    with stage("filter"):
+        at_high = np.isclose(latest, high_52w, atol=0.01)
+
+    for ticker, latest_close in latest[at_high].items():
         try:
-            df = yf.download(ticker, period="1y", interval="1d", progress=False, auto_adjust=True)
-            if df.empty or 'Close' not in df.columns or df['Close'].dropna().empty:
-                print(f"⚠️ {ticker} skipped: No valid 'Close' data")
-                continue
+            close_prices = close[ticker].dropna()
 
-            close_prices = df['Close'].dropna()
-            latest_close = df['Close'].iloc[-1].item()
-            high_52w = df['Close'].max().item()
-
-            # Fix: Ensure scalar comparison
-            if np.isclose(latest_close, high_52w, atol=0.01):
-                print(f"✅ {ticker} is at 52-week HIGH ({latest_close:.2f})")
-                found_any = True
-
-                # Save graph
-                plt.figure(figsize=(10, 5))
-                plt.plot(close_prices.index, close_prices.values, label='Close Price')
-                plt.title(f"{ticker} - 1Y Chart (52W High)")
-                plt.xlabel("Date")
-                plt.ylabel("Price")
-                plt.grid(True)
-                plt.legend()
-                plt.tight_layout()
-
-                # ✅ Corrected path
-                filename = os.path.join(output_dir, f"{ticker}_52whigh_chart.png")
-                plt.savefig(filename)
-                plt.close()
+            print(f"✅ {ticker} is at 52-week HIGH ({latest_close:.2f})")
+            found_any = True
+            hits.append((ticker, latest_close))
+
+            # Queue graph
+            jobs.append(ChartJob(
+                "line", os.path.join(output_dir, f"{ticker}_52whigh_chart.png"),
+                f"{ticker} - 1Y Chart (52W High)", close_prices.to_frame('Close'),
+                lines={'Close': ('Close Price', None)}))
 
         except Exception as e:
             print(f"⚠️ {ticker} skipped due to error: {e}")
 
+    render_jobs(jobs)
+
     if not found_any:
         print("❌ No stocks currently at 52-week high.")
-    else:
+    elif charts_enabled():
         print(f"📁 Charts saved in '{output_dir}'")
 
+    df = pd.DataFrame(hits, columns=["Ticker", "Close"])
+    record_hits("high52", df, snapshot.session())
+    return df
+
 
 
 #------------------------------------------------------------------------------------------------------------------------------------------------------------
 # 5th 52 Week Low
 
-def screen_52_week_low(tickers):
+@instrumented
+def screen_52_week_low(tickers, snapshot=None):
     print("\n📉 Scanning for stocks at 52-week LOW...")
 
     os.makedirs("stock_graphs/52_week_low", exist_ok=True)
     found_any = False
-
-    for ticker in tickers:
+    jobs = []
+    hits = []
+    snapshot = snapshot or UniverseSnapshot(tickers)
+    with stage("compute"):
+        close = field_matrix(snapshot.window("1y"), "Close")
+        latest = ind.last_valid(close).reindex(tickers)
+        low_52w = close.min().reindex(tickers)
+    for ticker in latest.index[latest.isna()]:
+        print(f"⚠️ {ticker} skipped: No valid 'Close' data")
+
+    with stage("filter"):
+        at_low = np.isclose(latest, low_52w, atol=0.01)
+
+    for ticker, latest_close in latest[at_low].items():
         try:
-            df = yf.download(ticker, period="1y", interval="1d", progress=False, auto_adjust=True)
-            if df.empty or 'Close' not in df.columns or df['Close'].dropna().empty:
-                print(f"⚠️ {ticker} skipped: No valid 'Close' data")
-                continue
+            close_prices = close[ticker].dropna()
 
-            close_prices = df['Close'].dropna()
-            latest_close = df['Close'].iloc[-1].item()
-            low_52w = df['Close'].min().item()
-
-            # Fix: Ensure scalar comparison
-            if np.isclose(latest_close, low_52w, atol=0.01):
-                print(f"✅ {ticker} is at 52-week LOW ({latest_close:.2f})")
-                found_any = True
-
-                # Save graph
-                plt.figure(figsize=(10, 5))
-                plt.plot(close_prices.index, close_prices.values, label='Close Price', color='red')
-                plt.title(f"{ticker} - 1Y Chart (52W Low)")
-                plt.xlabel("Date")
-                plt.ylabel("Price")
-                plt.grid(True)
-                plt.legend()
-                plt.tight_layout()
-
-                filename = f"stock_graphs/52_week/{ticker}_52wlow_chart.png"
-                plt.savefig(filename)
-                plt.close()
+            print(f"✅ {ticker} is at 52-week LOW ({latest_close:.2f})")
+            found_any = True
+            hits.append((ticker, latest_close))
+
+            # Queue graph
+            jobs.append(ChartJob(
+                "line", f"stock_graphs/52_week_low/{ticker}_52wlow_chart.png",
+                f"{ticker} - 1Y Chart (52W Low)", close_prices.to_frame('Close'),
+                lines={'Close': ('Close Price', 'red')}))
 
         except Exception as e:
             print(f"⚠️ {ticker} skipped due to error: {e}")
 
+    render_jobs(jobs)
+
     if not found_any:
         print("❌ No stocks currently at 52-week low.")
-    else:
-        print("📁 Charts saved in 'stock_graphs/52_week/'")
+    elif charts_enabled():
+        print("📁 Charts saved in 'stock_graphs/52_week_low/'")
+
+    df = pd.DataFrame(hits, columns=["Ticker", "Close"])
+    record_hits("low52", df, snapshot.session())
+    return df
         
         
 #-------------------------------------------------------------------------------------------------------------------------------------------------------------
@@ -346,243 +363,217 @@ def calculate_rsi(series, period=14):
     rsi = 100 - (100 / (1 + rs))
     return rsi
 
-def screen_rsi_stocks(tickers, mode):
+@instrumented
+def screen_rsi_stocks(tickers, mode, snapshot=None, timeframe="1d"):
     if mode not in ['low', 'high']:
         print("❌ Invalid mode. Use 'low' for RSI<30 or 'high' for RSI>70.")
         return
 
-    print(f"\n📊 Scanning for stocks with RSI {'< 30' if mode == 'low' else '> 70'}...")
+    # Weekly/monthly RSI runs on bars resampled from the daily history
+    suffix, prefix = ("", "") if timeframe == "1d" else (f"_{timeframe}", f"{timeframe} ")
+    print(f"\n📊 Scanning for stocks with {prefix}RSI {'< 30' if mode == 'low' else '> 70'}...")
 
-    folder = f"stock_graphs/rsi_{mode}"
+    folder = f"stock_graphs/rsi_{mode}{suffix}"
     os.makedirs(folder, exist_ok=True)
     found_any = False
-
-    for ticker in tickers:
+    jobs = []
+    hits = []
+    snapshot = snapshot or UniverseSnapshot(tickers)
+    # RSI for every ticker at once, then a mask over the latest values
+    with stage("compute"):
+        bars = snapshot.window("3mo") if timeframe == "1d" else snapshot.bars(timeframe)
+        close = field_matrix(bars, "Close")
+        rsi_values = ind.last_valid(ind.rsi(close)).reindex(tickers)
+    for ticker in rsi_values.index[rsi_values.isna()]:
+        print(f"⚠️ {ticker} skipped: RSI is all NaN")
+
+    with stage("filter"):
+        matches = rsi_values < 30 if mode == 'low' else rsi_values > 70
+
+    for ticker, latest_rsi in rsi_values[matches].items():
         try:
-            df = yf.download(ticker, period="3mo", interval="1d", progress=False, auto_adjust=True)
-
-            if df.empty or 'Close' not in df.columns or df['Close'].dropna().empty:
-                print(f"⚠️ {ticker} skipped: No valid 'Close' data")
-                continue
-
-            rsi = calculate_rsi(df['Close']).dropna()
-            if rsi.empty:
-                print(f"⚠️ {ticker} skipped: RSI is all NaN")
-                continue
+            df = close[[ticker]].dropna().rename(columns={ticker: 'Close'})
 
-            latest_rsi = rsi.iloc[-1]
-            if isinstance(latest_rsi, pd.Series):  # extra safety check
-                latest_rsi = latest_rsi.item()
+            print(f"✅ {ticker} has RSI = {latest_rsi:.2f} ({'Oversold' if mode == 'low' else 'Overbought'})")
+            found_any = True
+            hits.append((ticker, latest_rsi))
 
-            # Now safe to compare
-            if (mode == 'low' and latest_rsi < 30) or (mode == 'high' and latest_rsi > 70):
-                print(f"✅ {ticker} has RSI = {latest_rsi:.2f} ({'Oversold' if mode == 'low' else 'Overbought'})")
-                found_any = True
-
-                plt.figure(figsize=(10, 5))
-                plt.plot(df['Close'], label='Close Price', color='blue')
-                plt.title(f"{ticker} - Close Price (RSI {mode.upper()})")
-                plt.xlabel("Date")
-                plt.ylabel("Price")
-                plt.grid(True)
-                plt.legend()
-                plt.tight_layout()
-
-                filename = f"{folder}/{ticker}_rsi_{mode}.png"
-                plt.savefig(filename)
-                plt.close()
+            jobs.append(ChartJob(
+                "line", f"{folder}/{ticker}_rsi_{mode}{suffix}.png",
+                f"{ticker} - Close Price (RSI {mode.upper()})", df,
+                priority=-latest_rsi if mode == 'low' else latest_rsi,
+                lines={'Close': ('Close Price', 'blue')}))
 
         except Exception as e:
             print(f"⚠️ {ticker} skipped due to error: {e}")
 
+    render_jobs(jobs)
+
     if not found_any:
         print("❌ No stocks found matching RSI criteria.")
-    else:
+    elif charts_enabled():
         print(f"📁 Charts saved in '{folder}/'")
 
+    df = pd.DataFrame(hits, columns=["Ticker", "RSI"])
+    record_hits(f"rsi_{mode}{suffix}", df, snapshot.session())
+    return df
+
 #------------------------------------------------------------------------------------------------------------------------------------------------------------
 # 7 Gap up/down
 
-def screen_gap_up_down(tickers, gap_threshold=2.0, user_choice="1"):
+@instrumented
+def screen_gap_up_down(tickers, gap_threshold=2.0, user_choice="1", snapshot=None):
     mode = 'gap_up' if user_choice == "1" else 'gap_down'
     print(f"\n📊 Scanning for {'Gap Up' if mode == 'gap_up' else 'Gap Down'} stocks (Gap {'>' if mode == 'gap_up' else '<'} {gap_threshold}%)...")
 
     folder = f"stock_graphs/{mode}"
     os.makedirs(folder, exist_ok=True)
     found_any = False
+    jobs = []
+    hits = []
+    snapshot = snapshot or UniverseSnapshot(tickers)
+    required_cols = ['Open', 'Close', 'High', 'Low', 'Volume']
 
-    for ticker in tickers:
-        try:
-            df = yf.download(ticker, period="15d", interval="1d", progress=False, auto_adjust=False)
-
-            # Flatten multi-index if needed
-            if isinstance(df.columns, pd.MultiIndex):
-                df.columns = df.columns.get_level_values(0)
+    with stage("compute"):
+        panel = snapshot.window("15d", adjusted=False)
+        gaps = ind.gap_pct(field_matrix(panel, "Open"), field_matrix(panel, "Close")).reindex(tickers)
+    for ticker in gaps.index[gaps.isna()]:
+        print(f"⚠️ {ticker} skipped: Not enough data.")
 
-            if df is None or df.empty or len(df) < 2:
-                print(f"⚠️ {ticker} skipped: Not enough data.")
-                continue
+    with stage("filter"):
+        matches = gaps > gap_threshold if mode == 'gap_up' else gaps < -gap_threshold
 
-            required_cols = ['Open', 'Close', 'High', 'Low', 'Volume']
-            if not set(required_cols).issubset(df.columns):
-                print(f"⚠️ {ticker} skipped: Missing OHLCV columns.")
-                continue
+    for ticker, gap_percent in gaps[matches].items():
+        try:
+            df = get_ticker_df(panel, ticker)
 
-            prev_close_val = df['Close'].iloc[-2]
-            today_open_val = df['Open'].iloc[-1]
+            print(f"✅ {ticker}: Gap = {gap_percent:.2f}%")
+            found_any = True
+            hits.append((ticker, gap_percent))
 
-            if pd.isna(prev_close_val) or pd.isna(today_open_val):
-                print(f"⚠️ {ticker} skipped: Invalid Open/Close values.")
+            plot_df = df[required_cols].copy().tail(10)
+            plot_df.dropna(inplace=True)
+            plot_df = plot_df[plot_df['Volume'] > 0]
+            if len(plot_df) < 2:
+                print(f"⚠️ {ticker} skipped: Not enough clean data.")
                 continue
 
-            gap_percent = ((today_open_val - prev_close_val) / prev_close_val) * 100
-
-            if (mode == 'gap_up' and gap_percent > gap_threshold) or \
-               (mode == 'gap_down' and gap_percent < -gap_threshold):
-
-                print(f"✅ {ticker}: Gap = {gap_percent:.2f}%")
-                found_any = True
-
-                plot_df = df[required_cols].copy().tail(10)
-                plot_df.dropna(inplace=True)
-                plot_df = plot_df[plot_df['Volume'] > 0]
-                if len(plot_df) < 2:
-                    print(f"⚠️ {ticker} skipped: Not enough clean data.")
-                    continue
-
-                if not isinstance(plot_df.index, pd.DatetimeIndex):
-                    try:
-                        plot_df.index = pd.to_datetime(plot_df.index)
-                    except Exception as e:
-                        print(f"⚠️ {ticker} skipped: Invalid datetime index. {e}")
-                        continue
-
-                for col in required_cols:
-                    plot_df[col] = pd.to_numeric(plot_df[col], errors='coerce')
-                plot_df.dropna(inplace=True)
-
+            if not isinstance(plot_df.index, pd.DatetimeIndex):
                 try:
-                    plot_df = plot_df.astype({
-                        'Open': float,
-                        'High': float,
-                        'Low': float,
-                        'Close': float,
-                        'Volume': int
-                    })
+                    plot_df.index = pd.to_datetime(plot_df.index)
                 except Exception as e:
-                    print(f"⚠️ {ticker} skipped during type casting: {e}")
+                    print(f"⚠️ {ticker} skipped: Invalid datetime index. {e}")
                     continue
 
-                try:
-                    # Custom plotting to show all dates
-                    fig, axlist = mpf.plot(
-                        plot_df,
-                        type='candle',
-                        style='yahoo',
-                        title=f"{ticker} ({'Gap Up' if mode == 'gap_up' else 'Gap Down'})",
-                        ylabel='Price',
-                        volume=True,
-                        returnfig=True
-                    )
-
-                    ax = axlist[0]  # Main price chart
-                    ax.set_xticks(range(len(plot_df)))
-                    ax.set_xticklabels(
-                        [d.strftime('%b-%d') for d in plot_df.index],
-                        rotation=20,
-                        ha='right'
-                    )
-
-                    fig.subplots_adjust(bottom=0.2)  # Add more spacing at the bottom for date labels
-
-                    fig.savefig(f"{folder}/{ticker}_gap_{mode}.png")
-                    plt.close(fig)
+            for col in required_cols:
+                plot_df[col] = pd.to_numeric(plot_df[col], errors='coerce')
+            plot_df.dropna(inplace=True)
 
-                except Exception as e:
-                    print(f"⚠️ {ticker} skipped during plotting: {e}")
-                    continue
+            try:
+                plot_df = plot_df.astype({
+                    'Open': float,
+                    'High': float,
+                    'Low': float,
+                    'Close': float,
+                    'Volume': int
+                })
+            except Exception as e:
+                print(f"⚠️ {ticker} skipped during type casting: {e}")
+                continue
+
+            jobs.append(ChartJob(
+                "candle", f"{folder}/{ticker}_gap_{mode}.png",
+                f"{ticker} ({'Gap Up' if mode == 'gap_up' else 'Gap Down'})", plot_df,
+                priority=abs(gap_percent)))
 
         except Exception as e:
             print(f"⚠️ {ticker} skipped due to error: {e}")
             continue
 
+    render_jobs(jobs)
+
     if not found_any:
         print("❌ No stocks matched the gap criteria.")
-    else:
+    elif charts_enabled():
         print(f"📁 Charts saved in '{folder}/'")
+
+    df = pd.DataFrame(hits, columns=["Ticker", "Gap %"])
+    record_hits(mode, df, snapshot.session(), gap_threshold=gap_threshold)
+    return df
         
         
 #-------------------------------------------------------------------------------------------------------------------------------------------------------------
 # 8 macd crossover
 
-def screen_macd_crossover(tickers, user_choice="bullish", save_charts=True):
+@instrumented
+def screen_macd_crossover(tickers, user_choice="bullish", save_charts=True, snapshot=None, timeframe="1d"):
     crossover_type = "bullish" if user_choice.lower() == "bullish" else "bearish"
-    print(f"\n📊 Scanning for {crossover_type.title()} MACD Crossovers...")
+    suffix, prefix = ("", "") if timeframe == "1d" else (f"_{timeframe}", f"{timeframe} ")
+    print(f"\n📊 Scanning for {crossover_type.title()} {prefix}MACD Crossovers...")
 
-    folder = f"stock_graphs/macd_{crossover_type}"
+    folder = f"stock_graphs/macd_{crossover_type}{suffix}"
     if save_charts:
         os.makedirs(folder, exist_ok=True)
 
     found_any = False
-
-    for ticker in tickers:
+    jobs = []
+    hits = []
+    snapshot = snapshot or UniverseSnapshot(tickers)
+    # MACD and Signal Line for all tickers, crossover detected on the last two bars
+    with stage("compute"):
+        bars = snapshot.window("3mo") if timeframe == "1d" else snapshot.bars(timeframe)
+        close = field_matrix(bars, "Close")
+        macd_line, signal_line = ind.macd(close)
+        bullish, bearish = ind.crossover(macd_line, signal_line)
+        enough = (ind.bar_count(close) >= ind.MACD_MIN_BARS).reindex(tickers, fill_value=False)
+    for ticker in enough.index[~enough]:
+        print(f"⚠️ {ticker} skipped: Not enough data.")
+
+    with stage("filter"):
+        crossed = (bullish if crossover_type == "bullish" else bearish).reindex(tickers, fill_value=False)
+
+    for ticker in crossed.index[crossed & enough]:
         try:
-            df = yf.download(ticker, period="3mo", interval="1d", auto_adjust=True, progress=False)
-
-            if df.empty or len(df) < 35:
-                print(f"⚠️ {ticker} skipped: Not enough data.")
-                continue
-
-            # Calculate MACD and Signal Line
-            df['EMA12'] = df['Close'].ewm(span=12, adjust=False).mean()
-            df['EMA26'] = df['Close'].ewm(span=26, adjust=False).mean()
-            df['MACD'] = df['EMA12'] - df['EMA26']
-            df['Signal'] = df['MACD'].ewm(span=9, adjust=False).mean()
-
-            # Detect crossover (today vs yesterday)
-            macd_today = df['MACD'].iloc[-1]
-            signal_today = df['Signal'].iloc[-1]
-            macd_yesterday = df['MACD'].iloc[-2]
-            signal_yesterday = df['Signal'].iloc[-2]
-
-            bullish = macd_yesterday < signal_yesterday and macd_today > signal_today
-            bearish = macd_yesterday > signal_yesterday and macd_today < signal_today
-
-            if (crossover_type == "bullish" and bullish) or (crossover_type == "bearish" and bearish):
-                print(f"✅ {ticker}: {crossover_type.title()} Crossover")
-                found_any = True
-
-                if save_charts:
-                    plot_df = df[['Close', 'MACD', 'Signal']].tail(60)
-
-                    plt.figure(figsize=(10, 6))
-                    plt.plot(plot_df.index, plot_df['MACD'], label='MACD Line', color='blue')
-                    plt.plot(plot_df.index, plot_df['Signal'], label='Signal Line', color='red')
-                    plt.title(f"{ticker} - MACD {crossover_type.title()} Crossover")
-                    plt.xlabel("Date")
-                    plt.ylabel("MACD")
-                    plt.legend()
-                    plt.grid(True)
-                    plt.tight_layout()
-                    plt.savefig(f"{folder}/{ticker}_macd_{crossover_type}.png")
-                    plt.close()
+            df = pd.DataFrame({'Close': close[ticker], 'MACD': macd_line[ticker],
+                               'Signal': signal_line[ticker]}).dropna()
+
+            print(f"✅ {ticker}: {crossover_type.title()} Crossover")
+            found_any = True
+            hits.append((ticker, df['MACD'].iloc[-1], df['Signal'].iloc[-1]))
+
+            if save_charts:
+                plot_df = df[['Close', 'MACD', 'Signal']].tail(60)
+                jobs.append(ChartJob(
+                    "line", f"{folder}/{ticker}_macd_{crossover_type}{suffix}.png",
+                    f"{ticker} - MACD {crossover_type.title()} Crossover", plot_df,
+                    priority=abs(plot_df['MACD'].iloc[-1] - plot_df['Signal'].iloc[-1]),
+                    lines={'MACD': ('MACD Line', 'blue'), 'Signal': ('Signal Line', 'red')},
+                    ylabel="MACD", figsize=(10, 6)))
 
         except Exception as e:
             print(f"⚠️ {ticker} skipped due to error: {e}")
 
+    render_jobs(jobs)
+
     if not found_any:
         print("❌ No stocks matched the MACD crossover criteria.")
-    else:
+    elif charts_enabled():
         print(f"📁 Charts saved in '{folder}/'")
+
+    df = pd.DataFrame(hits, columns=["Ticker", "MACD", "Signal"])
+    record_hits(f"macd_{crossover_type}{suffix}", df, snapshot.session())
+    return df
         
         
 #------------------------------------------------------------------------------------------------------------------------------------------------------------
 
 # return over n years
 
-def plot_return_over_n_years(tickers):
+@instrumented
+def plot_return_over_n_years(tickers, n_years=None, snapshot=None):
     try:
-        n_years = int(input("Enter number of years (e.g., 3 for 3-year return): ").strip())
+        if n_years is None:
+            n_years = int(input("Enter number of years (e.g., 3 for 3-year return): ").strip())
         if n_years <= 0:
             print("❌ Enter a valid number of years (>0).")
             return
@@ -590,50 +581,51 @@ def plot_return_over_n_years(tickers):
         print("❌ Invalid input. Please enter a number.")
         return
 
-    end_date = datetime.today()
-    start_date = end_date - timedelta(days=365 * n_years)
-
     folder = f"stock_graphs/returns_over_{n_years}y"
     os.makedirs(folder, exist_ok=True)
 
     print(f"\n📊 Generating {n_years}-Year Return Line Charts...\n")
-
-    for ticker in tickers:
+    jobs = []
+    hits = []
+
+    snapshot = snapshot or UniverseSnapshot(tickers)
+    snapshot.ensure_lookback(n_years)
+    with stage("compute"):
+        if snapshot.compact:
+            store = snapshot.compact_panel(tickers=tickers, period=f"{n_years}y")
+            returns, bars = store.period_return(), store.bar_count()
+        else:
+            close = field_matrix(snapshot.window(f"{n_years}y"), "Close")
+            returns, bars = ind.period_return(close), ind.bar_count(close)
+        returns = returns.reindex(tickers)
+        enough = (bars >= 2).reindex(tickers, fill_value=False)
+    for ticker in returns.index[~enough]:
+        print(f"⚠️ {ticker} skipped: Not enough price history.")
+
+    for ticker, return_pct in returns[enough].items():
         try:
-            df = yf.download(ticker, start=start_date, end=end_date, progress=False, auto_adjust=True)
-
-
-            if df is None or df.empty or 'Close' not in df.columns:
-                print(f"⚠️ {ticker} skipped: No valid data.")
-                continue
-
-            df = df[['Close']].dropna()
-            if df.empty or len(df) < 2:
-                print(f"⚠️ {ticker} skipped: Not enough price history.")
-                continue
-
-            initial_price = df['Close'].iloc[0].item()
-            final_price = df['Close'].iloc[-1].item()
-            return_pct = ((final_price - initial_price) / initial_price) * 100
-
-
-            plt.figure(figsize=(10, 5))
-            plt.plot(df.index, df['Close'], label='Close Price')
-            plt.title(f"{ticker} - {n_years}Y Return: {return_pct:.2f}%")
-            plt.xlabel("Date")
-            plt.ylabel("Price")
-            plt.legend()
-            plt.grid(True)
-            plt.tight_layout()
+            series = store.series(ticker) if snapshot.compact else close[ticker]
+            df = series.dropna().to_frame('Close')
 
-            plt.savefig(f"{folder}/{ticker}_return_{n_years}y.png")
-            plt.close()
+            jobs.append(ChartJob(
+                "line", f"{folder}/{ticker}_return_{n_years}y.png",
+                f"{ticker} - {n_years}Y Return: {return_pct:.2f}%", df,
+                priority=return_pct, lines={'Close': ('Close Price', None)}))
             print(f"✅ {ticker}: Return = {return_pct:.2f}%")
+            hits.append((ticker, return_pct))
 
         except Exception as e:
             print(f"⚠️ {ticker} skipped due to error: {e}")
 
-    print(f"\n📁 All charts saved in '{folder}/'")
+    render_jobs(jobs)
+    if charts_enabled():
+        print(f"\n📁 All charts saved in '{folder}/'")
+
+    if not hits:
+        print("❌ No stocks had enough price history.")
+    df = pd.DataFrame(hits, columns=["Ticker", "Return %"])
+    record_hits(f"returns_{n_years}y", df, snapshot.session(), n_years=n_years)
+    return df
 
 
                 
@@ -653,76 +645,105 @@ def show_menu():
     print("9. Return Over N Years")
     print("10. Exit")
 
-while True:
-    show_menu()
-    choice = input("Enter your choice (1-10): ").strip()
+def run_menu(universe):
+    # One universe download shared by every menu option in this session
+    snapshot = UniverseSnapshot(universe)
 
-    if choice == "1":
-        strong_5y_weak_1y()
+    while True:
+        show_menu()
+        choice = input("Enter your choice (1-10): ").strip()
+        tickers = snapshot.usable(universe)
+        if not tickers and choice in [str(n) for n in range(1, 10)]:
+            print("❌ No stocks to scan: every ticker is quarantined.")
+            continue
 
-    elif choice == "2":
-        top_daily_movers(tickers)
+        if choice == "1":
+            strong_5y_weak_1y(tickers, snapshot=snapshot)
 
-    elif choice == "3":
-        generate_nifty500_weekly_heatmap(tickers)
+        elif choice == "2":
+            top_daily_movers(tickers, snapshot=snapshot)
 
-    elif choice == "4":
-        screen_52_week_high(tickers)
-        
-    elif choice == "5":
-        screen_52_week_low(tickers)
-        
-    elif choice == "6":
-        mode = input("Enter mode ('low' for RSI<30 or 'high' for RSI>70): ").strip().lower()
-        if mode in ['low', 'high']:
-            screen_rsi_stocks(tickers, mode)
-        else:
-            print("Invalid mode. Try again.")
-            
-    elif choice == "7":
-        print("\n📈 Gap Screener:")
-        print("1. Gap Up")
-        print("2. Gap Down")
-        sub_choice = input("Enter 1 for Gap Up or 2 for Gap Down: ").strip()
-
-        if sub_choice not in ["1", "2"]:
-            print("❌ Invalid choice for gap mode.")
-            continue
+        elif choice == "3":
+            group = input("Group tiles by 'sector' or 'alpha' (Enter for a plain grid): ").strip().lower()
+            generate_nifty500_weekly_heatmap(tickers, snapshot, group if group in ("sector", "alpha") else None)
 
-        try:
-            gap_threshold = float(input("Enter gap threshold percentage (default 2): ").strip())
-        except ValueError:
-            print("❌ Invalid threshold. Using default 2%.")
-            gap_threshold = 2.0
+        elif choice == "4":
+            screen_52_week_high(tickers, snapshot)
+
+        elif choice == "5":
+            screen_52_week_low(tickers, snapshot)
+
+        elif choice == "6":
+            mode = input("Enter mode ('low' for RSI<30 or 'high' for RSI>70): ").strip().lower()
+            if mode in ['low', 'high']:
+                screen_rsi_stocks(tickers, mode, snapshot=snapshot)
+            else:
+                print("Invalid mode. Try again.")
+
+        elif choice == "7":
+            print("\n📈 Gap Screener:")
+            print("1. Gap Up")
+            print("2. Gap Down")
+            sub_choice = input("Enter 1 for Gap Up or 2 for Gap Down: ").strip()
+
+            if sub_choice not in ["1", "2"]:
+                print("❌ Invalid choice for gap mode.")
+                continue
+
+            try:
+                gap_threshold = float(input("Enter gap threshold percentage (default 2): ").strip())
+            except ValueError:
+                print("❌ Invalid threshold. Using default 2%.")
+                gap_threshold = 2.0
+
+            screen_gap_up_down(tickers, gap_threshold, sub_choice, snapshot=snapshot)
+
+        elif choice == "8":
+            print("\n📉 MACD Crossover Screener:")
+            print("1. Bullish Crossover")
+            print("2. Bearish Crossover")
+            mode_choice = input("Enter 1 for Bullish or 2 for Bearish: ").strip()
+
+            if mode_choice == "1":
+                screen_macd_crossover(tickers, user_choice="bullish", snapshot=snapshot)
+            elif mode_choice == "2":
+                screen_macd_crossover(tickers, user_choice="bearish", snapshot=snapshot)
+            else:
+                print("❌ Invalid input. Please enter 1 or 2.")
+
+
+        elif choice == "9":
+            plot_return_over_n_years(tickers, snapshot=snapshot)
+
+
+
+        elif choice == "10":
+            print("👋 Goodbye!")
+            break
 
-        screen_gap_up_down(tickers, gap_threshold, sub_choice)
-        
-    elif choice == "8":
-        print("\n📉 MACD Crossover Screener:")
-        print("1. Bullish Crossover")
-        print("2. Bearish Crossover")
-        mode_choice = input("Enter 1 for Bullish or 2 for Bearish: ").strip()
-
-        if mode_choice == "1":
-            screen_macd_crossover(tickers, user_choice="bullish")
-        elif mode_choice == "2":
-            screen_macd_crossover(tickers, user_choice="bearish")
         else:
-            print("❌ Invalid input. Please enter 1 or 2.")
-            
-    
-    elif choice == "9":
-        plot_return_over_n_years(tickers)
+            print("❌ Invalid choice, please try again.")
+            continue
 
+        print(recorder.summary())
+        print(price_cache.summary())
+        if network.stats["requests"]:
+            print(network.summary())
+        recorder.reset()
 
 
-    elif choice == "10":
-        print("👋 Goodbye!")
-        break
 
-    else:
-        print("❌ Invalid choice, please try again.")
+if __name__ == "__main__":
+    import sys
 
+    if len(sys.argv) > 1:
+        # Non-interactive run, e.g. `python main.py rsi --mode low --no-charts`
+        from cli import main as cli_main
+        sys.exit(cli_main(sys.argv[1:]))
+
+    os.makedirs(output_dir, exist_ok=True)
+    setup_data()
+    run_menu(load_tickers())
 
 
 # Aditya Anand
@@ -0,0 +1,111 @@
+import os
+import pandas as pd
+
+# Local NSE trading calendar and lookback window resolution.
+#
+# Screens keep writing lookbacks as period strings ("2d", "15d", "3mo", "1y",
+# "5y"), but they are resolved here against the exchange calendar and turned
+# into bar positions of history already in memory:
+#
+#   "Nd"         the last N trading sessions up to the anchor
+#   "Nmo" / "Ny" from the last session on or before the same date N months /
+#                years earlier, so a 1Y return always uses the same base close
+#
+# Holidays come from nse_holidays.csv. Years missing from the file are filled
+# in from downloaded daily history (a weekday with no bars across the universe).
+
+HOLIDAY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "nse_holidays.csv")
+
+
+def parse_period(period):
+    # "15d" -> (15, "d"); None and "max" -> (None, None)
+    if not period or period == "max":
+        return None, None
+    for unit in ("mo", "d", "y"):
+        if period.endswith(unit) and period[:-len(unit)].isdigit():
+            return int(period[:-len(unit)]), unit
+    raise ValueError(f"Unsupported period: {period}")
+
+
+def session_days(index):
+    # Exchange-local trading date of every bar (intraday bars keep their IST date)
+    days = index.normalize()
+    return days.tz_localize(None) if days.tz is not None else days
+
+
+def _aligned(ts, index):
+    ts = pd.Timestamp(ts)
+    if index.tz is not None and ts.tz is None:
+        return ts.tz_localize(index.tz)
+    return ts
+
+
+class TradingCalendar:
+    def __init__(self, holidays=()):
+        self.holidays = pd.DatetimeIndex(holidays).normalize().unique().sort_values()
+        self.listed_years = set(self.holidays.year)
+        self._offset = None
+
+    @classmethod
+    def from_file(cls, path=HOLIDAY_FILE):
+        if not os.path.exists(path):
+            return cls()
+        return cls(pd.read_csv(path, comment="#", parse_dates=["Date"])["Date"])
+
+    @property
+    def offset(self):
+        if self._offset is None:
+            self._offset = pd.offsets.CustomBusinessDay(holidays=list(self.holidays))
+        return self._offset
+
+    def learn(self, index):
+        # Weekdays with no bars inside daily history are holidays, for years the file doesn't list
+        days = session_days(index).unique()
+        if len(days) < 2:
+            return 0
+        missing = self.sessions(days[0], days[-1]).difference(days)
+        missing = missing[~missing.year.isin(self.listed_years)]
+        if len(missing):
+            self.holidays = self.holidays.union(missing)
+            self._offset = None
+        return len(missing)
+
+    def sessions(self, start, end):
+        return pd.date_range(pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize(), freq=self.offset)
+
+    def is_session(self, day):
+        return self.offset.is_on_offset(pd.Timestamp(day).normalize())
+
+    def previous_session(self, day=None):
+        # The session on or before day (default: today)
+        day = pd.Timestamp.today() if day is None else pd.Timestamp(day)
+        return self.offset.rollback(day.normalize())
+
+    def last_sessions(self, n, end=None):
+        return pd.date_range(end=self.previous_session(end), periods=n, freq=self.offset)
+
+    def window_start(self, period, anchor=None):
+        # First session of a lookback window ending on anchor (default: today)
+        n, unit = parse_period(period)
+        if n is None:
+            return None
+        anchor = (pd.Timestamp.today() if anchor is None else pd.Timestamp(anchor)).normalize()
+        if unit == "d":
+            # The anchor counts as a session even when it is a special one (e.g. a Saturday)
+            return anchor if n <= 1 else anchor - (n - 1) * self.offset
+        offset = pd.DateOffset(months=n) if unit == "mo" else pd.DateOffset(years=n)
+        return self.previous_session(anchor - offset)
+
+    def window_bounds(self, index, period=None, start=None, end=None):
+        # [lo, hi) bar positions of a window over a sorted DatetimeIndex. start is
+        # inclusive, end exclusive; the period is anchored on the last bar before end.
+        lo = 0 if start is None else int(index.searchsorted(_aligned(start, index)))
+        hi = len(index) if end is None else int(index.searchsorted(_aligned(end, index)))
+        if period and period != "max" and hi > lo:
+            days = session_days(index)
+            first = self.window_start(period, days[hi - 1])
+            lo = max(lo, int(days.searchsorted(first)))
+        return lo, hi
+
+
+nse = TradingCalendar.from_file()
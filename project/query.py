@@ -0,0 +1,335 @@
+import re
+import numpy as np
+import pandas as pd
+from data import fetch_panel, field_matrix, trim_period
+import indicators as ind
+from instrument import instrumented, stage
+from history import record_hits
+from nse_calendar import session_days
+
+# Composite screens written as filter expressions, e.g.
+#
+#   rsi < 30 and near_52w_low and ret_5y > 50
+#   (gap > 2 or change > 4) and not macd_bearish
+#
+# The planner evaluates the cheapest predicates first and only computes the
+# more expensive metrics (longer history) for tickers that are still alive.
+
+
+def _ret(period):
+    return lambda panel: ind.period_return(trim_period(field_matrix(panel, "Close"), period))
+
+
+def _rsi(panel):
+    return ind.last_valid(ind.rsi(field_matrix(panel, "Close")))
+
+
+def _macd_cross(which):
+    # NaN for tickers too short for the signal line to settle, as the MACD screen skips them
+    def compute(panel):
+        close = field_matrix(panel, "Close")
+        line, signal = ind.macd(close)
+        bullish, bearish = ind.crossover(line, signal)
+        crossed = (bullish if which == "bullish" else bearish).astype(float)
+        return crossed.where(ind.bar_count(close) >= ind.MACD_MIN_BARS)
+    return compute
+
+
+def _from_52w(which):
+    # % distance of the last close from the 52-week high (or low)
+    def compute(panel):
+        close = field_matrix(panel, "Close")
+        latest = ind.last_valid(close)
+        extreme = close.max() if which == "high" else close.min()
+        return ((latest - extreme) / extreme * 100).abs()
+    return compute
+
+
+def _gap(panel):
+    return ind.gap_pct(field_matrix(panel, "Open"), field_matrix(panel, "Close"))
+
+
+def _change(panel):
+    return ind.daily_change(field_matrix(panel, "Close"))
+
+
+def _close(panel):
+    return ind.last_valid(field_matrix(panel, "Close"))
+
+
+# name: (lookback, adjusted prices, function of a panel -> Series, cost)
+METRICS = {
+    "close": ("2d", True, _close, 1),
+    "change": ("2d", False, _change, 1),
+    "gap": ("15d", False, _gap, 1),
+    "rsi": ("3mo", True, _rsi, 2),
+    "macd_bullish": ("3mo", True, _macd_cross("bullish"), 2),
+    "macd_bearish": ("3mo", True, _macd_cross("bearish"), 2),
+    "pct_from_52w_high": ("1y", True, _from_52w("high"), 3),
+    "pct_from_52w_low": ("1y", True, _from_52w("low"), 3),
+    "ret_1y": ("1y", True, _ret("1y"), 3),
+    "ret_3y": ("3y", True, _ret("3y"), 4),
+    "ret_5y": ("5y", True, _ret("5y"), 5),
+}
+
+# Shorthand flags: name -> (metric, operator, value)
+FLAGS = {
+    "near_52w_high": ("pct_from_52w_high", "<=", 2.0),
+    "near_52w_low": ("pct_from_52w_low", "<=", 2.0),
+    "at_52w_high": ("pct_from_52w_high", "<=", 0.01),
+    "at_52w_low": ("pct_from_52w_low", "<=", 0.01),
+    "macd_bullish": ("macd_bullish", "==", 1.0),
+    "macd_bearish": ("macd_bearish", "==", 1.0),
+    "oversold": ("rsi", "<", 30.0),
+    "overbought": ("rsi", ">", 70.0),
+}
+
+OPERATORS = {
+    "<": np.less, "<=": np.less_equal, ">": np.greater,
+    ">=": np.greater_equal, "==": np.equal, "!=": np.not_equal,
+}
+
+
+class MetricTable:
+    # Lazily computed metric values, filled in only for the tickers asked for.
+    def __init__(self, snapshot=None):
+        self.snapshot = snapshot
+        self.values = {}
+        self.panels = {}
+        self.computed = {}
+        self.last_session = None
+
+    def _panel(self, period, adjusted, tickers):
+        if self.snapshot is not None:
+            return self.snapshot.window(period, adjusted=adjusted, tickers=tickers)
+        # No snapshot: fetch just these tickers at the lookback this metric needs
+        panel = fetch_panel(tickers, period=period, auto_adjust=adjusted)
+        if not panel.empty:
+            day = session_days(panel.index[-1:])[0]
+            self.last_session = day if self.last_session is None else max(self.last_session, day)
+        return panel
+
+    def session(self):
+        # Trading date the results belong to: the snapshot's, else the last bar fetched
+        return self.snapshot.session() if self.snapshot is not None else self.last_session
+
+    def get(self, name, tickers):
+        period, adjusted, compute, _ = METRICS[name]
+        done = self.computed.setdefault(name, set())
+        missing = [t for t in tickers if t not in done]
+        if missing:
+            with stage("compute"):
+                values = compute(self._panel(period, adjusted, missing)).reindex(missing)
+            old = self.values.get(name)
+            self.values[name] = values if old is None else pd.concat([old, values])
+            done.update(missing)
+        # Never computed when the plan ran out of tickers before this metric
+        return self.values.get(name, pd.Series(dtype=float)).reindex(tickers)
+
+    def frame(self, names, tickers):
+        return pd.DataFrame({name: self.get(name, tickers) for name in names}, index=pd.Index(tickers, name="Ticker"))
+
+
+class Compare:
+    def __init__(self, metric, op, value):
+        self.metric, self.op, self.value = metric, op, value
+
+    def cost(self):
+        return METRICS[self.metric][3]
+
+    def metrics(self):
+        return {self.metric}
+
+    def evaluate(self, table, tickers):
+        values = table.get(self.metric, tickers)
+        mask = OPERATORS[self.op](values.to_numpy(dtype=float), self.value)
+        return [t for t, keep in zip(tickers, mask) if keep]
+
+    def __repr__(self):
+        return f"{self.metric} {self.op} {self.value:g}"
+
+
+class And:
+    def __init__(self, parts):
+        self.parts = sorted(parts, key=lambda p: p.cost())
+
+    def cost(self):
+        return sum(p.cost() for p in self.parts)
+
+    def metrics(self):
+        return set().union(*(p.metrics() for p in self.parts))
+
+    def evaluate(self, table, tickers):
+        for part in self.parts:
+            if not tickers:
+                break
+            tickers = part.evaluate(table, tickers)
+        return tickers
+
+    def __repr__(self):
+        return "(" + " and ".join(map(repr, self.parts)) + ")"
+
+
+class Or:
+    def __init__(self, parts):
+        self.parts = sorted(parts, key=lambda p: p.cost())
+
+    def cost(self):
+        return sum(p.cost() for p in self.parts)
+
+    def metrics(self):
+        return set().union(*(p.metrics() for p in self.parts))
+
+    def evaluate(self, table, tickers):
+        matched, pending = set(), list(tickers)
+        for part in self.parts:
+            if not pending:
+                break
+            hits = set(part.evaluate(table, pending))
+            matched |= hits
+            pending = [t for t in pending if t not in hits]
+        return [t for t in tickers if t in matched]
+
+    def __repr__(self):
+        return "(" + " or ".join(map(repr, self.parts)) + ")"
+
+
+class Not:
+    def __init__(self, part):
+        self.part = part
+
+    def cost(self):
+        return self.part.cost()
+
+    def metrics(self):
+        return self.part.metrics()
+
+    def evaluate(self, table, tickers):
+        hits = set(self.part.evaluate(table, tickers))
+        return [t for t in tickers if t not in hits]
+
+    def __repr__(self):
+        return f"not {self.part!r}"
+
+
+TOKEN = re.compile(r"\s*(?:(\d+\.?\d*|\.\d+)|(<=|>=|==|!=|<|>)|([A-Za-z_][A-Za-z0-9_]*)|(\(|\))|(-))")
+
+
+def tokenize(text):
+    tokens, pos = [], 0
+    text = text.strip()
+    while pos < len(text):
+        match = TOKEN.match(text, pos)
+        if not match:
+            raise ValueError(f"Unexpected character at {pos}: {text[pos:]!r}")
+        number, op, word, paren, minus = match.groups()
+        if number:
+            tokens.append(("num", float(number)))
+        elif op:
+            tokens.append(("op", op))
+        elif word:
+            tokens.append(("word", word.lower()))
+        elif paren:
+            tokens.append(("paren", paren))
+        else:
+            tokens.append(("minus", minus))
+        pos = match.end()
+    return tokens
+
+
+class Parser:
+    def __init__(self, text):
+        self.tokens = tokenize(text)
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def take(self):
+        token = self.peek()
+        self.pos += 1
+        return token
+
+    def parse(self):
+        node = self.expr()
+        if self.pos != len(self.tokens):
+            raise ValueError(f"Unexpected token: {self.peek()[1]}")
+        return node
+
+    def expr(self):
+        parts = [self.term()]
+        while self.peek() == ("word", "or"):
+            self.take()
+            parts.append(self.term())
+        return parts[0] if len(parts) == 1 else Or(parts)
+
+    def term(self):
+        parts = [self.factor()]
+        while self.peek() == ("word", "and"):
+            self.take()
+            parts.append(self.factor())
+        return parts[0] if len(parts) == 1 else And(parts)
+
+    def factor(self):
+        kind, value = self.take()
+        if (kind, value) == ("word", "not"):
+            return Not(self.factor())
+        if (kind, value) == ("paren", "("):
+            node = self.expr()
+            if self.take() != ("paren", ")"):
+                raise ValueError("Missing ')'")
+            return node
+        if kind != "word":
+            raise ValueError(f"Expected a metric, got {value!r}")
+
+        if self.peek()[0] == "op":
+            _, op = self.take()
+            sign = 1.0
+            if self.peek()[0] == "minus":
+                self.take()
+                sign = -1.0
+            num_kind, number = self.take()
+            if num_kind != "num":
+                raise ValueError(f"Expected a number after {value} {op}")
+            if value not in METRICS:
+                raise ValueError(f"Unknown metric: {value} (known: {', '.join(METRICS)})")
+            return Compare(value, op, sign * number)
+
+        if value in FLAGS:
+            return Compare(*FLAGS[value])
+        raise ValueError(f"Unknown flag: {value} (known: {', '.join(FLAGS)})")
+
+
+def parse(text):
+    return Parser(text).parse()
+
+
+def evaluate(plan, table, tickers):
+    # Matching tickers with a column per metric the plan uses
+    matches = plan.evaluate(table, list(tickers))
+    return table.frame(sorted(plan.metrics()), matches).reset_index()
+
+
+@instrumented
+def run_query(tickers, expression, snapshot=None, name="query", scan=None):
+    # scan: a shard.ShardedScan to spread the universe over worker processes
+    plan = parse(expression)
+    print(f"\n🔎 Screening: {expression}")
+    print(f"🧭 Plan (cheapest first): {plan!r}")
+
+    with stage("filter"):
+        if scan is not None:
+            result = scan.query(expression, tickers)
+            session = scan.snapshot.session()
+        else:
+            table = MetricTable(snapshot)
+            result = evaluate(plan, table, tickers)
+            session = table.session()
+
+    if result.empty:
+        print("❌ No stocks matched the expression.")
+    else:
+        print(f"\n🎯 {len(result)} stocks matched:\n")
+        print(result.round(2).to_string(index=False))
+    record_hits(f"query_{name}", result, session, expression=expression)
+    return result
@@ -0,0 +1,168 @@
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from instrument import recorder, stage
+
+# Chart rendering stage. Screeners only describe the charts they want as
+# ChartJob objects; render_jobs() draws them afterwards, in a process pool,
+# using plain Figure objects (no pyplot state shared between charts). The
+# drawing code lives in draw.py and is imported on the first chart, keeping
+# matplotlib out of runs that render nothing.
+#
+# Rendered charts are recorded in a manifest keyed by a hash of the chart
+# (kind, path, title, options and the plotted data, so the ticker, date range,
+# last bar and parameters are all covered). A chart whose key and file are
+# unchanged since the last run is not drawn again. The manifest also bounds
+# the disk used by charts: past the size limit the least recently used chart
+# files are deleted.
+
+
+class ChartJob:
+    def __init__(self, kind, path, title, data, priority=0.0, **options):
+        self.kind = kind
+        self.path = path
+        self.title = title
+        self.data = data
+        self.priority = priority
+        self.options = options
+
+
+def render_job(job):
+    # Returns (path, error, seconds); timed here so pool workers report their own time
+    start = time.perf_counter()
+    try:
+        from draw import DRAWERS
+        os.makedirs(os.path.dirname(job.path) or ".", exist_ok=True)
+        fig = DRAWERS[job.kind](job)
+        fig.savefig(job.path)
+        return job.path, None, time.perf_counter() - start
+    except Exception as e:
+        return job.path, str(e), time.perf_counter() - start
+
+
+def _digest(part, h):
+    if isinstance(part, (pd.DataFrame, pd.Series)):
+        h.update(pd.util.hash_pandas_object(part, index=True).to_numpy().tobytes())
+        h.update(repr(list(part.columns) if isinstance(part, pd.DataFrame) else part.name).encode())
+    elif isinstance(part, np.ndarray) and part.dtype != object:
+        h.update(f"{part.dtype}{part.shape}".encode())
+        h.update(np.ascontiguousarray(part).tobytes())
+    elif isinstance(part, np.ndarray):
+        h.update(f"{part.shape}".encode())
+        h.update("\x1f".join(map(str, part.ravel())).encode())
+    else:
+        h.update(repr(part).encode())
+
+
+def chart_key(job):
+    # Content address of a chart; job.data is a frame, an array or a tuple of them
+    h = hashlib.sha1(repr((job.kind, job.path, job.title, sorted(job.options.items()))).encode())
+    for part in job.data if isinstance(job.data, tuple) else (job.data,):
+        _digest(part, h)
+    return h.hexdigest()
+
+
+class ChartCache:
+    # Manifest of rendered charts: path -> {"key", "bytes", "used"}
+    def __init__(self, path, max_mb=256):
+        self.path = path
+        self.max_bytes = max_mb * 1024 ** 2
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                self.entries = json.load(f)
+
+    def fresh(self, path, key):
+        entry = self.entries.get(path)
+        return entry is not None and entry["key"] == key and os.path.exists(path)
+
+    def store(self, path, key):
+        self.entries[path] = {"key": key, "bytes": os.path.getsize(path), "used": time.time()}
+
+    def touch(self, path):
+        self.entries[path]["used"] = time.time()
+
+    def evict(self, keep=()):
+        # Oldest charts first until the total fits; charts of this run are kept
+        self.entries = {p: e for p, e in self.entries.items() if os.path.exists(p)}
+        total = sum(e["bytes"] for e in self.entries.values())
+        removed = 0
+        for path, entry in sorted(self.entries.items(), key=lambda item: item[1]["used"]):
+            if total <= self.max_bytes:
+                break
+            if path in keep:
+                continue
+            os.remove(path)
+            del self.entries[path]
+            total -= entry["bytes"]
+            removed += 1
+        return removed
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.entries, f)
+        os.replace(tmp, self.path)
+
+
+# mode: "all", "top" (only the top_n highest-priority jobs) or "none";
+# redraw=True draws charts even when the manifest says they are unchanged
+chart_settings = {"mode": "all", "top_n": 10, "workers": None,
+                  "manifest": "stock_graphs/chart_manifest.json", "max_mb": 256, "redraw": False}
+
+
+def charts_enabled():
+    # False when no chart will be drawn, so chart-only data needn't be fetched
+    return chart_settings["mode"] != "none"
+
+
+def select_jobs(jobs, mode=None, top_n=None):
+    mode = mode or chart_settings["mode"]
+    top_n = top_n or chart_settings["top_n"]
+    if mode == "none":
+        return []
+    if mode == "top":
+        return sorted(jobs, key=lambda job: job.priority, reverse=True)[:top_n]
+    return jobs
+
+
+def render_jobs(jobs, mode=None, top_n=None, workers=None):
+    jobs = select_jobs(jobs, mode, top_n)
+    if not jobs:
+        return []
+
+    workers = workers if workers is not None else chart_settings["workers"]
+    with stage("render"):
+        cache = ChartCache(chart_settings["manifest"], chart_settings["max_mb"])
+        keys = {job.path: chart_key(job) for job in jobs}
+        unchanged = set() if chart_settings["redraw"] else {p for p, k in keys.items() if cache.fresh(p, k)}
+        todo = [job for job in jobs if job.path not in unchanged]
+        if workers == 0 or len(todo) < 4:
+            results = [render_job(job) for job in todo]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(render_job, todo, chunksize=8))
+
+    drawn = set()
+    for path, error, seconds in results:
+        # Chart files are named <ticker>_<screen>.png
+        recorder.observe("render", [os.path.basename(path).split("_")[0]], seconds)
+        if error:
+            print(f"⚠️ Couldn't render {path}: {error}")
+        else:
+            cache.store(path, keys[path])
+            drawn.add(path)
+    for path in unchanged:
+        cache.touch(path)
+    evicted = cache.evict(keep=drawn | unchanged)
+    cache.save()
+
+    note = f", {len(unchanged)} unchanged" if unchanged else ""
+    note += f", {evicted} old charts evicted" if evicted else ""
+    print(f"🖼️ Rendered {len(drawn)}/{len(todo)} charts{note}")
+    return [job.path for job in jobs if job.path in drawn or job.path in unchanged]
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+from nse_calendar import session_days
+
+# Weekly, monthly and N-session bars built from daily panels.
+#
+# Bars are formed from the sessions actually in the panel, so NSE holidays
+# simply shorten a week or month. Every bar is labelled with its last
+# session's date, which keeps trim_period / window lookbacks working on
+# resampled panels. The latest bar may still be in progress, the way a weekly
+# yfinance bar is during the week.
+#
+#   1wk  Monday-Friday calendar weeks
+#   1mo  calendar months
+#   Nd   N sessions each, counted back from the latest session (5d = trailing week)
+#
+# All tickers are aggregated at once, one groupby per field: open = first,
+# high = max, low = min, close = last, volume = sum (NaN bars are skipped).
+
+AGGREGATIONS = {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}
+TIMEFRAMES = ["1d", "1wk", "1mo"]
+
+
+def bar_keys(index, timeframe):
+    # Bar number (0, 1, ...) of every row of a sorted daily index
+    if timeframe == "1wk":
+        periods = pd.PeriodIndex(session_days(index), freq="W-SUN")
+    elif timeframe == "1mo":
+        periods = pd.PeriodIndex(session_days(index), freq="M")
+    elif timeframe.endswith("d") and timeframe[:-1].isdigit() and int(timeframe[:-1]) > 0:
+        n = int(timeframe[:-1])
+        back = (len(index) - 1 - np.arange(len(index))) // n
+        return back.max() - back if len(index) else back
+    else:
+        raise ValueError(f"Unknown timeframe: {timeframe} (use 1wk, 1mo or Nd)")
+    return pd.factorize(periods, sort=True)[0]
+
+
+def resample(panel, timeframe):
+    # (Ticker, Field) daily panel -> panel of `timeframe` bars, same columns
+    if panel.empty or timeframe == "1d":
+        return panel
+    if not panel.index.is_monotonic_increasing:
+        panel = panel.sort_index()
+    keys = bar_keys(panel.index, timeframe)
+    fields = panel.columns.get_level_values("Field")
+
+    parts = []
+    for field in fields.unique():
+        grouped = panel.loc[:, fields == field].groupby(keys)
+        how = AGGREGATIONS.get(field, "last")
+        parts.append(grouped.sum(min_count=1) if how == "sum" else grouped.agg(how))
+    bars = pd.concat(parts, axis=1).reindex(columns=panel.columns)
+    bars.index = pd.DatetimeIndex(pd.Series(panel.index).groupby(keys).max(), name=panel.index.name)
+    return bars
@@ -0,0 +1,103 @@
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from compact import CompactPanel
+from snapshot import UniverseSnapshot
+from query import MetricTable, evaluate, parse
+
+# Sharded scanning for large universes.
+#
+# The snapshot's raw prices and adjustment factors are written once as a
+# CompactPanel store (.npy files). Every worker process opens the store
+# memory-mapped, takes its contiguous block of tickers as a view and runs the
+# query planner on that block only, so price data never goes through pickle:
+# workers send back the matching tickers and their metric values, and the
+# main process merges those rows in ticker-list order.
+#
+# Shards are equal-sized blocks of tickers; with one shard per core the scan
+# time falls close to linearly with the number of workers, plus a fixed cost
+# to write the store once per snapshot.
+
+
+def plan_shards(store, tickers, shards):
+    # [(lo, hi, names)]: contiguous store rows and the requested tickers in them.
+    # Tickers with no stored prices go to the last shard so they are still
+    # evaluated (as NaN) like an unsharded query would.
+    rows = np.sort([store.positions[t] for t in dict.fromkeys(tickers) if t in store.positions])
+    missing = [t for t in tickers if t not in store.positions]
+    if not len(rows):
+        return []
+    plan = []
+    for part in np.array_split(rows, min(shards, len(rows))):
+        plan.append((int(part[0]), int(part[-1]) + 1, [store.tickers[i] for i in part]))
+    plan[-1][2].extend(missing)
+    return plan
+
+
+def scan_shard(folder, lo, hi, names, expression):
+    # Worker: (matches, metric values, seconds) for store rows lo:hi
+    start = time.perf_counter()
+    store = CompactPanel.open(folder, mmap=True).block(lo, hi)
+    result = evaluate(parse(expression), MetricTable(UniverseSnapshot.from_store(store)), names)
+    matches = result["Ticker"].tolist()
+    values = result.drop(columns="Ticker").to_numpy(dtype=float)
+    return matches, values, time.perf_counter() - start
+
+
+class ShardedScan:
+    # Query screens over a snapshot, split across worker processes. The pool and
+    # the store are kept between screens; call close() when done.
+    def __init__(self, snapshot, workers=None, folder=None):
+        self.snapshot = snapshot
+        self.workers = workers or os.cpu_count() or 1
+        self.folder = folder
+        self.owned = folder is None
+        self.written = None
+        self.pool = None
+
+    def store(self):
+        # (Re)writes the store whenever the snapshot has loaded new prices
+        raw = self.snapshot.load()
+        if self.written is not raw:
+            if self.folder is None:
+                self.folder = tempfile.mkdtemp(prefix="shards_")
+            self.snapshot.compact_panel(adjusted=False).save(self.folder)
+            self.written = raw
+        return CompactPanel.open(self.folder, mmap=True)
+
+    def _map(self, jobs):
+        if self.workers == 1 or len(jobs) < 2:
+            return [scan_shard(*job) for job in jobs]
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        return list(self.pool.map(scan_shard, *zip(*jobs)))
+
+    def query(self, expression, tickers):
+        # Same result table as query.evaluate, computed shard by shard
+        metrics = sorted(parse(expression).metrics())
+        store = self.store()
+        shards = plan_shards(store, list(tickers), self.workers)
+        results = self._map([(self.folder, lo, hi, names, expression) for lo, hi, names in shards])
+        if shards:
+            print(f"🧩 {len(store.tickers)} tickers in {len(shards)} shards, "
+                  f"slowest {max(seconds for _, _, seconds in results):.2f}s")
+
+        matches = [t for found, _, _ in results for t in found]
+        values = np.vstack([v for _, v, _ in results]) if results else np.empty((0, len(metrics)))
+        result = pd.DataFrame(values, columns=metrics)
+        result.insert(0, "Ticker", matches)
+        order = {t: i for i, t in enumerate(tickers)}
+        return result.sort_values("Ticker", key=lambda col: col.map(order), kind="stable").reset_index(drop=True)
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+        if self.owned and self.folder is not None:
+            shutil.rmtree(self.folder, ignore_errors=True)
+            self.folder = None
+            self.written = None
@@ -0,0 +1,214 @@
+import numpy as np
+import pandas as pd
+from data import fetch_panel, get_ticker_df, trim_period
+from compact import CompactPanel
+from nse_calendar import nse, session_days
+from adjust import adjust_panel, factor_matrix, raw_prices, scale_prices
+from streaming import StateStore
+from resample import resample
+from instrument import stage
+import validate
+
+# Session-level view of the whole universe. History is downloaded once at the
+# longest lookback any screen needs and every screen slices its window from
+# memory instead of issuing its own request.
+#
+# Prices are held raw with their corporate-action factors, so screens that
+# want unadjusted bars (gaps, daily movers) share the download with the rest.
+#
+# Weekly, monthly and N-session bars are resampled from the daily history and
+# cached per timeframe, so multi-timeframe screens need no extra downloads.
+#
+# With compact=True the history is kept as a float32 CompactPanel and pandas
+# frames are only built for the window a screen asks for.
+
+MAX_LOOKBACK = "5y"
+LOAD_MARGIN = 5  # extra sessions fetched before the longest window
+
+
+def period_years(period):
+    if period.endswith("y"):
+        return int(period[:-1])
+    if period.endswith("mo"):
+        return int(period[:-2]) / 12
+    return 0
+
+
+class UniverseSnapshot:
+    def __init__(self, tickers, period=MAX_LOOKBACK, interval="1d", compact=False):
+        self.tickers = list(tickers)
+        self.period = period
+        self.interval = interval
+        self.compact = compact and interval == "1d"
+        self.raw = None
+        self.factors = None
+        self.resampled = {}
+
+    def load(self, on_chunk=None):
+        # One raw download serves both adjusted and unadjusted views; adjustment
+        # factors are applied when a window is read. on_chunk(panel) is called
+        # with every raw chunk while loading.
+        if self.raw is None:
+            print(f"📥 Loading {len(self.tickers)} tickers ({self.period})...")
+            # Known-bad tickers are not downloaded again until their re-check is due
+            skipped = validate.quarantine.active() if self.interval == "1d" else set()
+            tickers = [t for t in self.tickers if t not in skipped]
+            start = self.load_start()
+            failed = set()
+            panel = fetch_panel(tickers, period=None if start is not None else self.period,
+                                interval=self.interval, start=start, auto_adjust=False, on_chunk=on_chunk,
+                                failed=failed)
+            if self.interval == "1d" and not panel.empty:
+                nse.learn(panel.index)
+            if self.interval == "1d":
+                panel = self.validate(panel, tickers, failed)
+            if self.compact:
+                self.raw = CompactPanel.from_panel(panel)
+            else:
+                self.factors = factor_matrix(panel) if not panel.empty else None
+                self.raw = raw_prices(panel)
+        return self.raw
+
+    def load_start(self):
+        # Windows are anchored on the last bar, which on weekends, holidays and
+        # before the open is an earlier session than today. Fetch from the first
+        # session of the window ending on the last completed session, less a
+        # margin for lagging tickers, so every lookback keeps its base bar.
+        today = pd.Timestamp.today().normalize()
+        start = nse.window_start(self.period, anchor=nse.previous_session(today - pd.Timedelta(days=1)))
+        return None if start is None else start - LOAD_MARGIN * nse.offset
+
+    def validate(self, panel, tickers, failed=()):
+        # One data-quality pass over the whole download; quarantined tickers are
+        # dropped so no screen sees their bars. Tickers whose fetch failed are
+        # reported but never quarantined: the network, not the data, was at fault.
+        with stage("compute"):
+            issues = validate.check(panel, tickers, failed)
+        rejected = validate.quarantine.update(issues, [t for t in tickers if t not in failed])
+        validate.quarantine.save()
+        if len(issues):
+            print(validate.summary(issues, rejected))
+        if rejected and not panel.empty:
+            panel = panel.drop(columns=rejected, level="Ticker", errors="ignore")
+        return panel
+
+    def session(self):
+        # Trading date of the last loaded bar: the session screen results belong to
+        loaded = self.load()
+        if loaded.empty:
+            return None
+        dates = loaded.dates if self.compact else loaded.index
+        return session_days(dates[-1:])[0]
+
+    def usable(self, tickers):
+        # Tickers minus the quarantined ones; never triggers a load
+        skipped = validate.quarantine.active()
+        return [t for t in tickers if t not in skipped]
+
+    def panel(self, adjusted=True):
+        loaded = self.load()
+        if self.compact:
+            return (loaded.adjusted() if adjusted else loaded).to_panel()
+        return adjust_panel(loaded, self.factors) if adjusted else loaded
+
+    @classmethod
+    def from_store(cls, store, period=MAX_LOOKBACK):
+        # Snapshot over a CompactPanel that is already loaded (e.g. memory-mapped)
+        snapshot = cls(store.tickers, period, compact=True)
+        snapshot.raw = store
+        return snapshot
+
+    def compact_panel(self, adjusted=True, tickers=None, period=None):
+        # Compact arrays for screens that compute straight on numpy; the raw
+        # arrays carry the factors. tickers/period narrow the store before it
+        # is adjusted
+        loaded = self.load()
+        if self.compact:
+            store = loaded if tickers is None else loaded.select(tickers)
+            store = store if period is None else store.trim(period)
+            return store.adjusted() if adjusted else store
+        if tickers is None and period is None:
+            store = CompactPanel.from_panel(self.panel(adjusted))
+        else:
+            store = CompactPanel.from_panel(self.window(period, adjusted=adjusted, tickers=tickers))
+        if not adjusted and self.factors is not None and not store.empty:
+            factors = self.factors.reindex(index=store.dates, columns=store.tickers).fillna(1.0)
+            store.factors = factors.to_numpy(dtype=np.float32).T.copy()
+        return store
+
+    def ensure_lookback(self, years):
+        # Widen the snapshot when a screen asks for more history than loaded
+        if years > period_years(self.period):
+            self.period = f"{int(years) + 1}y"
+            self.refresh()
+
+    def refresh(self):
+        self.raw = None
+        self.factors = None
+        self.resampled = {}
+
+    def bars(self, timeframe, adjusted=True):
+        # Whole history as weekly / monthly / N-session bars (see resample.py),
+        # built once per timeframe from the loaded daily prices
+        if timeframe == "1d":
+            return self.panel(adjusted)
+        key = (timeframe, adjusted)
+        if key not in self.resampled:
+            self.resampled[key] = resample(self.panel(adjusted), timeframe)
+        return self.resampled[key]
+
+    def factor_frame(self):
+        # dates x tickers adjustment factors of the loaded history
+        loaded = self.load()
+        if not self.compact:
+            return self.factors
+        if loaded.empty or loaded.factors is None:
+            return None
+        return pd.DataFrame(loaded.factors.T, index=loaded.dates, columns=loaded.tickers)
+
+    def indicator_state(self, path="indicator_state.pkl"):
+        # Persisted per-ticker RSI/MACD/52W state, topped up with any new bars
+        store = StateStore(path).load()
+        fed = store.sync(self.panel(), self.factor_frame())
+        store.save()
+        print(f"🧮 {fed} new bars fed into {path} ({len(store.states)} tickers)")
+        return store
+
+    def window(self, period=None, start=None, end=None, adjusted=True, tickers=None):
+        # tickers: only build the window for these (columns are picked before
+        # the window is sliced and adjusted)
+        if self.compact:
+            store = self.load()
+            if tickers is not None:
+                store = store.select(tickers)
+            store = store.trim(period, start, end)
+            panel = (store.adjusted() if adjusted else store).to_panel()
+        else:
+            panel = self.load()
+            if panel.empty:
+                return panel
+            factors = self.factors
+            if tickers is not None:
+                panel = panel.loc[:, panel.columns.get_level_values("Ticker").isin(tickers)]
+                factors = factors.loc[:, factors.columns.isin(tickers)]
+            panel = trim_period(panel, period, start, end)
+            if adjusted:
+                panel = adjust_panel(panel, factors)
+        return panel.dropna(axis=1, how="all")
+
+    def frame(self, ticker, period=None, start=None, end=None, adjusted=True):
+        if self.compact:
+            store = self.load().select([ticker])
+            df = (store.adjusted() if adjusted else store).frame(ticker)
+        else:
+            df = get_ticker_df(self.load(), ticker)
+        if df.empty:
+            return df
+        df = trim_period(df, period, start, end)
+        if adjusted and not self.compact and ticker in self.factors.columns:
+            df = scale_prices(df, self.factors[ticker].reindex(df.index).fillna(1.0))
+        return df
+
+    def years(self, n_years, adjusted=True):
+        self.ensure_lookback(n_years)
+        return self.window(f"{n_years}y", adjusted=adjusted)
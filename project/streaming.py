@@ -0,0 +1,289 @@
+import heapq
+import math
+import os
+import pickle
+from collections import deque
+import pandas as pd
+from data import field_matrix
+from adjust import MIN_STEP
+import indicators as ind
+
+# Incremental indicator state. Each new bar updates RSI, MACD, the 52-week
+# high/low and the last close in constant time, so a daily run only has to
+# feed the bars that arrived since the state was saved. States are built from
+# adjusted closes; a ticker whose history was rescaled by a new corporate
+# action since is rebuilt from the loaded bars.
+
+NaN = float("nan")
+
+
+class RSIState:
+    # Simple-moving-average RSI, bar-for-bar identical to main.calculate_rsi.
+    # Running totals of the window keep each update O(1); the count of nonzero
+    # moves makes an all-zero window exactly zero despite rounding.
+    def __init__(self, period=14):
+        self.period = period
+        self.gains = deque(maxlen=period)
+        self.losses = deque(maxlen=period)
+        self.gain_sum = self.loss_sum = 0.0
+        self.gain_bars = self.loss_bars = 0
+        self.last_close = None
+        self.value = NaN
+
+    def _push(self, gain, loss):
+        if len(self.gains) == self.period:
+            old_gain, old_loss = self.gains[0], self.losses[0]
+            self.gain_sum -= old_gain
+            self.loss_sum -= old_loss
+            self.gain_bars -= old_gain > 0
+            self.loss_bars -= old_loss > 0
+        self.gains.append(gain)
+        self.losses.append(loss)
+        self.gain_sum += gain
+        self.loss_sum += loss
+        self.gain_bars += gain > 0
+        self.loss_bars += loss > 0
+        if not self.gain_bars:
+            self.gain_sum = 0.0
+        if not self.loss_bars:
+            self.loss_sum = 0.0
+
+    def update(self, close):
+        if self.last_close is None or math.isnan(self.last_close):
+            # calculate_rsi counts the first (undefined) change as 0
+            delta = 0.0
+        else:
+            delta = close - self.last_close
+        self.last_close = close
+        self._push(delta if delta > 0 else 0.0, -delta if delta < 0 else 0.0)
+
+        if len(self.gains) < self.period:
+            self.value = NaN
+            return self.value
+        gain = self.gain_sum / self.period
+        loss = self.loss_sum / self.period
+        if loss == 0:
+            self.value = 100.0 if gain > 0 else NaN
+        else:
+            self.value = 100 - (100 / (1 + gain / loss))
+        return self.value
+
+
+class EMAState:
+    # Same recursion as Series.ewm(span=span, adjust=False).mean()
+    def __init__(self, span):
+        self.alpha = 2 / (span + 1)
+        self.value = None
+
+    def update(self, x):
+        if self.value is None:
+            self.value = x
+        else:
+            self.value = self.alpha * x + (1 - self.alpha) * self.value
+        return self.value
+
+
+class MACDState:
+    def __init__(self, fast=12, slow=26, signal=9):
+        self.fast = EMAState(fast)
+        self.slow = EMAState(slow)
+        self.signal_ema = EMAState(signal)
+        self.macd = NaN
+        self.signal = NaN
+        self.prev_macd = NaN
+        self.prev_signal = NaN
+
+    def update(self, close):
+        self.prev_macd, self.prev_signal = self.macd, self.signal
+        self.macd = self.fast.update(close) - self.slow.update(close)
+        self.signal = self.signal_ema.update(self.macd)
+        return self.macd, self.signal
+
+    def crossover(self):
+        if math.isnan(self.prev_macd):
+            return None
+        if self.prev_macd < self.prev_signal and self.macd > self.signal:
+            return "bullish"
+        if self.prev_macd > self.prev_signal and self.macd < self.signal:
+            return "bearish"
+        return None
+
+
+class RollingExtreme:
+    # Running max (or min) over the last `window` bars via a monotonic deque
+    def __init__(self, window=252, mode="max"):
+        self.window = window
+        self.mode = mode
+        self.items = deque()
+        self.count = 0
+
+    def update(self, value):
+        better = (lambda a, b: a >= b) if self.mode == "max" else (lambda a, b: a <= b)
+        while self.items and better(value, self.items[-1][1]):
+            self.items.pop()
+        self.items.append((self.count, value))
+        if self.items[0][0] <= self.count - self.window:
+            self.items.popleft()
+        self.count += 1
+        return self.items[0][1]
+
+    @property
+    def value(self):
+        return self.items[0][1] if self.items else NaN
+
+
+class MoversHeap:
+    # Running top-n gainers and losers over values that arrive in pieces,
+    # kept in two bounded heaps so a provisional ranking is always available
+    def __init__(self, n):
+        self.n = n
+        self.high = []  # min-heap of the n largest
+        self.low = []   # min-heap of the negated n smallest
+        self.seen = 0
+
+    def push(self, ticker, value):
+        if value is None or math.isnan(value):
+            return
+        self.seen += 1
+        for heap, key in ((self.high, value), (self.low, -value)):
+            if len(heap) < self.n:
+                heapq.heappush(heap, (key, ticker))
+            elif key > heap[0][0]:
+                heapq.heapreplace(heap, (key, ticker))
+
+    def push_many(self, values):
+        for ticker, value in values.items():
+            self.push(ticker, float(value))
+
+    def gainers(self):
+        return [(ticker, value) for value, ticker in sorted(self.high, reverse=True)]
+
+    def losers(self):
+        return [(ticker, -key) for key, ticker in sorted(self.low, reverse=True)]
+
+
+class TickerState:
+    def __init__(self, rsi_period=14, year_window=252):
+        self.rsi = RSIState(rsi_period)
+        self.macd = MACDState()
+        self.high_52w = RollingExtreme(year_window, "max")
+        self.low_52w = RollingExtreme(year_window, "min")
+        self.last_date = None
+        self.last_open = NaN
+        self.last_close = NaN
+        self.prev_close = NaN
+        self.scale = None  # adjustment factor of the last bar when it was fed
+
+    def update(self, date, open_, close):
+        if close is None or math.isnan(close):
+            return
+        self.rsi.update(close)
+        self.macd.update(close)
+        self.high_52w.update(close)
+        self.low_52w.update(close)
+        self.prev_close = self.last_close
+        self.last_close = close
+        self.last_open = open_
+        self.last_date = date
+
+    def metrics(self):
+        prev = self.prev_close
+        return {
+            "Date": self.last_date,
+            "Close": self.last_close,
+            "RSI": self.rsi.value,
+            "MACD": self.macd.macd,
+            "Signal": self.macd.signal,
+            "Crossover": self.macd.crossover(),
+            "52W High": self.high_52w.value,
+            "52W Low": self.low_52w.value,
+            "Change %": (self.last_close - prev) / prev * 100 if prev else NaN,
+            "Gap %": (self.last_open - prev) / prev * 100 if prev else NaN,
+        }
+
+
+class StateStore:
+    def __init__(self, path="indicator_state.pkl"):
+        self.path = path
+        self.states = {}
+
+    def load(self):
+        if os.path.exists(self.path):
+            with open(self.path, "rb") as f:
+                self.states = pickle.load(f)
+        return self
+
+    def save(self):
+        with open(self.path, "wb") as f:
+            pickle.dump(self.states, f)
+
+    def update(self, ticker, date, open_, close):
+        state = self.states.setdefault(ticker, TickerState())
+        state.update(date, open_, close)
+
+    def sync(self, panel, factors=None):
+        # Feed only the bars newer than what each ticker has already seen.
+        # panel holds adjusted prices; factors (dates x tickers, see
+        # adjust.factor_matrix) tell when a new corporate action has rescaled
+        # the bars a state was built from, and that ticker is rebuilt.
+        closes = field_matrix(panel, "Close")
+        opens = field_matrix(panel, "Open")
+        dates = closes.index
+        if factors is not None:
+            factors = factors.reindex(index=dates, columns=closes.columns).fillna(1.0)
+        fed = 0
+        for ticker in closes.columns:
+            state = self.states.get(ticker)
+            start = 0
+            if state is not None and state.last_date is not None:
+                start = dates.searchsorted(state.last_date, side="right")
+                if factors is not None and self.rescaled(state, factors[ticker], start):
+                    self.states.pop(ticker)
+                    start = 0
+            close_values = closes[ticker].to_numpy()[start:]
+            open_values = opens[ticker].to_numpy()[start:]
+            for date, open_, close in zip(dates[start:], open_values, close_values):
+                if not math.isnan(close):
+                    self.update(ticker, date, float(open_), float(close))
+                    fed += 1
+            state = self.states.get(ticker)
+            if factors is not None and state is not None and state.last_date is not None:
+                state.scale = float(factors[ticker].iloc[dates.searchsorted(state.last_date, side="right") - 1])
+        return fed
+
+    @staticmethod
+    def rescaled(state, factor, start):
+        # True when the state's last bar is no longer on the scale it was fed at
+        scale = getattr(state, "scale", None)
+        if scale is None or start == 0 or factor.index[start - 1] != state.last_date:
+            return True
+        return abs(factor.iloc[start - 1] / scale - 1) > MIN_STEP
+
+    def metrics(self):
+        return pd.DataFrame.from_dict(
+            {ticker: state.metrics() for ticker, state in self.states.items()}, orient="index")
+
+
+def compare_with_batch(close, rsi_period=14):
+    # Largest gap between the incremental values and a full recompute
+    state = TickerState(rsi_period=rsi_period)
+    rsi_values, macd_values, signal_values = [], [], []
+    for date, value in close.items():
+        state.update(date, value, float(value))
+        rsi_values.append(state.rsi.value)
+        macd_values.append(state.macd.macd)
+        signal_values.append(state.macd.signal)
+
+    macd, signal = ind.macd(close)
+
+    def worst(batch, incremental):
+        incremental = pd.Series(incremental, index=close.index)
+        if (batch.isna() != incremental.isna()).any():
+            return float("inf")
+        return float((batch - incremental).abs().max())
+
+    return {
+        "RSI": worst(ind.rsi(close, rsi_period), rsi_values),
+        "MACD": worst(macd, macd_values),
+        "Signal": worst(signal, signal_values),
+    }
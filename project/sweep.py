@@ -0,0 +1,198 @@
+import pandas as pd
+from data import field_matrix
+from snapshot import UniverseSnapshot
+import indicators as ind
+from instrument import instrumented, stage
+
+# Parameter sweeps for tuning the screens.
+#
+# Every combination of a grid (RSI periods x bands, gap thresholds, MACD EMA
+# spans, return cutoffs and horizons) is evaluated over one loaded snapshot.
+# Work that does not depend on a parameter is done once and shared: price
+# moves for the RSIs of every period, one EMA per span for all MACD
+# combinations, one return per horizon for the strong and returns screens.
+#
+# The result is one tidy table, a row per screen and parameter combination:
+#
+#   Screen  <parameter columns>  Evaluated  Hits  Hit %  Tickers
+#
+# Parameter columns that don't apply to a screen are left empty. Windows and
+# rules are the same as the screens in main.py.
+
+GRIDS = {
+    "rsi": {"periods": [7, 14, 21], "lows": [20.0, 25.0, 30.0], "highs": [70.0, 75.0, 80.0]},
+    "gap": {"thresholds": [1.0, 2.0, 3.0, 5.0]},
+    "macd": {"fasts": [8, 12], "slows": [21, 26], "signals": [9]},
+    "strong": {"min_5y": [25.0, 50.0, 100.0], "max_1y": [-10.0, -5.0, 0.0]},
+    "returns": {"years": [1, 3, 5], "min_returns": [0.0, 50.0, 100.0]},
+}
+
+# Parameter columns that hold whole numbers (kept integer next to the empty cells)
+INTEGER_PARAMS = {"Period", "Fast", "Slow", "Signal", "Years"}
+
+
+class SweepData:
+    # One snapshot plus the intermediates shared between variants
+    def __init__(self, tickers, snapshot=None):
+        self.tickers = list(tickers)
+        self.snapshot = snapshot or UniverseSnapshot(tickers)
+        self.closes = {}
+        self.moves = {}
+        self.emas = {}
+        self.returns = {}
+        self.store = None
+
+    def close(self, period):
+        if period not in self.closes:
+            close = field_matrix(self.snapshot.window(period), "Close")
+            self.closes[period] = close.reindex(columns=self.tickers)
+        return self.closes[period]
+
+    def price_moves(self, period):
+        if period not in self.moves:
+            self.moves[period] = ind.price_moves(self.close(period))
+        return self.moves[period]
+
+    def ema(self, period, span):
+        return ind.ema(self.close(period), span, self.emas.setdefault(period, {}))
+
+    def period_return(self, years):
+        if years not in self.returns:
+            if not self.snapshot.compact:
+                close = field_matrix(self.snapshot.window(f"{years}y"), "Close")
+                self.returns[years] = ind.period_return(close).reindex(self.tickers)
+            else:
+                if self.store is None:
+                    self.store = self.snapshot.compact_panel(tickers=self.tickers)
+                self.returns[years] = self.store.trim(f"{years}y").period_return().reindex(self.tickers)
+        return self.returns[years]
+
+
+def _row(screen, params, hits, evaluated):
+    tickers = hits.index[hits.fillna(False).astype(bool)].tolist()
+    return {
+        "Screen": screen, **params,
+        "Evaluated": int(evaluated),
+        "Hits": len(tickers),
+        "Hit %": len(tickers) / evaluated * 100 if evaluated else float("nan"),
+        "Tickers": " ".join(tickers),
+    }
+
+
+def sweep_rsi(data, periods, lows, highs):
+    # The screen's 3mo window holds ~62 sessions, enough for periods up to 40
+    window = "3mo" if max(periods) <= 40 else "1y"
+    close, moves = data.close(window), data.price_moves(window)
+    rows = []
+    for period in periods:
+        with stage("compute"):
+            latest = ind.last_valid(ind.rsi(close, period, moves))
+        evaluated = latest.notna().sum()
+        with stage("filter"):
+            rows += [_row("rsi_low", {"Period": period, "Band": low}, latest < low, evaluated) for low in lows]
+            rows += [_row("rsi_high", {"Period": period, "Band": high}, latest > high, evaluated) for high in highs]
+    return rows
+
+
+def sweep_gap(data, thresholds):
+    with stage("compute"):
+        panel = data.snapshot.window("15d", adjusted=False)
+        gaps = ind.gap_pct(field_matrix(panel, "Open"), field_matrix(panel, "Close")).reindex(data.tickers)
+    evaluated = gaps.notna().sum()
+    rows = []
+    with stage("filter"):
+        for threshold in thresholds:
+            rows.append(_row("gap_up", {"Threshold": threshold}, gaps > threshold, evaluated))
+            rows.append(_row("gap_down", {"Threshold": threshold}, gaps < -threshold, evaluated))
+    return rows
+
+
+def sweep_macd(data, fasts, slows, signals):
+    combos = [(f, s, g) for f in fasts for s in slows for g in signals if f < s]
+    if not combos:
+        return []
+    # EMAs are seeded at the window start, so keep the screen's 3mo unless the
+    # spans need more bars than it holds
+    window = "3mo" if max(s + g for _, s, g in combos) <= 50 else "1y"
+    bars = ind.bar_count(data.close(window))
+    lines = {}
+    rows = []
+    for fast, slow, signal in combos:
+        with stage("compute"):
+            if (fast, slow) not in lines:
+                lines[fast, slow] = data.ema(window, fast) - data.ema(window, slow)
+            line = lines[fast, slow]
+            bullish, bearish = ind.crossover(line, ind.ema(line, signal))
+        enough = bars >= slow + signal
+        params = {"Fast": fast, "Slow": slow, "Signal": signal}
+        with stage("filter"):
+            rows.append(_row("macd_bullish", params, bullish & enough, enough.sum()))
+            rows.append(_row("macd_bearish", params, bearish & enough, enough.sum()))
+    return rows
+
+
+def sweep_strong(data, min_5y, max_1y):
+    with stage("compute"):
+        ret_5y, ret_1y = data.period_return(5), data.period_return(1)
+    evaluated = (ret_5y.notna() & ret_1y.notna()).sum()
+    rows = []
+    with stage("filter"):
+        for low_5y in min_5y:
+            for low_1y in max_1y:
+                hits = (ret_5y >= low_5y) & (ret_1y >= low_1y)
+                rows.append(_row("strong", {"Min 5Y": low_5y, "Max 1Y": low_1y}, hits, evaluated))
+    return rows
+
+
+def sweep_returns(data, years, min_returns):
+    rows = []
+    for n in years:
+        with stage("compute"):
+            returns = data.period_return(n)
+        evaluated = returns.notna().sum()
+        with stage("filter"):
+            rows += [_row(f"returns_{n}y", {"Years": n, "Min Return": cutoff}, returns >= cutoff, evaluated)
+                     for cutoff in min_returns]
+    return rows
+
+
+SWEEPS = {
+    "rsi": sweep_rsi,
+    "gap": sweep_gap,
+    "macd": sweep_macd,
+    "strong": sweep_strong,
+    "returns": sweep_returns,
+}
+
+
+@instrumented
+def run_sweep(tickers, grids=None, snapshot=None):
+    # grids: screen -> keyword arguments of its sweep_* function (see GRIDS);
+    # missing keywords fall back to the defaults
+    grids = grids or GRIDS
+    data = SweepData(tickers, snapshot)
+    years = [5] if "strong" in grids else []
+    if "returns" in grids:
+        years += grids["returns"].get("years", GRIDS["returns"]["years"])
+    if years:
+        data.snapshot.ensure_lookback(max(years))
+
+    print(f"\n🎛️ Sweeping {', '.join(grids)} over {len(data.tickers)} tickers...")
+    rows = []
+    for screen, grid in grids.items():
+        rows += SWEEPS[screen](data, **{**GRIDS[screen], **grid})
+
+    result = pd.DataFrame(rows)
+    if result.empty:
+        print("❌ Nothing to sweep.")
+        return result
+    stats = ["Evaluated", "Hits", "Hit %", "Tickers"]
+    params = [c for c in result.columns if c not in stats and c != "Screen"]
+    result = result[["Screen", *params, *stats]]
+    for column in INTEGER_PARAMS.intersection(params):
+        result[column] = result[column].astype("Int64")
+
+    print(f"🧮 {len(result)} combinations\n")
+    shown = result.drop(columns="Tickers").round(2)
+    print(shown.astype(object).where(shown.notna(), "").to_string(index=False))
+    return result
@@ -0,0 +1,28 @@
+import contextlib
+import io
+import os
+import sys
+import pytest
+
+# Modules import each other flat (from data import ...), as when run from project/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import data
+import validate
+from data import SyntheticProvider
+
+
+@pytest.fixture
+def synthetic(monkeypatch):
+    # Offline prices; returns a function to install a provider with other settings
+    def install(**kwargs):
+        monkeypatch.setattr(data, "default_provider", SyntheticProvider(**kwargs))
+    monkeypatch.setattr(validate, "quarantine", validate.Quarantine())
+    install(history_years=12)
+    return install
+
+
+@pytest.fixture
+def quiet():
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
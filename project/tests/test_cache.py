@@ -0,0 +1,57 @@
+import pandas as pd
+from adjust import ADJ_CLOSE, PRICE_FIELDS
+from cache import CachedProvider, PriceCache
+from data import SyntheticProvider
+
+
+class ListedLate(SyntheticProvider):
+    # Every ticker listed 100 sessions ago
+    def download(self, tickers, **kwargs):
+        panel = super().download(tickers, **kwargs)
+        return panel.iloc[-100:]
+
+
+def test_recent_listing_served_from_cache(tmp_path):
+    provider = CachedProvider(ListedLate(), PriceCache(str(tmp_path)))
+    for _ in range(3):
+        panel = provider.download(["NEW.NS"], period="5y", auto_adjust=False)
+        assert len(panel) == 100
+    assert provider.cache.stats["network_calls"] == 1
+    assert provider.cache.stats["misses"] == 1
+    assert provider.cache.stats["hits"] == 2
+
+    # Asking further back than ever requested goes to the network again
+    provider.download(["NEW.NS"], period="10y", auto_adjust=False)
+    assert provider.cache.stats["misses"] == 2
+
+
+class SplitLater(SyntheticProvider):
+    # Stops `cut` sessions short; after split() every price comes back halved,
+    # the way the provider rewrites a ticker's history after a 2:1 split
+    def __init__(self):
+        super().__init__()
+        self.cut = 3
+        self.ratio = 1.0
+
+    def split(self):
+        self.cut, self.ratio = 0, 2.0
+
+    def download(self, tickers, **kwargs):
+        panel = super().download(tickers, **kwargs)
+        panel = panel.iloc[:len(panel) - self.cut].copy()
+        prices = panel.columns.get_level_values(-1).isin(PRICE_FIELDS + [ADJ_CLOSE])
+        panel.loc[:, prices] /= self.ratio
+        return panel
+
+
+def test_split_between_runs_rescales_cached_bars(tmp_path):
+    source = SplitLater()
+    provider = CachedProvider(source, PriceCache(str(tmp_path / "old")))
+    provider.download(["SPL.NS"], period="1y")
+    provider.cache.index("1d")["SPL.NS"]["checked"] = 0
+
+    source.split()
+    topped_up = provider.download(["SPL.NS"], period="1y")
+    fresh = CachedProvider(source, PriceCache(str(tmp_path / "new"))).download(["SPL.NS"], period="1y")
+    assert provider.cache.stats["topups"] == 1
+    pd.testing.assert_series_equal(topped_up[("SPL.NS", "Close")], fresh[("SPL.NS", "Close")], rtol=1e-9)
@@ -0,0 +1,18 @@
+from history import HitStore
+from nse_calendar import nse
+from snapshot import UniverseSnapshot
+import pandas as pd
+
+
+def test_runs_are_recorded_on_the_data_session(synthetic, quiet, tmp_path):
+    # Data ending a session before today, as in a pre-open run
+    end = nse.previous_session() - nse.offset
+    synthetic(history_years=1, end=end)
+    snapshot = UniverseSnapshot(["SYN0001.NS"], period="1y")
+    store = HitStore(str(tmp_path / "history.db"))
+    hits = pd.DataFrame({"Ticker": ["SYN0001.NS"], "RSI": [25.0]})
+
+    for _ in range(2):
+        store.record("rsi_low", hits, snapshot.session())
+    assert store.hits("rsi_low")["Session"].unique().tolist() == [end.strftime("%Y-%m-%d")]
+    assert store.streaks("rsi_low", 2).empty
@@ -0,0 +1,26 @@
+import pandas as pd
+import pytest
+from nse_calendar import nse
+from snapshot import UniverseSnapshot
+
+TICKERS = [f"SYN{i:04d}.NS" for i in range(50)]
+
+
+def returns(snapshot):
+    store = snapshot.compact_panel().select(TICKERS).trim("5y")
+    return store.dates[0], store.period_return(), store.trim("1y").period_return()
+
+
+@pytest.mark.parametrize("lag", [0, 1, 3])
+def test_5y_window_same_for_any_load_period(synthetic, quiet, lag):
+    # Data ending `lag` sessions before today (weekend, holiday, pre-open runs)
+    synthetic(history_years=12, end=nse.previous_session() - lag * nse.offset)
+    plain = UniverseSnapshot(TICKERS)
+    wide = UniverseSnapshot(TICKERS)
+    wide.ensure_lookback(11)
+
+    base_plain, ret_5y_plain, ret_1y_plain = returns(plain)
+    base_wide, ret_5y_wide, ret_1y_wide = returns(wide)
+    assert base_plain == base_wide
+    pd.testing.assert_series_equal(ret_5y_plain, ret_5y_wide)
+    pd.testing.assert_series_equal(ret_1y_plain, ret_1y_wide)
@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+import pytest
+import indicators as ind
+from data import SyntheticProvider, field_matrix, normalize_panel
+from streaming import RSIState, StateStore, TickerState, compare_with_batch
+
+TICKERS = [f"SYN{i:04d}.NS" for i in range(20)]
+TOLERANCE = 1e-8
+
+
+def synthetic_panel(tickers, years=1, **kwargs):
+    return normalize_panel(SyntheticProvider(history_years=years).download(tickers, **kwargs), tickers)
+
+
+@pytest.fixture
+def close():
+    return field_matrix(synthetic_panel(TICKERS, years=2), "Close")
+
+
+def feed(close, rsi_period=14):
+    # Incremental RSI / MACD / signal of every column, as dates x tickers frames
+    out = {name: pd.DataFrame(np.nan, index=close.index, columns=close.columns)
+           for name in ("RSI", "MACD", "Signal")}
+    for ticker in close.columns:
+        state = TickerState(rsi_period=rsi_period)
+        for i, (date, value) in enumerate(close[ticker].items()):
+            state.update(date, value, value)
+            out["RSI"].iat[i, out["RSI"].columns.get_loc(ticker)] = state.rsi.value
+            out["MACD"].iat[i, out["MACD"].columns.get_loc(ticker)] = state.macd.macd
+            out["Signal"].iat[i, out["Signal"].columns.get_loc(ticker)] = state.macd.signal
+    return out
+
+
+@pytest.mark.parametrize("period", [7, 14])
+def test_incremental_matches_batch(close, period):
+    incremental = feed(close, period)
+    macd, signal = ind.macd(close)
+    batch = {"RSI": ind.rsi(close, period), "MACD": macd, "Signal": signal}
+    for name, expected in batch.items():
+        got = incremental[name]
+        assert (got.isna() == expected.isna()).all().all(), name
+        assert np.nanmax(np.abs(got.to_numpy() - expected.to_numpy())) < TOLERANCE, name
+    assert (ind.ema(close, 12) - ind.ema(close, 26)).equals(macd)
+
+
+def test_compare_with_batch(close):
+    assert max(compare_with_batch(close.iloc[:, 0]).values()) < TOLERANCE
+
+
+def test_rsi_flat_window_is_exact():
+    # Running totals must not leave rounding residue once every move has left the window
+    state = RSIState(3)
+    for value in [10.1, 10.7, 9.3, 10.2, 10.2, 10.2, 10.2, 10.9]:
+        state.update(value)
+    assert state.value == 100.0
+
+
+def test_sync_in_pieces_matches_one_pass(tmp_path):
+    panel = synthetic_panel(TICKERS[:5])
+    whole = StateStore(str(tmp_path / "whole.pkl"))
+    whole.sync(panel)
+
+    pieces = StateStore(str(tmp_path / "pieces.pkl"))
+    pieces.sync(panel.iloc[:-30])
+    pieces.save()
+    pieces = StateStore(pieces.path).load()
+    assert pieces.sync(panel) == 30 * 5
+    pd.testing.assert_frame_equal(pieces.metrics(), whole.metrics())
+
+
+def test_new_corporate_action_rebuilds_state(tmp_path):
+    raw = synthetic_panel(TICKERS[:2], auto_adjust=False).drop(columns="Adj Close", level="Field")
+    close = field_matrix(raw, "Close")
+    factors = pd.DataFrame(1.0, index=close.index, columns=close.columns)
+
+    store = StateStore(str(tmp_path / "state.pkl"))
+    store.sync(raw.iloc[:-10], factors.iloc[:-10])
+
+    # A 2:1 split on the fifth-last session halves every earlier adjusted price
+    factors.iloc[:-5, 0] = 0.5
+    adjusted = raw.copy()
+    for field in ("Open", "High", "Low", "Close"):
+        adjusted[(TICKERS[0], field)] *= factors[TICKERS[0]]
+        adjusted[(TICKERS[1], field)] *= factors[TICKERS[1]]
+    store.sync(adjusted, factors)
+
+    fresh = StateStore(str(tmp_path / "fresh.pkl"))
+    fresh.sync(adjusted, factors)
+    pd.testing.assert_frame_equal(store.metrics().sort_index(), fresh.metrics().sort_index())
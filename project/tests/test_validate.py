@@ -0,0 +1,45 @@
+import numpy as np
+import validate
+from data import SyntheticProvider, normalize_panel
+
+TICKERS = ["OLD.NS", "NEW.NS", "OK.NS"]
+
+
+def test_only_recent_bad_prices_quarantine():
+    panel = normalize_panel(SyntheticProvider(history_years=3).download(TICKERS, auto_adjust=False), TICKERS)
+    panel.iloc[-500, panel.columns.get_loc(("OLD.NS", "Close"))] = 0.0
+    panel.iloc[-10, panel.columns.get_loc(("NEW.NS", "Low"))] = np.nan
+
+    issues = validate.check(panel, TICKERS)
+    found = set(zip(issues["Ticker"], issues["Check"]))
+    assert ("OLD.NS", "old_bad_price") in found
+    assert ("NEW.NS", "bad_price") in found
+    assert not {t for t, _ in found} & {"OK.NS"}
+
+    rejected = validate.Quarantine().update(issues, TICKERS)
+    assert rejected == ["NEW.NS"]
+
+
+class Offline:
+    def download(self, tickers, **kwargs):
+        raise ConnectionError("network down")
+
+
+def test_failed_fetch_never_quarantines(monkeypatch, quiet, tmp_path):
+    import data
+    from cache import CachedProvider, PriceCache
+    from fetcher import FetchExecutor
+    from snapshot import UniverseSnapshot
+
+    monkeypatch.setattr(validate, "quarantine", validate.Quarantine(str(tmp_path / "quarantine.json")))
+    network = FetchExecutor(Offline(), retries=0)
+    monkeypatch.setattr(data, "default_provider", CachedProvider(network, PriceCache(str(tmp_path / "cache"))))
+    snapshot = UniverseSnapshot(TICKERS, period="1y")
+    assert snapshot.load().empty
+    assert not validate.quarantine.entries
+
+    # Network back: every ticker is downloaded and loaded again
+    network.provider = SyntheticProvider(history_years=2)
+    snapshot.refresh()
+    assert set(snapshot.load().columns.get_level_values("Ticker")) == set(TICKERS)
+    assert not validate.quarantine.entries
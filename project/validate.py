@@ -0,0 +1,206 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+from adjust import ADJ_CLOSE, PRICE_FIELDS
+
+# Data-quality checks, run once per universe load.
+#
+# Every check is a vectorized pass over the dates x tickers field matrices of
+# the whole download:
+#
+#   fetch_failed  the download errored (network, throttling)            warning
+#   no_data       the download worked but had no bars for the ticker    warning
+#   bad_price     zero/negative price, or a bar with some prices NaN,   quarantine
+#                 in the last BAD_PRICE_SESSIONS
+#   old_bad_price the same, further back (e.g. one old bad print)       warning
+#   stale         last bar more than STALE_SESSIONS behind the universe quarantine
+#   missing_bars  share of sessions since the first bar with no bar     warning
+#   zero_volume   share of the last RECENT bars with zero volume        warning
+#   jump          largest one-session move of the adjusted close (%)    warning
+#
+# Quarantined tickers are dropped from the loaded data and kept in
+# quarantine.json next to the price cache with their reasons. They are not
+# downloaded again until RETRY_DAYS have passed; then they are re-checked and
+# released if clean. A ticker whose download failed is never quarantined, and
+# one that came back empty is simply asked for again on the next load.
+
+QUARANTINE_FILE = "quarantine.json"
+STALE_SESSIONS = 5
+MAX_MISSING = 0.2
+RECENT = 20
+ZERO_VOLUME = 0.5
+MAX_JUMP = 40.0
+RETRY_DAYS = 7
+BAD_PRICE_SESSIONS = 252
+
+BLOCKING = {"bad_price", "stale"}
+DETAILS = {
+    "fetch_failed": "download failed",
+    "no_data": "no bars downloaded",
+    "bad_price": "{:.0f} bars with zero, negative or missing prices",
+    "old_bad_price": "{:.0f} bars with zero, negative or missing prices over a year ago",
+    "stale": "last bar {:.0f} sessions behind",
+    "missing_bars": "{:.0%} of sessions missing",
+    "zero_volume": "{:.0%} of recent bars with zero volume",
+    "jump": "{:.1f}% move in one session",
+}
+
+
+def _fields(panel):
+    # Field -> dates x tickers float array, columns in the order of the Close field
+    values = panel.to_numpy(dtype=float)
+    fields = panel.columns.get_level_values("Field")
+    owners = panel.columns.get_level_values("Ticker")
+    names = pd.Index(owners[fields == "Close"])
+    out = {}
+    for field in fields.unique():
+        cols = np.flatnonzero(fields == field)
+        block = np.full((len(panel), len(names)), np.nan)
+        where = names.get_indexer(owners[cols])
+        block[:, where[where >= 0]] = values[:, cols[where >= 0]]
+        out[field] = block
+    return names, out
+
+
+def check(panel, tickers, failed=()):
+    # Raw (Ticker, Field) daily panel -> one row per failed check:
+    # Ticker, Check, Value, Detail. failed: tickers whose download errored
+    names, fields, has_bars = pd.Index([]), {}, np.zeros(0, dtype=bool)
+    if not panel.empty and "Close" in panel.columns.get_level_values("Field"):
+        names, fields = _fields(panel)
+        has_bars = ~np.isnan(fields["Close"]).all(axis=0)
+    present = set(names[has_bars])
+    failed = set(failed)
+    absent = [t for t in tickers if t not in present]
+    found = {"fetch_failed": pd.Series(1.0, index=[t for t in absent if t in failed]),
+             "no_data": pd.Series(1.0, index=[t for t in absent if t not in failed])}
+
+    if present:
+        names = names[has_bars]
+        fields = {f: block[:, has_bars] for f, block in fields.items()}
+        close = fields["Close"]
+        valid = ~np.isnan(close)
+        prices = np.stack([fields[f] for f in PRICE_FIELDS if f in fields])
+        nan = np.isnan(prices)
+        bad = (prices <= 0).any(axis=0) | (nan.any(axis=0) & ~nan.all(axis=0))
+        found["bad_price"] = pd.Series(bad[-BAD_PRICE_SESSIONS:].sum(axis=0), index=names, dtype=float)
+        found["old_bad_price"] = pd.Series(bad[:-BAD_PRICE_SESSIONS].sum(axis=0), index=names, dtype=float)
+
+        last = len(valid) - 1 - valid[::-1].argmax(axis=0)
+        found["stale"] = pd.Series(len(valid) - 1 - last, index=names, dtype=float)
+
+        listed = np.cumsum(valid, axis=0) > 0
+        found["missing_bars"] = pd.Series((listed & ~valid).sum(axis=0) / listed.sum(axis=0), index=names)
+
+        if "Volume" in fields:
+            recent = fields["Volume"][-RECENT:]
+            bars = (~np.isnan(recent)).sum(axis=0)
+            zeros = (recent == 0).sum(axis=0)
+            found["zero_volume"] = pd.Series(np.where(bars > 0, zeros / np.maximum(bars, 1), 0.0), index=names)
+
+        adjusted = fields.get(ADJ_CLOSE, close)
+        adjusted = pd.DataFrame(np.where(adjusted > 0, adjusted, np.nan)).ffill().to_numpy()
+        with np.errstate(invalid="ignore", divide="ignore"):
+            moves = np.abs(adjusted[1:] / adjusted[:-1] - 1) * 100
+        moves = np.nan_to_num(moves, nan=0.0)
+        found["jump"] = pd.Series(moves.max(axis=0) if len(moves) else 0.0, index=names)
+
+    limits = {"fetch_failed": 0, "no_data": 0, "bad_price": 0, "old_bad_price": 0, "stale": STALE_SESSIONS,
+              "missing_bars": MAX_MISSING, "zero_volume": ZERO_VOLUME, "jump": MAX_JUMP}
+    rows = [(ticker, name, value, DETAILS[name].format(value))
+            for name, values in found.items()
+            for ticker, value in values[values > limits[name]].items()]
+    return pd.DataFrame(rows, columns=["Ticker", "Check", "Value", "Detail"])
+
+
+def _day(value):
+    return pd.Timestamp(value).strftime("%Y-%m-%d")
+
+
+class Quarantine:
+    # Tickers kept out of scans; path=None keeps the list in memory only
+    def __init__(self, path=None):
+        self.path = path
+        self.entries = {}   # ticker -> {"reasons", "since", "checked"}
+        self.warnings = {}  # ticker -> reasons of non-blocking checks
+        if path and os.path.exists(path):
+            with open(path) as f:
+                saved = json.load(f)
+            self.entries = saved.get("quarantined", {})
+            self.warnings = saved.get("warnings", {})
+
+    def active(self, today=None):
+        # Quarantined tickers not yet due for a re-check
+        today = pd.Timestamp(today or pd.Timestamp.today()).normalize()
+        return {t for t, e in self.entries.items()
+                if today < pd.Timestamp(e["checked"]) + pd.Timedelta(days=RETRY_DAYS)}
+
+    def update(self, issues, checked, today=None):
+        # Apply the results of check() for the tickers that were checked;
+        # returns the tickers quarantined by this check
+        today = _day(today or pd.Timestamp.today())
+        reasons = {}
+        for ticker, name, detail in issues[["Ticker", "Check", "Detail"]].itertuples(index=False):
+            reasons.setdefault(ticker, {}).setdefault(name in BLOCKING, []).append(f"{name}: {detail}")
+        rejected = []
+        for ticker in checked:
+            found = reasons.get(ticker, {})
+            if found.get(True):
+                entry = self.entries.setdefault(ticker, {"since": today})
+                entry.update(reasons=found[True], checked=today)
+                rejected.append(ticker)
+            else:
+                self.entries.pop(ticker, None)
+            if found.get(False):
+                self.warnings[ticker] = found[False]
+            else:
+                self.warnings.pop(ticker, None)
+        return rejected
+
+    def release(self, tickers):
+        for ticker in tickers:
+            self.entries.pop(ticker, None)
+
+    def frame(self, warnings=False):
+        rows = [(t, "; ".join(e["reasons"]), e["since"], e["checked"]) for t, e in sorted(self.entries.items())]
+        df = pd.DataFrame(rows, columns=["Ticker", "Reasons", "Since", "Checked"])
+        if warnings:
+            extra = pd.DataFrame([(t, "; ".join(r)) for t, r in sorted(self.warnings.items())],
+                                 columns=["Ticker", "Reasons"])
+            df = pd.concat([df.assign(Status="quarantined"), extra.assign(Status="warning")], ignore_index=True)
+            df = df.fillna("")
+        return df
+
+    def save(self):
+        if not self.path:
+            return
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"quarantined": self.entries, "warnings": self.warnings}, f, indent=1)
+        os.replace(tmp, self.path)
+
+
+def summary(issues, rejected):
+    counts = issues.groupby("Check")["Ticker"].nunique()
+    blocking = ", ".join(f"{name} {n}" for name, n in counts.items() if name in BLOCKING)
+    warned = ", ".join(f"{name} {n}" for name, n in counts.items() if name not in BLOCKING)
+    parts = []
+    if rejected:
+        parts.append(f"{len(rejected)} tickers quarantined ({blocking})")
+    if warned:
+        parts.append(f"warnings: {warned}")
+    return "🩺 Data check: " + "; ".join(parts) if parts else "🩺 Data check: all tickers passed"
+
+
+# Quarantine every snapshot load goes through; main.setup_data() installs a
+# persistent one next to the price cache
+quarantine = Quarantine()
+
+
+def set_quarantine(q):
+    global quarantine
+    quarantine = q